@@ -7,8 +7,9 @@ from alembic import context
 
 # Import your models and config
 from app.core.config import settings
-from app.models.school import School
-from app.models.zone import SchoolZone
+from app.models.dataset import DatasetChange, DatasetVersion
+from app.models.school import School, SchoolSubject, Subject
+from app.models.zone import SchoolZone, ZonePriceObservation, ZonePriceRollup, ZonePriceStat
 from sqlmodel import SQLModel
 
 # this is the Alembic Config object, which provides
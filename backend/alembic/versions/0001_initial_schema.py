@@ -0,0 +1,66 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+The ``school`` and ``schoolzone`` tables as originally created by
+``init_db()``. Databases created that way can be adopted with
+``alembic stamp 0001`` followed by ``alembic upgrade head``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "school",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("school_type", sa.String(), nullable=True),
+        sa.Column("region", sa.String(), nullable=True),
+        sa.Column("city", sa.String(), nullable=True),
+        sa.Column("suburb", sa.String(), nullable=True),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("latitude", sa.Float(), nullable=True),
+        sa.Column("longitude", sa.Float(), nullable=True),
+        sa.Column("brand_name", sa.String(), nullable=True),
+        sa.Column("education_system", sa.String(), nullable=True),
+        sa.Column("owner_or_group", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("website_url", sa.String(), nullable=True),
+        sa.Column("fee_min", sa.Float(), nullable=True),
+        sa.Column("fee_max", sa.Float(), nullable=True),
+        sa.Column("fee_currency", sa.String(), nullable=True),
+        sa.Column("fee_unit", sa.String(), nullable=True),
+        sa.Column("qs_world_rank", sa.Integer(), nullable=True),
+        sa.Column("strong_subjects", sa.String(), nullable=True),
+        sa.Column("university_type", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "schoolzone",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("school_id", sa.Integer(), nullable=True),
+        sa.Column("median_house_price", sa.Float(), nullable=True),
+        sa.Column("last_updated", sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(["school_id"], ["school.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("schoolzone")
+    op.drop_table("school")
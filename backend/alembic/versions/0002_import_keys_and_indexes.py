@@ -0,0 +1,146 @@
+"""import keys, dataset versions and query indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+Adds the importer keys and bookkeeping columns, the dataset version tables,
+and indexes for the list endpoints' query shapes (equality filters, keyset
+pages ordered by ``(name, id)``, partial indexes for kindergartens). On
+Postgres it also installs what ``init_db()`` creates at runtime when the
+extensions are available: the PostGIS geography index and the trigram search
+function and index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import DBAPIError
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KINDERGARTEN = sa.text("school_type = 'kindergarten' AND deleted_at IS NULL")
+
+SEARCH_TEXT_FUNCTION = """
+CREATE OR REPLACE FUNCTION kiwi_search_text(name text, suburb text, brand_name text)
+RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(public.unaccent('public.unaccent'::regdictionary,
+        coalesce(name, '') || ' ' || coalesce(suburb, '') || ' ' || coalesce(brand_name, '')))
+$$
+"""
+
+
+def _installed(bind, extension: str) -> bool:
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = :name"), {"name": extension}
+    ).first() is not None
+
+
+def _postgres_indexes() -> None:
+    bind = op.get_bind()
+    if _installed(bind, "postgis"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_school_geography ON school USING gist "
+            "((ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography)) "
+            "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+    # Creating extensions needs privileges the migration role may lack; search
+    # then falls back to the in-memory index
+    try:
+        with bind.begin_nested():
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    except DBAPIError as e:
+        print(f"Skipping trigram search index: {e.orig}")
+        return
+    op.execute(SEARCH_TEXT_FUNCTION)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_school_search_trgm ON school "
+        "USING gin (kiwi_search_text(name, suburb, brand_name) gin_trgm_ops)"
+    )
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("school") as batch:
+        batch.add_column(sa.Column("school_number", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("external_id", sa.String(), nullable=True))
+        batch.add_column(sa.Column("content_hash", sa.String(), nullable=True))
+        batch.add_column(sa.Column("deleted_at", sa.DateTime(), nullable=True))
+        batch.create_unique_constraint("school_school_number_key", ["school_number"])
+        batch.create_unique_constraint("school_external_id_key", ["external_id"])
+
+    op.create_table(
+        "datasetversion",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "datasetchange",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("school_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_datasetchange_version", "datasetchange", ["version"])
+
+    op.create_index("ix_school_name_id", "school", ["name", "id"])
+    op.create_index("ix_school_type_name_id", "school", ["school_type", "name", "id"])
+    op.create_index("ix_school_type_region_city", "school", ["school_type", "region", "city"])
+    op.create_index("ix_school_suburb", "school", ["suburb"])
+    op.create_index("ix_school_name_school_type", "school", ["name", "school_type"])
+    op.create_index(
+        "ix_school_kindergarten_name_id",
+        "school",
+        ["name", "id"],
+        postgresql_where=KINDERGARTEN,
+        sqlite_where=KINDERGARTEN,
+    )
+    op.create_index(
+        "ix_school_kindergarten_region_city",
+        "school",
+        ["region", "city", "education_system"],
+        postgresql_where=KINDERGARTEN,
+        sqlite_where=KINDERGARTEN,
+    )
+    op.create_index("ix_schoolzone_school_id", "schoolzone", ["school_id"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        _postgres_indexes()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_school_search_trgm")
+        op.execute("DROP FUNCTION IF EXISTS kiwi_search_text(text, text, text)")
+        op.execute("DROP INDEX IF EXISTS ix_school_geography")
+
+    op.drop_index("ix_schoolzone_school_id", table_name="schoolzone")
+    for name in (
+        "ix_school_kindergarten_region_city",
+        "ix_school_kindergarten_name_id",
+        "ix_school_name_school_type",
+        "ix_school_suburb",
+        "ix_school_type_region_city",
+        "ix_school_type_name_id",
+        "ix_school_name_id",
+    ):
+        op.drop_index(name, table_name="school")
+    op.drop_index("ix_datasetchange_version", table_name="datasetchange")
+    op.drop_table("datasetchange")
+    op.drop_table("datasetversion")
+
+    with op.batch_alter_table("school") as batch:
+        batch.drop_constraint("school_external_id_key", type_="unique")
+        batch.drop_constraint("school_school_number_key", type_="unique")
+        batch.drop_column("deleted_at")
+        batch.drop_column("content_hash")
+        batch.drop_column("external_id")
+        batch.drop_column("school_number")
@@ -0,0 +1,48 @@
+"""zone boundaries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 14:00:00
+
+Adds ``schoolzone.boundary``, the zone's GeoJSON Polygon/MultiPolygon in WGS84
+as loaded by ``scripts/import_zone_boundaries.py``. On Postgres with PostGIS
+it also creates the GiST expression index that ``init_db()`` creates at
+runtime for ``/zones/lookup``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _installed(bind, extension: str) -> bool:
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = :name"), {"name": extension}
+    ).first() is not None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("schoolzone") as batch:
+        batch.add_column(sa.Column("boundary", sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and _installed(bind, "postgis"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_schoolzone_boundary ON schoolzone USING gist "
+            "((ST_SetSRID(ST_GeomFromGeoJSON(boundary), 4326))) WHERE boundary IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_schoolzone_boundary")
+
+    with op.batch_alter_table("schoolzone") as batch:
+        batch.drop_column("boundary")
@@ -0,0 +1,74 @@
+"""zone price history and rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:00:00
+
+Adds ``zonepriceobservation`` (one median house price per zone and date) and
+the rollups refreshed from it by ``app.services.zone_prices``:
+``zonepricerollup`` (per zone and year) and ``zonepricestat`` (percentiles
+and year-over-year change per year, region and school type).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "zonepriceobservation",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("zone_id", sa.Integer(), nullable=False),
+        sa.Column("observed_on", sa.Date(), nullable=False),
+        sa.Column("median_price", sa.Float(), nullable=False),
+        sa.Column("sales_count", sa.Integer(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["zone_id"], ["schoolzone.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("zone_id", "observed_on", name="uq_zonepriceobservation_zone_date"),
+    )
+    op.create_table(
+        "zonepricerollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("zone_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("median_price", sa.Float(), nullable=False),
+        sa.Column("observations", sa.Integer(), nullable=False),
+        sa.Column("last_observed_on", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(["zone_id"], ["schoolzone.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("zone_id", "year", name="uq_zonepricerollup_zone_year"),
+    )
+    op.create_table(
+        "zonepricestat",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("region", sa.String(), nullable=False),
+        sa.Column("school_type", sa.String(), nullable=False),
+        sa.Column("zones", sa.Integer(), nullable=False),
+        sa.Column("p10", sa.Float(), nullable=False),
+        sa.Column("p25", sa.Float(), nullable=False),
+        sa.Column("median", sa.Float(), nullable=False),
+        sa.Column("p75", sa.Float(), nullable=False),
+        sa.Column("p90", sa.Float(), nullable=False),
+        sa.Column("yoy_change", sa.Float(), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("year", "region", "school_type", name="uq_zonepricestat_group"),
+    )
+    op.create_index("ix_zonepricestat_region_school_type", "zonepricestat", ["region", "school_type", "year"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_zonepricestat_region_school_type", table_name="zonepricestat")
+    op.drop_table("zonepricestat")
+    op.drop_table("zonepricerollup")
+    op.drop_table("zonepriceobservation")
@@ -0,0 +1,66 @@
+"""annual fees
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 18:00:00
+
+Adds ``school.fee_annual_min``/``fee_annual_max``, the fee range normalized to
+NZD per year. Both are stored generated columns (see ``annual_fee_sql``), so
+every import path fills them and existing rows are computed here. The indexes
+serve ``sort=fee`` and the ``fee_gte``/``fee_lte`` filters as range scans.
+
+SQLite cannot add a stored generated column with ``ALTER TABLE``, so the
+table is rebuilt there.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copy of app.models.school.ANNUAL_MULTIPLIERS at this revision
+_MULTIPLIERS = {"per_week": 52, "per_month": 12, "per_term": 4, "per_semester": 2, "per_year": 1}
+
+
+def annual_fee_sql(fee: str) -> str:
+    units = " ".join(f"WHEN '{unit}' THEN {fee} * {count}" for unit, count in _MULTIPLIERS.items())
+    return (
+        f"CASE WHEN coalesce(fee_currency, 'NZD') = 'NZD' "
+        f"THEN CASE coalesce(fee_unit, 'per_year') {units} END END"
+    )
+
+
+def upgrade() -> None:
+    recreate = "always" if op.get_bind().dialect.name == "sqlite" else "auto"
+    with op.batch_alter_table("school", recreate=recreate) as batch:
+        batch.add_column(
+            sa.Column("fee_annual_min", sa.Float(), sa.Computed(annual_fee_sql("fee_min"), persisted=True))
+        )
+        batch.add_column(
+            sa.Column(
+                "fee_annual_max",
+                sa.Float(),
+                sa.Computed(annual_fee_sql("coalesce(fee_max, fee_min)"), persisted=True),
+            )
+        )
+
+    op.create_index("ix_school_fee_annual_min_id", "school", ["fee_annual_min", "id"])
+    op.create_index("ix_school_type_fee_annual_min_id", "school", ["school_type", "fee_annual_min", "id"])
+    op.create_index("ix_school_fee_annual_max", "school", ["fee_annual_max"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_school_fee_annual_max", table_name="school")
+    op.drop_index("ix_school_type_fee_annual_min_id", table_name="school")
+    op.drop_index("ix_school_fee_annual_min_id", table_name="school")
+
+    with op.batch_alter_table("school") as batch:
+        batch.drop_column("fee_annual_max")
+        batch.drop_column("fee_annual_min")
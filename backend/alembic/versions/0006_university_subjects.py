@@ -0,0 +1,102 @@
+"""university subjects
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 20:00:00
+
+Adds ``subject`` and the ``schoolsubject`` link table, the normalized form of
+``school.strong_subjects`` (see ``app.services.subjects``), filled here from
+the existing text. Also adds the partial indexes that ``/universities`` pages
+on, by name and by QS rank.
+"""
+import re
+import unicodedata
+from typing import Dict, Sequence, Set, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TERTIARY = sa.text(
+    "school_type IN ('institute_of_technology', 'private_tertiary', 'university') AND deleted_at IS NULL"
+)
+
+
+def _fold(value: str) -> str:
+    # Copy of app.services.search.fold at this revision
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r"[^0-9a-z]+", " ", stripped.casefold()).strip()
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    school = sa.table("school", sa.column("id"), sa.column("strong_subjects"))
+    subject = sa.table("subject", sa.column("id"), sa.column("key"), sa.column("name"))
+    link = sa.table("schoolsubject", sa.column("school_id"), sa.column("subject_id"))
+
+    names: Dict[str, str] = {}
+    pairs: Set[Tuple[int, str]] = set()
+    for school_id, text in bind.execute(
+        sa.select(school.c.id, school.c.strong_subjects).where(school.c.strong_subjects.is_not(None))
+    ):
+        for part in re.split(r"[,;\n]", text):
+            name = " ".join(part.split())
+            key = _fold(name)
+            if key:
+                names.setdefault(key, name)
+                pairs.add((school_id, key))
+    if not names:
+        return
+    op.bulk_insert(subject, [{"key": key, "name": name} for key, name in names.items()])
+    ids = dict(bind.execute(sa.select(subject.c.key, subject.c.id)).all())
+    op.bulk_insert(link, [{"school_id": school_id, "subject_id": ids[key]} for school_id, key in sorted(pairs)])
+
+
+def upgrade() -> None:
+    op.create_table(
+        "subject",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key"),
+    )
+    op.create_table(
+        "schoolsubject",
+        sa.Column("school_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["school_id"], ["school.id"]),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.PrimaryKeyConstraint("school_id", "subject_id"),
+    )
+    op.create_index("ix_schoolsubject_subject_school", "schoolsubject", ["subject_id", "school_id"])
+    op.create_index(
+        "ix_school_tertiary_name_id",
+        "school",
+        ["name", "id"],
+        postgresql_where=_TERTIARY,
+        sqlite_where=_TERTIARY,
+    )
+    op.create_index(
+        "ix_school_tertiary_qs_rank_id",
+        "school",
+        ["qs_world_rank", "id"],
+        postgresql_where=_TERTIARY,
+        sqlite_where=_TERTIARY,
+    )
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_school_tertiary_qs_rank_id", table_name="school")
+    op.drop_index("ix_school_tertiary_name_id", table_name="school")
+    op.drop_index("ix_schoolsubject_subject_school", table_name="schoolsubject")
+    op.drop_table("schoolsubject")
+    op.drop_table("subject")
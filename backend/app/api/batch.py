@@ -0,0 +1,40 @@
+"""
+Helpers for the ``POST .../batch`` lookup endpoints.
+
+A batch resolves its ids with one ``IN`` query. Found rows are returned in the
+order the ids were requested (each id once) and the ids without a row are
+listed under ``missing``.
+"""
+from typing import Any, Dict, Iterable, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.zone import SchoolZone
+from app.schemas.zone import ZoneRead
+
+ZONE_COLUMNS = [getattr(SchoolZone, field) for field in ZoneRead.model_fields]
+
+
+def unique_ids(ids: Iterable[int]) -> List[int]:
+    """``ids`` without repeats, in first-seen order."""
+    return list(dict.fromkeys(ids))
+
+
+def in_request_order(ids: Sequence[int], rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """The batch response envelope for ``rows`` found for the (unique) ``ids``."""
+    by_id = {row["id"]: row for row in rows}
+    return {
+        "items": [by_id[row_id] for row_id in ids if row_id in by_id],
+        "missing": [row_id for row_id in ids if row_id not in by_id],
+    }
+
+
+def zones_by_school(db: Session, school_ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Zones of all ``school_ids`` with one query, grouped by school."""
+    zones: Dict[int, List[Dict[str, Any]]] = {school_id: [] for school_id in school_ids}
+    if school_ids:
+        query = select(*ZONE_COLUMNS).where(SchoolZone.school_id.in_(school_ids)).order_by(SchoolZone.id)
+        for row in db.execute(query):
+            zones[row.school_id].append(row._asdict())
+    return zones
@@ -0,0 +1,209 @@
+"""
+HTTP caching for read-only catalogue endpoints.
+
+School data only changes when an importer runs and bumps the dataset version,
+so a GET response is fully determined by ``(dataset version, path, query)``;
+paths serving zone data add the zone data version.
+That makes two layers cheap:
+
+* **ETags** – derived from the version and the normalised URL, so a matching
+  ``If-None-Match`` is answered with ``304`` before the route runs at all.
+  ``If-None-Match: *`` only matches a representation that exists: a cached
+  body, or a ``200`` from the route.
+* **Response cache** – bodies keyed the same way, held in an in-process LRU
+  bounded by entry count and total bytes, or in a shared backend (Redis) when
+  ``settings.response_cache_url`` is set. The in-process cache is cleared
+  whenever a new school data version is observed; entries of older zone data
+  versions are never hit again and age out of the LRU.
+"""
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Protocol, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.dataset import current_version_async
+
+CachedResponse = Tuple[bytes, str]  # body, media type
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[CachedResponse]: ...
+
+    def set(self, key: str, value: CachedResponse) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by number of entries and total body bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        size = len(value[0])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[key] = value
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+class RedisCache:
+    """Shared cache for multiple workers; entries expire after ``ttl`` seconds."""
+
+    def __init__(self, url: str, ttl: int):
+        import redis  # optional dependency
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        value = self._client.hmget(f"kiwischools:{key}", "body", "media_type")
+        if value[0] is None:
+            return None
+        return value[0], value[1].decode()
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        name = f"kiwischools:{key}"
+        pipe = self._client.pipeline()
+        pipe.hset(name, mapping={"body": value[0], "media_type": value[1]})
+        pipe.expire(name, self._ttl)
+        pipe.execute()
+
+    def clear(self) -> None:
+        # Keys embed the dataset version, so stale entries are never read and
+        # simply expire
+        pass
+
+
+def create_cache_backend() -> CacheBackend:
+    if settings.response_cache_url:
+        return RedisCache(settings.response_cache_url, settings.response_cache_ttl_seconds)
+    return LRUCache(settings.response_cache_max_entries, settings.response_cache_max_bytes)
+
+
+def normalized_url(request: Request) -> str:
+    """Path plus query parameters sorted and with empty values dropped."""
+    params = sorted((k, v) for k, v in parse_qsl(request.url.query, keep_blank_values=False))
+    path = request.url.path.rstrip("/") or "/"
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def make_etag(version: str, url: str) -> str:
+    digest = hashlib.blake2b(f"{version}|{url}".encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _candidates(if_none_match: Optional[str]) -> set:
+    return {tag.strip() for tag in (if_none_match or "").split(",")}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether ``If-None-Match`` lists ``etag``; ``*`` is left to the caller."""
+    candidates = _candidates(if_none_match)
+    # Weak comparison: W/"x" and "x" match
+    return etag in candidates or etag[2:] in candidates
+
+
+def _under(path: str, prefixes) -> bool:
+    return any(path == prefix or path.startswith(prefix + "/") for prefix in prefixes)
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, backend: Optional[CacheBackend] = None):
+        super().__init__(app)
+        self.backend = backend or create_cache_backend()
+        self._version: Optional[str] = None
+
+    def _cacheable(self, request: Request) -> bool:
+        return request.method == "GET" and _under(request.url.path, settings.response_cache_paths)
+
+    async def dispatch(self, request: Request, call_next):
+        if not self._cacheable(request):
+            return await call_next(request)
+
+        async with AsyncSessionLocal() as db:
+            version = await current_version_async(db)
+            zone_version = None
+            if _under(request.url.path, settings.response_cache_zone_paths):
+                zone_version = await current_version_async(db, "zones")
+        if version != self._version:
+            self.backend.clear()
+            self._version = version
+        if zone_version is not None:
+            version = f"{version}.{zone_version}"
+
+        url = normalized_url(request)
+        etag = make_etag(version, url)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={settings.http_cache_max_age_seconds}",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        # ``*`` matches any current representation, so it waits until one is
+        # known to exist: a 404 or 422 from the route must not become a 304
+        any_match = "*" in _candidates(if_none_match)
+
+        key = f"{version}:{url}"
+        cached = self.backend.get(key)
+        if cached is not None:
+            if any_match:
+                return Response(status_code=304, headers=headers)
+            body, media_type = cached
+            return Response(content=body, media_type=media_type, headers={**headers, "X-Cache": "HIT"})
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        media_type = response.media_type or response.headers.get("content-type", "application/json")
+        self.backend.set(key, (body, media_type))
+        if any_match:
+            return Response(status_code=304, headers=headers)
+        response_headers = {
+            k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "content-type")
+        }
+        return Response(
+            content=body,
+            status_code=200,
+            media_type=media_type,
+            headers={**response_headers, **headers, "X-Cache": "MISS"},
+        )
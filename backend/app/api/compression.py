@@ -0,0 +1,149 @@
+"""
+Negotiated response compression.
+
+Responses are compressed with brotli when the client accepts ``br`` and the
+optional ``brotli`` package is installed, otherwise with gzip when the client
+accepts it. A body is only compressed once it reaches
+``settings.compression_minimum_bytes``, since small bodies gain nothing.
+Streamed bodies (the exports) are compressed chunk by chunk, and every chunk
+is flushed so the client receives rows as soon as they are produced instead
+of when the compressor's window fills.
+"""
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli  # optional dependency
+except ImportError:
+    brotli = None
+
+
+def _accepted_codings(accept_encoding: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The content coding to use for a request's ``Accept-Encoding``, if any."""
+    if not accept_encoding:
+        return None
+    accepted = _accepted_codings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    # Brotli first: on ties it wins
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class _Encoder:
+    def __init__(self, coding: str):
+        self.coding = coding
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        if self.coding == "br":
+            output = self._compressor.process(data)
+            return output + (self._compressor.finish() if final else self._compressor.flush())
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _Responder:
+    """
+    Wraps ``send`` for one response.
+
+    The start message and body chunks are held back until the body reaches the
+    minimum size (compress) or ends below it (send as is). Bodies are judged
+    by size rather than by whether they are streamed because the
+    ``BaseHTTPMiddleware`` layers re-send every body in chunks.
+    """
+
+    def __init__(self, send: Send, coding: str, minimum_size: int):
+        self.send = send
+        self.coding = coding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is not None:
+            body = self.encoder.compress(body, final=not more_body)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self.pending.append(body)
+        self.pending_size += len(body)
+        headers = MutableHeaders(raw=self.start["headers"])
+        if "content-encoding" in headers or (not more_body and self.pending_size < self.minimum_size):
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": b"".join(self.pending), "more_body": more_body})
+            return
+        if self.pending_size < self.minimum_size:
+            return
+
+        self.encoder = _Encoder(self.coding)
+        body = self.encoder.compress(b"".join(self.pending), final=not more_body)
+        self.pending = []
+        headers["Content-Encoding"] = self.coding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(send, coding, self.minimum_size))
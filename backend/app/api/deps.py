@@ -1,6 +1,33 @@
+import hmac
+from typing import AsyncIterator, Iterator, Optional
+
+from fastapi import Header, HTTPException
 from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_async_session, get_session
+
+
+def get_db() -> Iterator[Session]:
+    """Yield a request-scoped session; FastAPI closes it once the response is sent."""
+    yield from get_session()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async counterpart of ``get_db`` for ``async def`` routes."""
+    async for session in get_async_session():
+        yield session
+
 
-from app.db.session import get_session
+def require_admin(authorization: Optional[str] = Header(default=None)) -> None:
+    """
+    Guard operational endpoints with ``Authorization: Bearer <admin_token>``.
 
-def get_db() -> Session:
-    return next(get_session())
+    They do not exist (404) unless ``settings.admin_token`` is set.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
@@ -0,0 +1,71 @@
+"""
+Sparse fieldsets for the list endpoints.
+
+``fields`` is a comma-separated mix of ``SchoolRead`` field names and named
+presets, e.g. ``fields=card`` or ``fields=map,suburb``. The selected fields are
+the only columns the SQL query reads, so list and map pages skip the long
+text columns entirely. ``id`` and ``name`` are always included because pages
+are keyed on them, as is ``fee_annual_min`` with ``sort=fee``. Without
+``fields`` every field is returned.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.models.school import School
+from app.schemas.school import SchoolRead
+
+SCHOOL_FIELDS: Tuple[str, ...] = tuple(SchoolRead.model_fields)
+REQUIRED_FIELDS = ("id", "name")
+
+FIELD_PRESETS: Dict[str, Tuple[str, ...]] = {
+    # What SchoolCard and KindergartenCard render
+    "card": (
+        "id",
+        "name",
+        "school_type",
+        "region",
+        "city",
+        "suburb",
+        "brand_name",
+        "education_system",
+        "owner_or_group",
+        "fee_min",
+        "fee_max",
+        "fee_currency",
+        "fee_unit",
+    ),
+    "map": ("id", "name", "school_type", "city", "education_system", "latitude", "longitude"),
+    "detail": SCHOOL_FIELDS,
+}
+
+FIELDS_DESCRIPTION = (
+    "Comma-separated SchoolRead fields and/or presets (card, map, detail); all fields when omitted"
+)
+
+
+def parse_fields(value: Optional[str], also: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    """
+    Resolve a ``fields`` parameter to field names in ``SchoolRead`` order.
+
+    ``also`` are fields the caller needs in every row, e.g. the sort key.
+    """
+    if not value:
+        return SCHOOL_FIELDS
+    requested = set(REQUIRED_FIELDS + also)
+    for part in value.split(","):
+        name = part.strip()
+        if not name:
+            continue
+        if name in FIELD_PRESETS:
+            requested.update(FIELD_PRESETS[name])
+        elif name in SCHOOL_FIELDS:
+            requested.add(name)
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+    return tuple(field for field in SCHOOL_FIELDS if field in requested)
+
+
+def field_columns(fields: Tuple[str, ...]) -> List[InstrumentedAttribute]:
+    return [getattr(School, field) for field in fields]
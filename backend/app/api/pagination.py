@@ -0,0 +1,196 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Rows are ordered by ``(name, id)`` so the ordering is stable even when names
+repeat, or by a nullable numeric column and id (``fee_annual_min`` with
+``sort=fee``, ``qs_world_rank`` with ``sort=qs_rank``) with the rows where it
+is null last, ordered by id. The cursor is an opaque base64 token holding
+the sort key of the last row on the previous page, which lets the next page
+start with an index seek instead of an ``OFFSET`` scan. ``paginate_table``
+serves the same envelope and cursors from the in-memory catalogue.
+"""
+import base64
+import binascii
+import json
+import time
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.models.school import School
+from app.services.catalogue import CatalogueTable
+from app.services.dataset import current_version
+
+_count_cache: Dict[str, Tuple[float, int]] = {}
+_count_cache_lock = Lock()
+_COUNT_CACHE_MAX_ENTRIES = 1024
+
+# The row field each sort orders by before id
+SORT_FIELDS = {"name": "name", "fee": "fee_annual_min", "qs_rank": "qs_world_rank"}
+
+
+def encode_cursor(key: Any, row_id: int, page: int) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    raw = json.dumps([key, row_id, page], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _valid_key(key: Any, sort: str) -> bool:
+    if sort != "name":
+        return key is None or (isinstance(key, (int, float)) and not isinstance(key, bool))
+    return isinstance(key, str)
+
+
+def decode_cursor(cursor: str, sort: str = "name") -> Tuple[Any, int, int]:
+    """Decode a cursor produced by ``encode_cursor`` for a page sorted by ``sort``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, row_id, page = json.loads(base64.urlsafe_b64decode(padded))
+        if not _valid_key(key, sort) or not isinstance(row_id, int) or not isinstance(page, int):
+            raise ValueError("malformed cursor")
+        return key, row_id, page
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def count_rows(db: Session, query: Select) -> int:
+    """
+    Count the rows matched by ``query``.
+
+    Counts are cached per filter set and dataset version (for at most
+    ``count_cache_ttl_seconds``) because ``COUNT(*)`` has to visit every
+    matching row, while the page itself only touches ``limit`` rows.
+    """
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    key = current_version(db) + ":" + str(count_query.compile(compile_kwargs={"literal_binds": True}))
+    now = time.monotonic()
+
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    total = db.execute(count_query).scalar_one()
+
+    with _count_cache_lock:
+        if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.clear()
+        _count_cache[key] = (now + settings.count_cache_ttl_seconds, total)
+    return total
+
+
+def _nullable_page(
+    db: Session, query: Select, column: Any, limit: int, after: Optional[Tuple[Any, int]]
+) -> List[Dict[str, Any]]:
+    """
+    Up to ``limit`` rows by ``(column, id)``, then the rows where ``column`` is null by id.
+
+    Each part is its own index range scan; ``NULLS LAST`` with a keyset
+    condition spanning both parts could not use the index.
+    """
+    rows: List[Dict[str, Any]] = []
+    if after is None or after[0] is not None:
+        known = query.where(column.is_not(None))
+        if after is not None:
+            known = known.where(tuple_(column, School.id) > tuple_(*after))
+        rows = [row._asdict() for row in db.execute(known.order_by(column, School.id).limit(limit))]
+    if len(rows) < limit:
+        unknown = query.where(column.is_(None))
+        if after is not None and after[0] is None:
+            unknown = unknown.where(School.id > after[1])
+        rows += [row._asdict() for row in db.execute(unknown.order_by(School.id).limit(limit - len(rows)))]
+    return rows
+
+
+def paginate(
+    db: Session,
+    query: Select,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = "name",
+) -> Dict[str, Any]:
+    """
+    Apply keyset pagination on ``(School.name, School.id)`` to ``query``, or
+    on another ``SORT_FIELDS`` column (``sort="fee"``, ``sort="qs_rank"``).
+
+    ``query`` selects columns (see ``app.api.fields``), not ORM entities, and
+    must include ``id`` and the sort field (``SORT_FIELDS``). Returns a dict
+    matching the ``PaginatedSchools`` response envelope with each row as a
+    plain dict.
+    """
+    total = count_rows(db, query)
+
+    page = 1
+    after = None
+    if cursor:
+        last_key, last_id, previous_page = decode_cursor(cursor, sort)
+        after = (last_key, last_id)
+        page = previous_page + 1
+
+    if sort != "name":
+        rows = _nullable_page(db, query, getattr(School, SORT_FIELDS[sort]), limit + 1, after)
+    else:
+        if after is not None:
+            query = query.where(tuple_(School.name, School.id) > tuple_(*after))
+        query = query.order_by(School.name, School.id).limit(limit + 1)
+        rows = [row._asdict() for row in db.execute(query)]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[SORT_FIELDS[sort]], last["id"], page)
+
+    return {
+        "items": rows,
+        "total": total,
+        "page": page,
+        "page_size": limit,
+        "next_cursor": next_cursor,
+    }
+
+
+def paginate_table(
+    table: CatalogueTable,
+    mask: Any,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    sort: str = "name",
+) -> Dict[str, Any]:
+    """
+    ``paginate`` over the rows of ``table`` selected by the boolean ``mask``,
+    reduced to ``fields`` when given.
+    """
+    total = int(mask.sum())
+
+    page, start = 1, 0
+    if cursor:
+        last_key, last_id, previous_page = decode_cursor(cursor, sort)
+        start = table.start_after(last_key, last_id, sort=sort)
+        page = previous_page + 1
+
+    rows = table.page(mask, start=start, limit=limit + 1, sort=sort)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[SORT_FIELDS[sort]], last["id"], page)
+    if fields is not None:
+        rows = [{field: row[field] for field in fields} for row in rows]
+
+    return {
+        "items": rows,
+        "total": total,
+        "page": page,
+        "page_size": limit,
+        "next_cursor": next_cursor,
+    }
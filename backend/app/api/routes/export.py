@@ -0,0 +1,106 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+from app.api.fields import FIELDS_DESCRIPTION, field_columns, parse_fields
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.school import School
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def export_query(
+    fields: Tuple[str, ...],
+    school_type: Optional[str],
+    region: Optional[str],
+    city: Optional[str],
+    suburb: Optional[str],
+) -> Select:
+    query = select(*field_columns(fields)).where(School.deleted_at.is_(None)).order_by(School.id)
+    if school_type:
+        query = query.where(School.school_type == school_type)
+    if region:
+        query = query.where(School.region == region)
+    if city:
+        query = query.where(func.lower(School.city) == city.lower())
+    if suburb:
+        query = query.where(School.suburb == suburb)
+    return query
+
+
+async def stream_rows(query: Select) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield the rows of ``query`` in batches of ``export_batch_size``.
+
+    Rows come from a server-side cursor, so memory use does not depend on the
+    table size. The stream owns its session: the request-scoped one is closed
+    before a streamed body is sent.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=settings.export_batch_size))
+        async for partition in result.partitions():
+            yield [row._asdict() for row in partition]
+
+
+async def ndjson_lines(query: Select) -> AsyncIterator[bytes]:
+    async for rows in stream_rows(query):
+        yield b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+async def csv_lines(query: Select, fields: Tuple[str, ...]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue().encode("utf-8")
+    async for rows in stream_rows(query):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(row.values() for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _attachment(filename: str) -> Dict[str, str]:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+@router.get("/schools.ndjson")
+async def export_schools_ndjson(
+    school_type: Optional[str] = Query(default=None),
+    region: Optional[str] = Query(default=None),
+    city: Optional[str] = Query(default=None),
+    suburb: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+) -> StreamingResponse:
+    """
+    Every active school as newline-delimited JSON, one object per line, ordered by id.
+
+    The body is streamed while it is read from the database and is compressed
+    when the client sends `Accept-Encoding: br` or `gzip`.
+    """
+    query = export_query(parse_fields(fields), school_type, region, city, suburb)
+    return StreamingResponse(
+        ndjson_lines(query), media_type="application/x-ndjson", headers=_attachment("schools.ndjson")
+    )
+
+
+@router.get("/schools.csv")
+async def export_schools_csv(
+    school_type: Optional[str] = Query(default=None),
+    region: Optional[str] = Query(default=None),
+    city: Optional[str] = Query(default=None),
+    suburb: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+) -> StreamingResponse:
+    """Every active school as CSV with a header row, ordered by id; streamed like the NDJSON export."""
+    selected = parse_fields(fields)
+    query = export_query(selected, school_type, region, city, suburb)
+    return StreamingResponse(
+        csv_lines(query, selected), media_type="text/csv; charset=utf-8", headers=_attachment("schools.csv")
+    )
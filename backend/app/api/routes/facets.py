@@ -0,0 +1,74 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_async_db
+from app.schemas.facets import FacetCounts, RegionRead
+from app.services.facets import FACET_FIELDS, facet_index
+from app.services.search import name_matches
+
+router = APIRouter(tags=["facets"])
+
+Category = Literal["school", "kindergarten", "university"]
+
+
+@router.get("/facets", response_model=FacetCounts)
+async def get_facets(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    region: List[str] = Query(default=[]),
+    city: List[str] = Query(default=[]),
+    suburb: List[str] = Query(default=[]),
+    school_type: List[str] = Query(default=[]),
+    education_system: List[str] = Query(default=[]),
+    fee_band: List[str] = Query(default=[], description="free, under_5k, 5k_15k, 15k_30k or over_30k"),
+    type: Optional[Category] = Query(default=None, description="Restrict to a search category"),
+    name: Optional[str] = Query(default=None, description="Search by name keyword, as on the list endpoints"),
+    limit: int = Query(default=100, ge=1, le=5000, description="Maximum values per facet"),
+) -> Dict[str, Any]:
+    """
+    Counts per region, city, suburb, school type, education system and fee band
+    for the current filters, in one request.
+
+    Repeat a parameter to accept several values (OR); different parameters
+    combine with AND. Each facet is counted with every filter except its own.
+    """
+    filters = {
+        "region": region,
+        "city": city,
+        "suburb": suburb,
+        "school_type": school_type,
+        "education_system": education_system,
+        "fee_band": fee_band,
+        "category": [type] if type else [],
+    }
+
+    def run(session: Session) -> Dict[str, Any]:
+        index = facet_index.get(session)
+        restrict = None
+        if name:
+            restrict = index.select_ids(name_matches(session, name))
+        total, facets = index.counts(filters, restrict=restrict, limit=limit)
+        return {
+            "total": total,
+            "facets": {
+                field: [{"value": value, "count": count} for value, count in facets[field]]
+                for field in FACET_FIELDS
+            },
+        }
+
+    return await db.run_sync(run)
+
+
+@router.get("/regions", response_model=List[RegionRead])
+async def list_regions(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    type: Optional[Category] = Query(default=None),
+) -> List[Dict[str, Any]]:
+    """Regions with the number of schools (or kindergartens, universities) in each."""
+    index = await db.run_sync(facet_index.get)
+    _, facets = index.counts({"category": [type] if type else []}, fields=("region",))
+    return [{"name": value, "count": count} for value, count in sorted(facets["region"])]
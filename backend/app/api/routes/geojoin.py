@@ -0,0 +1,86 @@
+import asyncio
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, ORJSONResponse
+
+from app.core.config import settings
+from app.schemas.geojoin import GeoJoinJob
+from app.services.geojoin import job_store, submit_job
+
+router = APIRouter(prefix="/geojoin", tags=["geojoin"])
+
+
+def _input_format(request: Request, format: Optional[str]) -> str:
+    if format:
+        return format
+    return "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+
+@router.post("/jobs", response_model=GeoJoinJob, status_code=202)
+async def create_job(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(
+        default=None, description="Format of the body; taken from Content-Type (text/csv) when omitted"
+    ),
+) -> ORJSONResponse:
+    """
+    Queue a bulk geo-join of the points in the request body.
+
+    The body is a CSV file with a header row or NDJSON, one point per row or
+    line, with `lat`/`latitude`, `lng`/`lon`/`longitude` and an optional `id`
+    or `ref` that is echoed back. For every point the result holds the
+    nearest school of each type (`nearest`) and the zones containing it
+    (`zones`). Poll `GET /geojoin/jobs/{id}` until `status` is `done`, then
+    stream `GET /geojoin/jobs/{id}/result`.
+    """
+    job = job_store.create(_input_format(request, format))
+    size = 0
+    rows = 0
+    try:
+        with open(job_store.input_path(job["id"]), "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                rows += chunk.count(b"\n")
+                if size > settings.geojoin_max_upload_bytes:
+                    raise HTTPException(status_code=413, detail="Upload is too large")
+                # Header row plus the points
+                if rows > settings.geojoin_max_points + 1:
+                    raise HTTPException(
+                        status_code=413, detail=f"At most {settings.geojoin_max_points} points per job"
+                    )
+                await asyncio.to_thread(f.write, chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="No points in the request body")
+    except BaseException:
+        job_store.delete(job["id"])
+        raise
+
+    submit_job(job["id"])
+    return ORJSONResponse(job, status_code=202, headers={"Location": f"/geojoin/jobs/{job['id']}"})
+
+
+def _load_job(job_id: str) -> dict:
+    job = job_store.load(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=GeoJoinJob)
+async def get_job(job_id: str) -> ORJSONResponse:
+    """Status of a job, with the points processed so far and the throughput in points per second."""
+    return ORJSONResponse(await asyncio.to_thread(_load_job, job_id))
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str) -> FileResponse:
+    """The joined points as NDJSON, one line per input point in input order; streamed from disk."""
+    job = await asyncio.to_thread(_load_job, job_id)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return FileResponse(
+        job_store.result_path(job_id),
+        media_type="application/x-ndjson",
+        filename=f"geojoin-{job_id}.ndjson",
+    )
@@ -1,60 +1,135 @@
-from typing import List, Optional
+from typing import Any, Dict, Literal, Optional, Sequence, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
+from app.api.fields import FIELDS_DESCRIPTION, field_columns, parse_fields
+from app.api.pagination import SORT_FIELDS, paginate, paginate_table
+from app.core.config import settings
 from app.models.school import School
-from app.schemas.school import SchoolRead
+from app.schemas.school import PaginatedSchools, SchoolRead
+from app.services.catalogue import catalogue, use_memory_catalogue
+from app.services.search import name_filter, name_matches
 
 router = APIRouter(prefix="/kindergartens", tags=["kindergartens"])
 
 
-@router.get("/", response_model=List[SchoolRead])
-def list_kindergartens(
+def kindergarten_list_query(
+    session: Session,
+    selected: Sequence[str],
     *,
-    db: Session = Depends(get_db),
+    name: Optional[str] = None,
+    city: Optional[str] = None,
+    region: Optional[str] = None,
+    education_system: Optional[str] = None,
+    fee_gte: Optional[float] = None,
+    fee_lte: Optional[float] = None,
+) -> Select:
+    """The unpaginated SQL query of ``GET /kindergartens``."""
+    query = select(*field_columns(selected)).where(School.school_type == "kindergarten", School.deleted_at.is_(None))
+
+    if name:
+        query = query.where(name_filter(session, name))
+    if city:
+        query = query.where(func.lower(School.city) == city.lower())
+    if region:
+        query = query.where(School.region == region)
+    if education_system:
+        query = query.where(School.education_system == education_system)
+
+    # Range conditions on the stored annual fee columns, so both are index scans
+    if fee_gte is not None:
+        query = query.where(School.fee_annual_max >= fee_gte)
+    if fee_lte is not None:
+        query = query.where(School.fee_annual_min <= fee_lte)
+    return query
+
+
+@router.get("/", response_model=PaginatedSchools)
+async def list_kindergartens(
+    *,
+    db: AsyncSession = Depends(get_async_db),
     name: Optional[str] = Query(default=None, description="Search by kindergarten name keyword"),
     city: Optional[str] = Query(default=None, description="Filter by city"),
     region: Optional[str] = Query(default=None, description="Filter by region"),
     education_system: Optional[str] = Query(default=None, description="Filter by education system (e.g., Montessori, Reggio Emilia)"),
-) -> List[School]:
+    limit: int = Query(default=settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's next_cursor"),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    fee_gte: Optional[float] = Query(default=None, ge=0, description="Annual fee range (NZD) reaches at least this"),
+    fee_lte: Optional[float] = Query(default=None, ge=0, description="Annual fee range (NZD) starts at or below this"),
+    sort: Literal["name", "fee"] = Query(default="name", description="fee: lowest annual fee first, unknown fees last"),
+) -> ORJSONResponse:
     """
-    List all kindergartens with optional filtering.
+    List kindergartens with optional filtering, one page at a time.
     
-    - **name**: Search by kindergarten name (partial match, case-insensitive)
+    - **name**: Search by kindergarten name, suburb or brand (fuzzy, ignores case and macrons)
     - **city**: Filter by city
     - **region**: Filter by region
     - **education_system**: Filter by education system
+    - **limit**: Page size
+    - **cursor**: Pass the previous response's `next_cursor` to fetch the next page
+    - **fields**: Only return these fields, e.g. `card` for list views
+    - **fee_gte**, **fee_lte**: Only kindergartens whose annual fee range overlaps these bounds (NZD per year)
+    - **sort**: `name` (default) or `fee`, lowest annual fee first with unknown fees last
     """
-    query = select(School).where(School.school_type == "kindergarten")
+    # Pages are plain dicts of SchoolRead fields and are serialized as they
+    # are; response_model only documents the shape
+    if fee_gte is not None and fee_lte is not None and fee_gte > fee_lte:
+        raise HTTPException(status_code=400, detail="fee_gte must not exceed fee_lte")
+    selected = parse_fields(fields, also=(SORT_FIELDS[sort],))
+    if use_memory_catalogue():
+        table = await db.run_sync(catalogue.get)
+        ids = await db.run_sync(name_matches, name) if name else None
+        mask = table.mask(
+            {"school_type": "kindergarten", "city": city, "region": region, "education_system": education_system},
+            ids,
+            fee_gte=fee_gte,
+            fee_lte=fee_lte,
+        )
+        return ORJSONResponse(
+            paginate_table(table, mask, limit=limit, cursor=cursor, fields=selected, sort=sort)
+        )
 
-    if name:
-        like_pattern = f"%{name}%"
-        query = query.where(School.name.ilike(like_pattern))
-    if city:
-        query = query.where(School.city == city)
-    if region:
-        query = query.where(School.region == region)
-    if education_system:
-        query = query.where(School.education_system == education_system)
+    def run(session: Session) -> Dict[str, Any]:
+        query = kindergarten_list_query(
+            session,
+            selected,
+            name=name,
+            city=city,
+            region=region,
+            education_system=education_system,
+            fee_gte=fee_gte,
+            fee_lte=fee_lte,
+        )
+        return paginate(session, query, limit=limit, cursor=cursor, sort=sort)
 
-    result = db.execute(query).scalars().all()
-    return result
+    return ORJSONResponse(await db.run_sync(run))
 
 
 @router.get("/{kindergarten_id}", response_model=SchoolRead)
-def get_kindergarten(
-    *, db: Session = Depends(get_db), kindergarten_id: int
-) -> School:
+async def get_kindergarten(
+    *, db: AsyncSession = Depends(get_async_db), kindergarten_id: int
+) -> Union[School, Dict[str, Any]]:
     """
     Get a specific kindergarten by ID.
     """
-    kindergarten = db.get(School, kindergarten_id)
+    if use_memory_catalogue():
+        kindergarten = (await db.run_sync(catalogue.get)).get(kindergarten_id)
+        if kindergarten is None or kindergarten["school_type"] != "kindergarten":
+            raise HTTPException(status_code=404, detail="Kindergarten not found")
+        return kindergarten
+
+    kindergarten = await db.get(School, kindergarten_id)
     if not kindergarten:
         raise HTTPException(status_code=404, detail="Kindergarten not found")
-    if kindergarten.school_type != "kindergarten":
+    if kindergarten.school_type != "kindergarten" or kindergarten.deleted_at is not None:
         raise HTTPException(status_code=404, detail="Kindergarten not found")
     return kindergarten
 
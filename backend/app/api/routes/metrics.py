@@ -0,0 +1,25 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import require_admin
+from app.db.instrumentation import query_metrics
+
+# Statement text and resets are for operators only, see require_admin
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/queries")
+def get_query_metrics(top: int = Query(default=20, ge=1, le=500)) -> Dict[str, Any]:
+    """
+    Aggregate query timings since startup (or the last reset).
+
+    - **routes**: requests, queries and database time per route
+    - **statements**: the **top** statements by total database time
+    """
+    return query_metrics.snapshot(top=top)
+
+
+@router.delete("/queries", status_code=204)
+def reset_query_metrics() -> None:
+    query_metrics.reset()
@@ -1,50 +1,224 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import get_db
+from app.api.batch import in_request_order, unique_ids, zones_by_school
+from app.api.deps import get_async_db
+from app.api.fields import FIELDS_DESCRIPTION, field_columns, parse_fields
+from app.api.pagination import SORT_FIELDS, paginate, paginate_table
+from app.core.config import settings
 from app.models.school import School
-from app.schemas.school import SchoolRead
+from app.schemas.batch import IdBatch
+from app.schemas.school import MapView, PaginatedSchools, SchoolBatch, SchoolNearby, SchoolRead
+from app.services.catalogue import catalogue, use_memory_catalogue
+from app.services.clustering import map_index
+from app.services.search import name_filter, name_matches
+from app.services.spatial import find_nearby
 
 router = APIRouter(prefix="/schools", tags=["schools"])
 
 
-@router.get("/", response_model=List[SchoolRead])
-def list_schools(
+def school_list_query(
+    session: Session,
+    selected: Sequence[str],
     *,
-    db: Session = Depends(get_db),
-    school_type: Optional[str] = Query(default=None),
-    region: Optional[str] = Query(default=None),
-    city: Optional[str] = Query(default=None),
-    suburb: Optional[str] = Query(default=None),
-    name: Optional[str] = Query(default=None, description="Search by school name keyword"),
-) -> List[School]:
-    query = select(School)
+    school_type: Optional[str] = None,
+    region: Optional[str] = None,
+    city: Optional[str] = None,
+    suburb: Optional[str] = None,
+    name: Optional[str] = None,
+    fee_gte: Optional[float] = None,
+    fee_lte: Optional[float] = None,
+) -> Select:
+    """The unpaginated SQL query of ``GET /schools``."""
+    query = select(*field_columns(selected)).where(School.deleted_at.is_(None))
 
     if school_type:
         query = query.where(School.school_type == school_type)
     if region:
         query = query.where(School.region == region)
     if city:
-        query = query.where(School.city == city)
+        # Case-insensitive, as the city filter is typed by hand
+        query = query.where(func.lower(School.city) == city.lower())
     if suburb:
         query = query.where(School.suburb == suburb)
     if name:
-        like_pattern = f"%{name}%"
-        query = query.where(School.name.ilike(like_pattern))
+        query = query.where(name_filter(session, name))
 
-    result = db.execute(query).scalars().all()
-    return result
+    # Range conditions on the stored annual fee columns, so both are index scans
+    if fee_gte is not None:
+        query = query.where(School.fee_annual_max >= fee_gte)
+    if fee_lte is not None:
+        query = query.where(School.fee_annual_min <= fee_lte)
+    return query
+
+
+@router.get("/", response_model=PaginatedSchools)
+async def list_schools(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    school_type: Optional[str] = Query(default=None),
+    region: Optional[str] = Query(default=None),
+    city: Optional[str] = Query(default=None),
+    suburb: Optional[str] = Query(default=None),
+    name: Optional[str] = Query(default=None, description="Search by school name keyword"),
+    limit: int = Query(default=settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's next_cursor"),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    fee_gte: Optional[float] = Query(default=None, ge=0, description="Annual fee range (NZD) reaches at least this"),
+    fee_lte: Optional[float] = Query(default=None, ge=0, description="Annual fee range (NZD) starts at or below this"),
+    sort: Literal["name", "fee"] = Query(default="name", description="fee: lowest annual fee first, unknown fees last"),
+) -> ORJSONResponse:
+    # Pages are plain dicts of SchoolRead fields and are serialized as they
+    # are; response_model only documents the shape
+    if fee_gte is not None and fee_lte is not None and fee_gte > fee_lte:
+        raise HTTPException(status_code=400, detail="fee_gte must not exceed fee_lte")
+    selected = parse_fields(fields, also=(SORT_FIELDS[sort],))
+    if use_memory_catalogue():
+        table = await db.run_sync(catalogue.get)
+        ids = await db.run_sync(name_matches, name) if name else None
+        mask = table.mask(
+            {"school_type": school_type, "region": region, "city": city, "suburb": suburb},
+            ids,
+            fee_gte=fee_gte,
+            fee_lte=fee_lte,
+        )
+        return ORJSONResponse(
+            paginate_table(table, mask, limit=limit, cursor=cursor, fields=selected, sort=sort)
+        )
+
+    def run(session: Session) -> Dict[str, Any]:
+        query = school_list_query(
+            session,
+            selected,
+            school_type=school_type,
+            region=region,
+            city=city,
+            suburb=suburb,
+            name=name,
+            fee_gte=fee_gte,
+            fee_lte=fee_lte,
+        )
+        return paginate(session, query, limit=limit, cursor=cursor, sort=sort)
+
+    return ORJSONResponse(await db.run_sync(run))
+
+
+@router.post("/batch", response_model=SchoolBatch)
+async def get_schools_batch(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    batch: IdBatch,
+    include: Optional[Literal["zones"]] = Query(default=None, description="zones: embed each school's zones"),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+) -> ORJSONResponse:
+    """
+    Look up many schools (or kindergartens, universities) by id in one request.
+
+    Items keep the order of **ids**; ids that do not exist or were removed are
+    listed in `missing`. With **include=zones** each school carries its zones,
+    loaded with one extra query for the whole batch.
+    """
+    ids = unique_ids(batch.ids)
+    selected = parse_fields(fields)
+
+    def run(session: Session) -> Dict[str, Any]:
+        if use_memory_catalogue():
+            table = catalogue.get(session)
+            found = (table.get(school_id) for school_id in ids)
+            rows = [{field: row[field] for field in selected} for row in found if row is not None]
+        else:
+            query = select(*field_columns(selected)).where(School.id.in_(ids), School.deleted_at.is_(None))
+            rows = [row._asdict() for row in session.execute(query)]
+        if include == "zones":
+            zones = zones_by_school(session, [row["id"] for row in rows])
+            for row in rows:
+                row["zones"] = zones[row["id"]]
+        return in_request_order(ids, rows)
+
+    return ORJSONResponse(await db.run_sync(run))
+
+
+@router.get("/nearby", response_model=List[SchoolNearby])
+async def list_nearby_schools(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    radius_km: Optional[float] = Query(default=None, gt=0, description="Only return schools within this distance"),
+    school_type: Optional[str] = Query(default=None),
+    limit: int = Query(default=settings.default_page_size, ge=1, le=settings.max_nearby_results),
+) -> List[Dict[str, Any]]:
+    """
+    List the schools nearest to a point, ordered by great-circle distance.
+
+    Without **radius_km** this is a plain k-nearest-neighbour query.
+    """
+    matches = await db.run_sync(
+        find_nearby, lat, lng, limit=limit, radius_km=radius_km, school_type=school_type
+    )
+    return [
+        {**SchoolRead.model_validate(school).model_dump(), "distance_km": round(distance, 3)}
+        for school, distance in matches
+    ]
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse ``min_lng,min_lat,max_lng,max_lat``."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise HTTPException(status_code=400, detail="bbox is out of range")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+@router.get("/map", response_model=MapView)
+async def get_map_view(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    bbox: str = Query(description="Viewport as min_lng,min_lat,max_lng,max_lat"),
+    zoom: int = Query(ge=0, le=22),
+    school_type: Optional[str] = Query(default=None),
+) -> Dict[str, Any]:
+    """
+    Markers for a map viewport.
+
+    Up to the configured cluster zoom, nearby schools are merged into clusters
+    with a count; beyond it every school in the viewport is returned as a point.
+    """
+    index = await db.run_sync(map_index.get)
+    clusters = index.query(parse_bbox(bbox), zoom, school_type)
+    return {
+        "zoom": zoom,
+        "clusters": [
+            {"latitude": c.latitude, "longitude": c.longitude, "count": c.count}
+            for c in clusters
+            if c.point is None
+        ],
+        "points": [c.point for c in clusters if c.point is not None],
+    }
 
 
 @router.get("/{school_id}", response_model=SchoolRead)
-def get_school(
-    *, db: Session = Depends(get_db), school_id: int
-) -> School:
-    school = db.get(School, school_id)
-    if not school:
+async def get_school(
+    *, db: AsyncSession = Depends(get_async_db), school_id: int
+) -> Union[School, Dict[str, Any]]:
+    if use_memory_catalogue():
+        school = (await db.run_sync(catalogue.get)).get(school_id)
+        if school is None:
+            raise HTTPException(status_code=404, detail="School not found")
+        return school
+
+    school = await db.get(School, school_id)
+    if not school or school.deleted_at is not None:
         raise HTTPException(status_code=404, detail="School not found")
     return school
 
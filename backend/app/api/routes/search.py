@@ -0,0 +1,30 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.schemas.search import SearchResult
+from app.services.search import SearchHit, search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/", response_model=List[SearchResult])
+def search_all(
+    *,
+    db: Session = Depends(get_db),
+    q: str = Query(min_length=1, description="Name, suburb or brand to search for"),
+    type: Optional[Literal["school", "kindergarten", "university"]] = Query(
+        default=None, description="Restrict results to one category"
+    ),
+    limit: int = Query(default=settings.default_page_size, ge=1, le=settings.max_search_results),
+) -> List[SearchHit]:
+    """
+    Fuzzy search across schools, kindergartens and universities.
+
+    Matching ignores case and macrons ("Otahuhu" finds "Ōtāhuhu") and tolerates
+    small typos. Results are ordered by relevance.
+    """
+    return search(db, q, category=type, limit=limit)
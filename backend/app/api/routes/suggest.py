@@ -0,0 +1,27 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.schemas.search import SuggestionRead
+from app.services.suggest import Suggestion, suggest_index
+
+router = APIRouter(prefix="/suggest", tags=["search"])
+
+
+@router.get("/", response_model=List[SuggestionRead])
+def suggest(
+    *,
+    db: Session = Depends(get_db),
+    q: str = Query(min_length=1, description="What the user has typed so far"),
+    type: Optional[Literal["school", "kindergarten", "university"]] = Query(default=None),
+    limit: int = Query(default=10, ge=1, le=settings.max_suggestions),
+) -> List[Suggestion]:
+    """
+    Typeahead suggestions for names starting with **q** (or with a word starting with **q**).
+
+    Answered from an in-memory prefix index, so it is cheap enough to call on every keystroke.
+    """
+    return suggest_index.get(db).suggest(q, category=type, limit=limit)
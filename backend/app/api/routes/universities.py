@@ -0,0 +1,135 @@
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_async_db
+from app.api.fields import FIELDS_DESCRIPTION, SCHOOL_FIELDS, field_columns, parse_fields
+from app.api.pagination import SORT_FIELDS, paginate
+from app.core.config import settings
+from app.models.school import School
+from app.schemas.university import PaginatedUniversities, SubjectRead, SubjectTop, UniversityRead
+from app.services.search import category_filter, name_filter
+from app.services.subjects import subject_counts, subject_filter, subjects_by_school, top_by_subject
+
+router = APIRouter(prefix="/universities", tags=["universities"])
+
+SUBJECT_DESCRIPTION = "Strong subject, matched ignoring case and macrons; repeat for any of several"
+
+
+def _universities():
+    return select(*field_columns(SCHOOL_FIELDS)).where(category_filter("university"), School.deleted_at.is_(None))
+
+
+def _with_subjects(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    subjects = subjects_by_school(db, [row["id"] for row in rows])
+    for row in rows:
+        row["subjects"] = subjects[row["id"]]
+    return rows
+
+
+def university_list_query(
+    session: Session,
+    selected: Sequence[str],
+    *,
+    name: Optional[str] = None,
+    university_type: Optional[str] = None,
+    subject: Optional[Sequence[str]] = None,
+) -> Select:
+    """The unpaginated SQL query of ``GET /universities``."""
+    query = select(*field_columns(selected)).where(category_filter("university"), School.deleted_at.is_(None))
+    if university_type:
+        query = query.where(School.university_type == university_type)
+    if subject:
+        query = query.where(subject_filter(session, subject))
+    if name:
+        query = query.where(name_filter(session, name))
+    return query
+
+
+@router.get("", response_model=PaginatedUniversities)
+async def list_universities(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    name: Optional[str] = Query(default=None),
+    university_type: Optional[str] = Query(default=None),
+    subject: Optional[List[str]] = Query(default=None, description=SUBJECT_DESCRIPTION),
+    sort: Literal["name", "qs_rank"] = Query(default="name", description="qs_rank: best QS rank first, unranked last"),
+    limit: int = Query(default=settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's next_cursor"),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+) -> ORJSONResponse:
+    """
+    List universities, institutes of technology and private tertiary providers.
+
+    - **name**: Fuzzy name search
+    - **university_type**: Filter by university type
+    - **subject**: Only providers strong in this subject (repeat for any of several)
+    - **sort**: `name` (default) or `qs_rank`
+    - **limit**, **cursor**: Keyset pagination, as for `/schools`
+    - **fields**: Only return these fields; `subjects` is always included
+    """
+    selected = parse_fields(fields, also=(SORT_FIELDS[sort],))
+
+    def run(session: Session) -> Dict[str, Any]:
+        query = university_list_query(session, selected, name=name, university_type=university_type, subject=subject)
+        page = paginate(session, query, limit=limit, cursor=cursor, sort=sort)
+        _with_subjects(session, page["items"])
+        return page
+
+    return ORJSONResponse(await db.run_sync(run))
+
+
+@router.get("/subjects", response_model=List[SubjectRead])
+async def list_subjects(*, db: AsyncSession = Depends(get_async_db)) -> List[Dict[str, Any]]:
+    """
+    Every strong subject with the number of universities offering it.
+    """
+    return await db.run_sync(subject_counts)
+
+
+@router.get("/top", response_model=List[SubjectTop])
+async def top_universities(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    k: int = Query(default=5, ge=1, le=settings.max_page_size, description="Universities per subject"),
+    subject: Optional[List[str]] = Query(default=None, description=SUBJECT_DESCRIPTION),
+    university_type: Optional[str] = Query(default=None),
+) -> ORJSONResponse:
+    """
+    The **k** best QS-ranked universities in each subject (every subject by
+    default), ranked in a single query. Universities without a QS rank are
+    left out; use `sort=qs_rank` on the list for an overall ranking.
+    """
+
+    def run(session: Session) -> List[Dict[str, Any]]:
+        groups = top_by_subject(session, k=k, subjects=subject, university_type=university_type)
+        ids = sorted({school_id for group in groups for school_id in group["school_ids"]})
+        rows = [row._asdict() for row in session.execute(_universities().where(School.id.in_(ids)))] if ids else []
+        by_id = {row["id"]: row for row in _with_subjects(session, rows)}
+        return [
+            {"subject": group["subject"], "universities": [by_id[school_id] for school_id in group["school_ids"]]}
+            for group in groups
+        ]
+
+    return ORJSONResponse(await db.run_sync(run))
+
+
+@router.get("/{university_id}", response_model=UniversityRead)
+async def get_university(*, db: AsyncSession = Depends(get_async_db), university_id: int) -> ORJSONResponse:
+    """
+    Get a specific university by ID.
+    """
+
+    def run(session: Session) -> Optional[Dict[str, Any]]:
+        row = session.execute(_universities().where(School.id == university_id)).first()
+        return None if row is None else _with_subjects(session, [row._asdict()])[0]
+
+    university = await db.run_sync(run)
+    if university is None:
+        raise HTTPException(status_code=404, detail="University not found")
+    return ORJSONResponse(university)
@@ -1,25 +1,128 @@
-from typing import List
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import get_db
+from app.api.batch import ZONE_COLUMNS, in_request_order, unique_ids
+from app.api.deps import get_async_db
+from app.models.school import School
 from app.models.zone import SchoolZone
-from app.schemas.zone import ZoneRead
+from app.schemas.batch import IdBatch
+from app.schemas.zone import (
+    ZoneBatch,
+    ZoneLookup,
+    ZoneLookupBatch,
+    ZoneLookupRequest,
+    ZonePriceHistory,
+    ZonePriceStatRead,
+    ZoneRead,
+)
+from app.services.zone_prices import zone_history, zone_stats
+from app.services.zones import zones_containing
 
 router = APIRouter(prefix="/zones", tags=["zones"])
 
 
 @router.get("/", response_model=List[ZoneRead])
-def list_zones(*, db: Session = Depends(get_db)) -> List[SchoolZone]:
-    result = db.execute(select(SchoolZone)).scalars().all()
-    return result
+async def list_zones(*, db: AsyncSession = Depends(get_async_db)) -> ORJSONResponse:
+    # Columns only: boundaries can be large and are not part of ZoneRead
+    rows = (await db.exec(select(*ZONE_COLUMNS))).all()
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+def lookup_points(session: Session, points: Sequence[Tuple[float, float]]) -> List[Dict[str, Any]]:
+    """Zones containing each point, with their school, in the order of ``points``."""
+    matches = zones_containing(session, points)
+    ids = sorted({zone_id for zone_ids in matches for zone_id in zone_ids})
+    zones: Dict[int, Dict[str, Any]] = {}
+    if ids:
+        query = (
+            select(*ZONE_COLUMNS, School.name.label("school_name"), School.school_type)
+            .outerjoin(School, School.id == SchoolZone.school_id)
+            .where(SchoolZone.id.in_(ids))
+        )
+        zones = {row.id: row._asdict() for row in session.execute(query)}
+    return [
+        {"lat": lat, "lng": lng, "zones": [zones[zone_id] for zone_id in zone_ids]}
+        for (lat, lng), zone_ids in zip(points, matches)
+    ]
+
+
+@router.get("/lookup", response_model=ZoneLookup)
+async def lookup_zones(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+) -> ORJSONResponse:
+    """
+    School zones whose boundary contains the point, e.g. an address's enrolment zones.
+
+    Candidates come from a spatial index over the zone boundaries (PostGIS
+    GiST or an in-memory R-tree) and are confirmed with an exact
+    point-in-polygon test.
+    """
+    results = await db.run_sync(lookup_points, [(lat, lng)])
+    return ORJSONResponse(results[0])
+
+
+@router.post("/lookup/batch", response_model=ZoneLookupBatch)
+async def lookup_zones_batch(
+    *, db: AsyncSession = Depends(get_async_db), request: ZoneLookupRequest
+) -> ORJSONResponse:
+    """`/zones/lookup` for many points at once; results keep the order of **points**."""
+    points = [(point.lat, point.lng) for point in request.points]
+    return ORJSONResponse({"results": await db.run_sync(lookup_points, points)})
+
+
+@router.post("/batch", response_model=ZoneBatch)
+async def get_zones_batch(*, db: AsyncSession = Depends(get_async_db), batch: IdBatch) -> ORJSONResponse:
+    """Look up many zones by id with one query; items keep the order of **ids**, unknown ids are in `missing`."""
+    ids = unique_ids(batch.ids)
+    rows = (await db.exec(select(*ZONE_COLUMNS).where(SchoolZone.id.in_(ids)))).all()
+    return ORJSONResponse(in_request_order(ids, [row._asdict() for row in rows]))
+
+
+@router.get("/stats", response_model=List[ZonePriceStatRead])
+async def get_zone_price_stats(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    by: Optional[Literal["region", "school_type", "region,school_type"]] = Query(
+        default=None, description="Break down by region, school type or both; overall figures when omitted"
+    ),
+    region: Optional[str] = Query(default=None),
+    school_type: Optional[str] = Query(default=None),
+    year: Optional[int] = Query(default=None),
+) -> ORJSONResponse:
+    """
+    House-price distribution across zones per year: percentiles of the zones'
+    yearly median prices and the year-over-year change of the median.
+
+    Read from rollups that are refreshed when price observations are
+    ingested, never computed from the observations per request.
+    """
+    dimensions = tuple(by.split(",")) if by else ()
+
+    def run(session: Session) -> List[Dict[str, Any]]:
+        return zone_stats(session, by=dimensions, region=region, school_type=school_type, year=year)
+
+    return ORJSONResponse(await db.run_sync(run))
+
+
+@router.get("/{zone_id}/history", response_model=ZonePriceHistory)
+async def get_zone_price_history(*, db: AsyncSession = Depends(get_async_db), zone_id: int) -> ORJSONResponse:
+    """A zone's price observations and yearly medians with their year-over-year change, oldest first."""
+    if await db.get(SchoolZone, zone_id) is None:
+        raise HTTPException(status_code=404, detail="Zone not found")
+    return ORJSONResponse(await db.run_sync(zone_history, zone_id))
 
 
 @router.get("/{zone_id}", response_model=ZoneRead)
-def get_zone(*, db: Session = Depends(get_db), zone_id: int) -> SchoolZone:
-    zone = db.get(SchoolZone, zone_id)
+async def get_zone(*, db: AsyncSession = Depends(get_async_db), zone_id: int) -> SchoolZone:
+    zone = await db.get(SchoolZone, zone_id)
     if not zone:
         raise HTTPException(status_code=404, detail="Zone not found")
     return zone
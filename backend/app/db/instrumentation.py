@@ -0,0 +1,176 @@
+"""
+Query timing and per-route counters.
+
+Replaces ``echo=True`` as the way to see what the API sends to the database.
+Every statement is timed through SQLAlchemy cursor events; statements slower
+than ``settings.query_slow_ms`` are always logged, and a
+``settings.query_log_sample_rate`` share of the rest is logged too. Timings are
+aggregated per statement and per route and served by ``GET /metrics/queries``.
+"""
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.queries")
+
+_WHITESPACE = re.compile(r"\s+")
+# Collapse expanded IN lists so "IN (?, ?, ?)" and "IN (?)" share a fingerprint
+_PARAM_LIST = re.compile(r"\((?:\s*(?:\?|%\([^)]+\)s|\$\d+)\s*,)+\s*(?:\?|%\([^)]+\)s|\$\d+)\s*\)")
+
+_MAX_STATEMENTS = 500
+
+
+@dataclass
+class _Stats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_ms"] = round(self.total_ms, 3)
+        data["max_ms"] = round(self.max_ms, 3)
+        data["mean_ms"] = round(self.total_ms / self.count, 3) if self.count else 0.0
+        return data
+
+
+@dataclass
+class _RouteStats:
+    requests: int = 0
+    queries: int = 0
+    db_ms_total: float = 0.0
+    db_ms_max: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0.0,
+            "db_ms_total": round(self.db_ms_total, 3),
+            "db_ms_max_per_request": round(self.db_ms_max, 3),
+        }
+
+
+@dataclass
+class RequestQueries:
+    """Queries issued while handling one request."""
+
+    count: int = 0
+    total_ms: float = 0.0
+
+
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+
+class QueryMetrics:
+    def __init__(self):
+        self._lock = Lock()
+        self.statements: Dict[str, _Stats] = {}
+        self.routes: Dict[str, _RouteStats] = {}
+
+    def record_statement(self, fingerprint: str, duration_ms: float) -> None:
+        with self._lock:
+            stats = self.statements.get(fingerprint)
+            if stats is None:
+                if len(self.statements) >= _MAX_STATEMENTS:
+                    return
+                stats = self.statements[fingerprint] = _Stats()
+            stats.add(duration_ms)
+
+    def record_request(self, route: str, queries: RequestQueries) -> None:
+        with self._lock:
+            stats = self.routes.setdefault(route, _RouteStats())
+            stats.requests += 1
+            stats.queries += queries.count
+            stats.db_ms_total += queries.total_ms
+            stats.db_ms_max = max(stats.db_ms_max, queries.total_ms)
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            statements = sorted(self.statements.items(), key=lambda item: item[1].total_ms, reverse=True)
+            return {
+                "routes": {route: stats.as_dict() for route, stats in self.routes.items()},
+                "statements": [
+                    {"statement": statement, **stats.as_dict()} for statement, stats in statements[:top]
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements.clear()
+            self.routes.clear()
+
+
+query_metrics = QueryMetrics()
+
+
+def fingerprint(statement: str) -> str:
+    return _PARAM_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def begin_request() -> RequestQueries:
+    """Start collecting queries for the current request context."""
+    queries = RequestQueries()
+    _current_request.set(queries)
+    return queries
+
+
+def _log(event_name: str, statement: str, duration_ms: float) -> None:
+    level = logging.WARNING if event_name == "slow_query" else logging.INFO
+    if logger.isEnabledFor(level):
+        logger.log(
+            level,
+            json.dumps({"event": event_name, "duration_ms": round(duration_ms, 3), "statement": statement}),
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    statement_fingerprint = fingerprint(statement)
+    query_metrics.record_statement(statement_fingerprint, duration_ms)
+
+    queries = _current_request.get()
+    if queries is not None:
+        queries.count += 1
+        queries.total_ms += duration_ms
+
+    if duration_ms >= settings.query_slow_ms:
+        _log("slow_query", statement_fingerprint, duration_ms)
+    elif settings.query_log_sample_rate and random.random() < settings.query_log_sample_rate:
+        _log("query", statement_fingerprint, duration_ms)
+
+
+def _handle_error(context) -> None:
+    # after_cursor_execute does not fire for failed statements
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument(engine: Engine) -> None:
+    """Attach timing listeners to a (sync) engine; for async engines pass ``.sync_engine``."""
+    if not settings.query_metrics_enabled:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -1,16 +1,122 @@
+from typing import Any, AsyncIterator, Dict, Iterator, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
+from app.db.instrumentation import instrument
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Pool and connection options for ``create_engine`` taken from settings."""
+    if database_url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+
+    options: Dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_statement_timeout_ms and database_url.startswith("postgresql"):
+        timeout = str(settings.db_statement_timeout_ms)
+        if database_url.startswith("postgresql+asyncpg"):
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto the matching async driver."""
+    if settings.async_database_url:
+        return settings.async_database_url
+    scheme, _, rest = database_url.partition("://")
+    if scheme in ("postgresql", "postgresql+psycopg2", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return database_url
+
+
+engine = create_engine(settings.database_url, echo=settings.db_echo, **engine_options(settings.database_url))
+instrument(engine)
+
+# Session factory for scripts that manage their own session lifecycle
+SessionLocal = sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
+
+# Async engine used by the API routes; scripts keep using the sync engine above
+_async_url = async_database_url(settings.database_url)
+async_engine = create_async_engine(_async_url, echo=settings.db_echo, **engine_options(_async_url))
+instrument(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
-engine = create_engine(settings.database_url, echo=True)
+_extensions: Dict[Tuple[str, str], bool] = {}
 
 
-def get_session():
+def get_session() -> Iterator[Session]:
     """Generator function for database sessions."""
     with Session(engine) as session:
         yield session
 
 
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Async generator for database sessions."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def pool_stats(bind: Engine = engine) -> Dict[str, Any]:
+    """Snapshot of connection pool usage."""
+    pool = bind.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            # Connections this process may open against Postgres max_connections
+            max_connections=pool.size() + pool._max_overflow,
+        )
+    return stats
+
+
+def has_extension(bind: Engine, name: str) -> bool:
+    """Return True if the given Postgres extension is installed; always False on other databases."""
+    key = (str(bind.url), name)
+    if key not in _extensions:
+        available = False
+        if bind.dialect.name == "postgresql":
+            with bind.connect() as conn:
+                available = conn.execute(
+                    text("SELECT 1 FROM pg_extension WHERE extname = :name"), {"name": name}
+                ).first() is not None
+        _extensions[key] = available
+    return _extensions[key]
+
+
+def forget_extensions() -> None:
+    """Drop cached extension lookups, e.g. after running CREATE EXTENSION."""
+    _extensions.clear()
+
+
 def init_db():
     """Initialize database tables."""
+    # Register every table on SQLModel.metadata before create_all
+    from app.models import dataset, school, zone  # noqa: F401
+    from app.services.search import ensure_search_index
+    from app.services.spatial import ensure_spatial_index
+    from app.services.zones import ensure_zone_index
+
     SQLModel.metadata.create_all(engine)
+    ensure_spatial_index(engine)
+    ensure_zone_index(engine)
+    ensure_search_index(engine)
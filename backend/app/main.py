@@ -1,7 +1,13 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import kindergartens, schools, zones
+from app.api.caching import ResponseCacheMiddleware
+from app.api.compression import CompressionMiddleware
+from app.api.deps import require_admin
+from app.api.routes import export, facets, geojoin, kindergartens, metrics, schools, search, suggest, universities, zones
+from app.core.config import settings
+from app.db.instrumentation import begin_request, query_metrics
+from app.db.session import async_engine, engine, pool_stats
 
 app = FastAPI(
     title="KiwiSchools API",
@@ -9,6 +15,11 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Response cache; registered before CORS so that CORS, as the outer
+# middleware, also decorates cached responses
+if settings.response_cache_enabled:
+    app.add_middleware(ResponseCacheMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -18,12 +29,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression is outside the response cache, which keeps bodies uncompressed
+# so one entry serves every Accept-Encoding
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_bytes)
+
+
+@app.middleware("http")
+async def record_route_queries(request: Request, call_next):
+    """Attribute the queries issued by each request to its route template."""
+    queries = begin_request()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    if route is not None:
+        query_metrics.record_request(f"{request.method} {route.path}", queries)
+    return response
+
+
 # Include routers
 app.include_router(schools.router)
 app.include_router(kindergartens.router)
+app.include_router(universities.router)
 app.include_router(zones.router)
+app.include_router(search.router)
+app.include_router(suggest.router)
+app.include_router(facets.router)
+app.include_router(export.router)
+app.include_router(geojoin.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/health/pool", dependencies=[Depends(require_admin)])
+def pool_status():
+    """Connection pool usage, for sizing workers against Postgres max_connections."""
+    return {"sync": pool_stats(engine), "async": pool_stats(async_engine.sync_engine)}
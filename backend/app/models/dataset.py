@@ -0,0 +1,20 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+
+class DatasetVersion(SQLModel, table=True):
+    # One row per dataset (app.services.dataset.DATASETS): id=1 is bumped
+    # whenever school data changes, id=2 when zone boundaries or prices do
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = 0
+    updated_at: Optional[datetime] = None
+
+
+class DatasetChange(SQLModel, table=True):
+    # Schools touched by the import that produced ``version``; action is
+    # created, updated or deleted
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = Field(index=True)
+    school_id: int
+    action: str
@@ -1,9 +1,75 @@
 from typing import Optional
+from datetime import datetime
+from sqlalchemy import Column, Computed, Float, Index, text
 from sqlmodel import Field, SQLModel
 
+_KINDERGARTEN = text("school_type = 'kindergarten' AND deleted_at IS NULL")
+# The university search category (app.services.search.TERTIARY_TYPES)
+_TERTIARY = text(
+    "school_type IN ('institute_of_technology', 'private_tertiary', 'university') AND deleted_at IS NULL"
+)
+
+# Billing units and how many of them make a year. Fees billed in other units
+# or in a currency other than NZD have no annual fee.
+ANNUAL_MULTIPLIERS = {
+    "per_week": 52,
+    "per_month": 12,
+    "per_term": 4,
+    "per_semester": 2,
+    "per_year": 1,
+}
+
+
+def annual_fee_sql(fee: str) -> str:
+    """SQL for ``fee`` (a column expression) per year in NZD; a missing unit means per year."""
+    units = " ".join(f"WHEN '{unit}' THEN {fee} * {count}" for unit, count in ANNUAL_MULTIPLIERS.items())
+    return (
+        f"CASE WHEN coalesce(fee_currency, 'NZD') = 'NZD' "
+        f"THEN CASE coalesce(fee_unit, 'per_year') {units} END END"
+    )
+
 
 class School(SQLModel, table=True):
+    # List endpoints filter on equality and page by (name, id); see
+    # tests/test_query_plans.py for the query shapes these serve
+    __table_args__ = (
+        Index("ix_school_name_id", "name", "id"),
+        Index("ix_school_type_name_id", "school_type", "name", "id"),
+        Index("ix_school_type_region_city", "school_type", "region", "city"),
+        Index("ix_school_suburb", "suburb"),
+        # Row-by-row importer lookup; names repeat within a type, so not unique
+        Index("ix_school_name_school_type", "name", "school_type"),
+        Index(
+            "ix_school_kindergarten_name_id", "name", "id", postgresql_where=_KINDERGARTEN, sqlite_where=_KINDERGARTEN
+        ),
+        Index(
+            "ix_school_kindergarten_region_city",
+            "region",
+            "city",
+            "education_system",
+            postgresql_where=_KINDERGARTEN,
+            sqlite_where=_KINDERGARTEN,
+        ),
+        # sort=fee pages and the fee_lte/fee_gte range filters
+        Index("ix_school_fee_annual_min_id", "fee_annual_min", "id"),
+        Index("ix_school_type_fee_annual_min_id", "school_type", "fee_annual_min", "id"),
+        Index("ix_school_fee_annual_max", "fee_annual_max"),
+        # /universities pages by name or by QS rank
+        Index("ix_school_tertiary_name_id", "name", "id", postgresql_where=_TERTIARY, sqlite_where=_TERTIARY),
+        Index(
+            "ix_school_tertiary_qs_rank_id",
+            "qs_world_rank",
+            "id",
+            postgresql_where=_TERTIARY,
+            sqlite_where=_TERTIARY,
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Ministry of Education institution number; the unique key for imports
+    school_number: Optional[int] = Field(default=None, unique=True)
+    # Identifier from a scraped source ("<host>:<id>"); the unique key for scraper imports
+    external_id: Optional[str] = Field(default=None, unique=True)
     name: str
     school_type: Optional[str] = None  # kindergarten, primary, intermediate, secondary, composite, university, etc.
     
@@ -31,8 +97,40 @@ class School(SQLModel, table=True):
     fee_max: Optional[float] = None
     fee_currency: Optional[str] = None  # Default: NZD
     fee_unit: Optional[str] = None  # per_week, per_month, per_term, per_year, etc.
+    # The fee range per year in NZD, computed by the database whenever the
+    # fee columns are written so filters and sorting compare like with like
+    fee_annual_min: Optional[float] = Field(
+        default=None, sa_column=Column(Float, Computed(annual_fee_sql("fee_min"), persisted=True))
+    )
+    fee_annual_max: Optional[float] = Field(
+        default=None,
+        sa_column=Column(Float, Computed(annual_fee_sql("coalesce(fee_max, fee_min)"), persisted=True)),
+    )
     
-    # University-specific fields (for future use)
+    # University-specific fields
     qs_world_rank: Optional[int] = None
+    # Comma-separated, as imported; normalized into SchoolSubject for filtering
     strong_subjects: Optional[str] = None
     university_type: Optional[str] = None
+    
+    # Import bookkeeping: hash of the last imported values, and when the
+    # school disappeared from the directory (soft delete)
+    content_hash: Optional[str] = None
+    deleted_at: Optional[datetime] = None
+
+
+class Subject(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Folded name (app.services.search.fold); filters match on it
+    key: str = Field(unique=True)
+    # Display name, as first imported
+    name: str
+
+
+class SchoolSubject(SQLModel, table=True):
+    # Strong subjects of a school. The primary key answers "subjects of these
+    # schools", the index "schools with this subject".
+    __table_args__ = (Index("ix_schoolsubject_subject_school", "subject_id", "school_id"),)
+
+    school_id: int = Field(foreign_key="school.id", primary_key=True)
+    subject_id: int = Field(foreign_key="subject.id", primary_key=True)
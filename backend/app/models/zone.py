@@ -1,11 +1,63 @@
 from typing import Optional
-from datetime import date
+from datetime import date, datetime
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import Field, SQLModel
 
 
 class SchoolZone(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
-    school_id: Optional[int] = Field(default=None, foreign_key="school.id")
+    school_id: Optional[int] = Field(default=None, foreign_key="school.id", index=True)
+    # Latest observation, kept current by app/services/zone_prices.py
     median_house_price: Optional[float] = None
     last_updated: Optional[date] = None
+    # GeoJSON Polygon/MultiPolygon in WGS84, see app/services/zones.py
+    boundary: Optional[str] = None
+
+
+class ZonePriceObservation(SQLModel, table=True):
+    # One median house price per zone and date (e.g. monthly); re-ingesting a
+    # date replaces its values
+    __table_args__ = (UniqueConstraint("zone_id", "observed_on", name="uq_zonepriceobservation_zone_date"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    zone_id: int = Field(foreign_key="schoolzone.id")
+    observed_on: date
+    median_price: float
+    sales_count: Optional[int] = None
+    source: Optional[str] = None
+
+
+class ZonePriceRollup(SQLModel, table=True):
+    # Per zone and year: the median of that year's observations
+    __table_args__ = (UniqueConstraint("zone_id", "year", name="uq_zonepricerollup_zone_year"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    zone_id: int = Field(foreign_key="schoolzone.id")
+    year: int
+    median_price: float
+    observations: int
+    last_observed_on: date
+
+
+class ZonePriceStat(SQLModel, table=True):
+    # Per year, distribution of the zones' yearly medians for a region and/or
+    # school type; "" stands for all regions or all types
+    __table_args__ = (
+        UniqueConstraint("year", "region", "school_type", name="uq_zonepricestat_group"),
+        Index("ix_zonepricestat_region_school_type", "region", "school_type", "year"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    year: int
+    region: str = ""
+    school_type: str = ""
+    zones: int
+    p10: float
+    p25: float
+    median: float
+    p75: float
+    p90: float
+    # Change of the median against the previous year's, as a fraction
+    yoy_change: Optional[float] = None
+    refreshed_at: datetime
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class IdBatch(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=settings.max_batch_ids)
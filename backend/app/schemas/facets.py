@@ -0,0 +1,17 @@
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+
+class FacetCounts(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetValue]]
+
+
+class RegionRead(BaseModel):
+    name: str
+    count: int
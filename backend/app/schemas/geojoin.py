@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class GeoJoinJob(BaseModel):
+    id: str
+    status: str  # queued, running, done or failed
+    format: str
+    points: int
+    invalid: int
+    elapsed_seconds: float
+    points_per_second: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
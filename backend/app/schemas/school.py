@@ -1,9 +1,12 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
+from app.schemas.zone import ZoneRead
+
 
 class SchoolRead(BaseModel):
     id: int
+    school_number: Optional[int] = None
     name: str
     school_type: Optional[str] = None
     
@@ -31,6 +34,9 @@ class SchoolRead(BaseModel):
     fee_max: Optional[float] = None
     fee_currency: Optional[str] = None
     fee_unit: Optional[str] = None
+    # Per year in NZD; null when the unit or currency cannot be converted
+    fee_annual_min: Optional[float] = None
+    fee_annual_max: Optional[float] = None
     
     # University-specific fields
     qs_world_rank: Optional[int] = None
@@ -39,3 +45,45 @@ class SchoolRead(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class PaginatedSchools(BaseModel):
+    items: List[SchoolRead]
+    total: int
+    page: int
+    page_size: int
+    next_cursor: Optional[str] = None
+
+
+class SchoolWithZones(SchoolRead):
+    # Only present with include=zones
+    zones: Optional[List[ZoneRead]] = None
+
+
+class SchoolBatch(BaseModel):
+    items: List[SchoolWithZones]
+    missing: List[int]
+
+
+class SchoolNearby(SchoolRead):
+    distance_km: float
+
+
+class MapPointRead(BaseModel):
+    id: int
+    name: str
+    school_type: Optional[str] = None
+    latitude: float
+    longitude: float
+
+
+class MapClusterRead(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+
+
+class MapView(BaseModel):
+    zoom: int
+    clusters: List[MapClusterRead]
+    points: List[MapPointRead]
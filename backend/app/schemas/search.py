@@ -0,0 +1,25 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    id: int
+    name: str
+    school_type: Optional[str] = None
+    category: str
+    suburb: Optional[str] = None
+    city: Optional[str] = None
+    score: float
+    
+    class Config:
+        from_attributes = True
+
+
+class SuggestionRead(BaseModel):
+    id: int
+    name: str
+    school_type: Optional[str] = None
+    suburb: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
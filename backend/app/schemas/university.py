@@ -0,0 +1,27 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.schemas.school import SchoolRead
+
+
+class UniversityRead(SchoolRead):
+    # Normalized strong_subjects, alphabetically
+    subjects: List[str] = []
+
+
+class PaginatedUniversities(BaseModel):
+    items: List[UniversityRead]
+    total: int
+    page: int
+    page_size: int
+    next_cursor: Optional[str] = None
+
+
+class SubjectRead(BaseModel):
+    name: str
+    universities: int
+
+
+class SubjectTop(BaseModel):
+    subject: str
+    universities: List[UniversityRead]
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import date
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 
 
 class ZoneRead(BaseModel):
@@ -12,3 +14,64 @@ class ZoneRead(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ZoneBatch(BaseModel):
+    items: List[ZoneRead]
+    missing: List[int]
+
+
+class ZoneMatch(ZoneRead):
+    school_name: Optional[str] = None
+    school_type: Optional[str] = None
+
+
+class ZoneLookup(BaseModel):
+    lat: float
+    lng: float
+    zones: List[ZoneMatch]
+
+
+class LookupPoint(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
+
+
+class ZoneLookupRequest(BaseModel):
+    points: List[LookupPoint] = Field(min_length=1, max_length=settings.max_zone_lookup_points)
+
+
+class ZoneLookupBatch(BaseModel):
+    results: List[ZoneLookup]
+
+
+class ZonePricePoint(BaseModel):
+    observed_on: date
+    median_price: float
+    sales_count: Optional[int] = None
+
+
+class ZonePriceYear(BaseModel):
+    year: int
+    median_price: float
+    observations: int
+    yoy_change: Optional[float] = None
+
+
+class ZonePriceHistory(BaseModel):
+    zone_id: int
+    observations: List[ZonePricePoint]
+    yearly: List[ZonePriceYear]
+
+
+class ZonePriceStatRead(BaseModel):
+    year: int
+    region: Optional[str] = None
+    school_type: Optional[str] = None
+    zones: int
+    p10: float
+    p25: float
+    median: float
+    p75: float
+    p90: float
+    yoy_change: Optional[float] = None
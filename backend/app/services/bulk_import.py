@@ -0,0 +1,259 @@
+"""
+Set-based upserts of school records.
+
+Records are staged into a temporary table (``COPY`` on Postgres, batched
+``executemany`` elsewhere) and merged into ``school`` with a single
+``INSERT ... ON CONFLICT DO UPDATE`` keyed on a unique column. The
+created/updated/unchanged counts come from the database, by comparing the
+staging table with ``school`` before the merge.
+
+``DifferentialImport`` sits in front of ``upsert_schools`` for full directory
+loads: each record carries a ``content_hash`` of its values, records whose hash
+matches the stored one are dropped before staging, the rest overwrite every
+imported column (blanks included), and schools missing from the directory are
+soft-deleted. It also collects the ``ChangeSet`` to record
+with the new dataset version.
+"""
+import csv
+import hashlib
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Column, MetaData, Table, exists, func, or_, select, true, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.school import School
+from app.services.dataset import ChangeSet
+
+STAGE_BATCH_SIZE = 1000
+
+school_table = School.__table__
+
+# Columns written by imports; id is assigned by the database, deleted_at is
+# managed by DifferentialImport and computed columns follow the ones they
+# derive from
+IMPORT_COLUMNS: List[str] = [
+    column.name
+    for column in school_table.columns
+    if column.name not in ("id", "deleted_at") and column.computed is None
+]
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """Stable digest of a record's imported values (``content_hash`` itself excluded)."""
+    values = {k: v for k, v in record.items() if k != "content_hash"}
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _stage_table(columns: Sequence[str]) -> Table:
+    return Table(
+        "school_stage",
+        MetaData(),
+        *[Column(name, school_table.c[name].type) for name in columns],
+        prefixes=["TEMPORARY"],
+    )
+
+
+def _copy_rows(db: Session, stage: Table, columns: Sequence[str], records: Sequence[Dict[str, Any]]) -> None:
+    """Stream records into the staging table with Postgres ``COPY``."""
+    raw = db.connection().connection.dbapi_connection
+    with raw.cursor() as cursor:
+        for start in range(0, len(records), STAGE_BATCH_SIZE):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for record in records[start:start + STAGE_BATCH_SIZE]:
+                # COPY's CSV format reads an unquoted empty field as NULL
+                writer.writerow(["" if record.get(c) is None else record[c] for c in columns])
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {stage.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+
+
+def _insert_rows(db: Session, stage: Table, columns: Sequence[str], records: Sequence[Dict[str, Any]]) -> None:
+    """Stage records with batched ``executemany`` inserts."""
+    for start in range(0, len(records), STAGE_BATCH_SIZE):
+        batch = [{c: record.get(c) for c in columns} for record in records[start:start + STAGE_BATCH_SIZE]]
+        db.execute(stage.insert(), batch)
+
+
+def upsert_schools(
+    db: Session,
+    records: Iterable[Dict[str, Any]],
+    *,
+    key: str = "school_number",
+    overwrite_with_null: bool = False,
+) -> Dict[str, int]:
+    """
+    Merge ``records`` into ``school`` keyed on the unique column ``key``.
+
+    Records without a key are skipped; if a key repeats, the last record wins.
+    Unless ``overwrite_with_null`` is set, missing values in a record keep
+    the value already stored. Commits and returns created/updated/unchanged/
+    skipped counts.
+    """
+    deduplicated: Dict[Any, Dict[str, Any]] = {}
+    skipped = 0
+    for record in records:
+        if record.get(key) is None:
+            skipped += 1
+            continue
+        deduplicated[record[key]] = record
+    staged = list(deduplicated.values())
+
+    columns = [c for c in IMPORT_COLUMNS if any(c in record for record in staged)] or [key]
+    if key not in columns:
+        columns.append(key)
+    stage = _stage_table(columns)
+    dialect = db.get_bind().dialect.name
+
+    stage.create(db.connection())
+    try:
+        if dialect == "postgresql":
+            _copy_rows(db, stage, columns, staged)
+        else:
+            _insert_rows(db, stage, columns, staged)
+
+        target = school_table
+        joined = target.c[key] == stage.c[key]
+        value_columns = [c for c in columns if c != key]
+
+        def merged(new_value, name):
+            return new_value if overwrite_with_null else func.coalesce(new_value, target.c[name])
+
+        created = db.execute(
+            select(func.count()).select_from(stage).where(~exists().where(joined))
+        ).scalar_one()
+        updated = 0
+        if value_columns:
+            changed = or_(*[merged(stage.c[c], c).is_distinct_from(target.c[c]) for c in value_columns])
+            updated = db.execute(
+                select(func.count()).select_from(stage.join(target, joined)).where(changed)
+            ).scalar_one()
+
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        # The WHERE lets SQLite parse INSERT ... SELECT ... ON CONFLICT unambiguously
+        source = select(*[stage.c[c] for c in columns]).where(true())
+        statement = insert(target).from_select(columns, source)
+        if value_columns:
+            set_values = {c: merged(statement.excluded[c], c) for c in value_columns}
+            statement = statement.on_conflict_do_update(
+                index_elements=[key],
+                set_=set_values,
+                # Leave rows whose values did not change untouched
+                where=or_(*[set_values[c].is_distinct_from(target.c[c]) for c in value_columns]),
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[key])
+        db.execute(statement)
+        stage.drop(db.connection())
+    except Exception:
+        db.rollback()
+        raise
+    db.commit()
+
+    return {
+        "created": created,
+        "updated": updated,
+        "unchanged": len(staged) - created - updated,
+        "skipped": skipped,
+        "total": len(staged) + skipped,
+    }
+
+
+class DifferentialImport:
+    """
+    Apply a full snapshot of the directory as inserts, updates and soft deletes.
+
+    Feed batches of records (each with a ``content_hash``) to ``apply`` and
+    call ``finish`` once the whole snapshot has been seen. Stored hashes are
+    loaded once up front; only records that are new, changed or previously
+    deleted reach ``upsert_schools``. A previously deleted school that is in
+    the snapshot again is counted as ``restored`` (not as updated or
+    unchanged) and recorded as updated in the ``ChangeSet``.
+    """
+
+    def __init__(self, db: Session, *, key: str = "school_number"):
+        self.db = db
+        self.key = key
+        key_column = school_table.c[key]
+        rows = db.execute(
+            select(key_column, school_table.c.id, school_table.c.content_hash, school_table.c.deleted_at)
+            .where(key_column.is_not(None))
+        ).all()
+        self.known: Dict[Any, Tuple[int, Optional[str], bool]] = {
+            row[0]: (row.id, row.content_hash, row.deleted_at is not None) for row in rows
+        }
+        self.seen: Set[Any] = set()
+        self.changes = ChangeSet()
+        self.counts = {
+            "created": 0, "updated": 0, "unchanged": 0, "skipped": 0, "restored": 0,
+            "deleted": 0, "total": 0,
+        }
+
+    def apply(self, records: Iterable[Dict[str, Any]]) -> None:
+        changed = []
+        restoring = []
+        for record in records:
+            self.counts["total"] += 1
+            number = record.get(self.key)
+            if number is None:
+                self.counts["skipped"] += 1
+                continue
+            self.seen.add(number)
+            known = self.known.get(number)
+            if known is not None and known[1] == record["content_hash"] and not known[2]:
+                self.counts["unchanged"] += 1
+                continue
+            (restoring if known is not None and known[2] else changed).append(record)
+        if not changed and not restoring:
+            return
+
+        # A snapshot record is the whole truth about its school: a value blanked
+        # at the source is cleared, matching the content_hash stored with it
+        if changed:
+            result = upsert_schools(self.db, changed, key=self.key, overwrite_with_null=True)
+            for field in ("created", "updated", "unchanged"):
+                self.counts[field] += result[field]
+
+        key_column = school_table.c[self.key]
+        if restoring:
+            # Staged on their own so that values unchanged since the deletion
+            # do not count them as unchanged
+            upsert_schools(self.db, restoring, key=self.key, overwrite_with_null=True)
+            restored = [record[self.key] for record in restoring]
+            self.db.execute(update(school_table).where(key_column.in_(restored)).values(deleted_at=None))
+            self.db.commit()
+            self.counts["restored"] += len(set(restored))
+
+        numbers = {record[self.key] for record in changed + restoring}
+        ids = dict(self.db.execute(select(key_column, school_table.c.id).where(key_column.in_(numbers))).all())
+        for number in numbers:
+            if number in self.known:
+                self.changes.updated.append(ids[number])
+            else:
+                self.changes.created.append(ids[number])
+            self.known[number] = (ids[number], None, False)
+
+    def finish(self, *, delete_missing: bool = True) -> Dict[str, int]:
+        """Soft-delete schools absent from the snapshot and return the counts."""
+        if delete_missing:
+            missing = {
+                number: school_id
+                for number, (school_id, _, deleted) in self.known.items()
+                if not deleted and number not in self.seen
+            }
+            if missing:
+                self.db.execute(
+                    update(school_table)
+                    .where(school_table.c.id.in_(list(missing.values())))
+                    .values(deleted_at=datetime.utcnow())
+                )
+                self.db.commit()
+                self.changes.deleted.extend(missing.values())
+                self.counts["deleted"] = len(missing)
+        return dict(self.counts)
@@ -0,0 +1,168 @@
+"""
+In-memory columnar copy of the school catalogue for the list endpoints.
+
+The active schools are loaded once per dataset version into NumPy arrays
+sorted by ``(name, id)``, the order the list endpoints page in. The
+categorical columns (school type, region, city, suburb, education system) are
+dictionary-encoded as integer codes. A filter is then one vectorized
+comparison producing a boolean mask, filters combine with ``&``, the total is
+the number of set positions and a page is a slice of the matching positions
+after the cursor. Response rows are kept as prebuilt dicts, so serving a page
+needs no SQL round trip or ORM hydration. The annual fee range is held as
+float columns (NaN when unknown) with a second ordering by ``(fee, id)`` for
+``sort=fee``.
+
+``settings.catalogue_backend`` selects the backend for ``/schools`` and
+``/kindergartens`` (``sql`` or ``memory``). A rebuild constructs a complete
+new table before swapping it in, so a request always reads one consistent
+version.
+
+Names are compared by code point, like the Postgres ``C`` collation. With a
+locale collation the two backends may order a few names differently, so
+cursors should not be reused after switching backends.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.school import School
+from app.schemas.school import SchoolRead
+from app.services.dataset import VersionedCache
+
+CATEGORICAL_FIELDS = ("school_type", "region", "city", "suburb", "education_system")
+# Matched ignoring case, like ``lower(city) = lower(:city)`` in the SQL queries
+CASE_INSENSITIVE_FIELDS = ("city",)
+
+# The columns behind ``SchoolRead``, for queries that return plain rows
+# instead of ORM instances
+READ_COLUMNS = [getattr(School, field) for field in SchoolRead.model_fields]
+
+
+@dataclass
+class _Categorical:
+    codes: np.ndarray  # int32 per row, -1 for NULL
+    lookup: Dict[str, int]
+
+    @classmethod
+    def build(cls, cells: Sequence[Optional[str]]) -> "_Categorical":
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter(
+            (-1 if value is None else lookup.setdefault(value, len(lookup)) for value in cells),
+            dtype=np.int32,
+            count=len(cells),
+        )
+        return cls(codes, lookup)
+
+    def equals(self, value: str) -> np.ndarray:
+        code = self.lookup.get(value)
+        if code is None:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+
+    def equals_ignoring_case(self, value: str) -> np.ndarray:
+        folded = value.lower()
+        codes = [code for key, code in self.lookup.items() if key.lower() == folded]
+        return np.isin(self.codes, np.array(codes, dtype=np.int32))
+
+
+class CatalogueTable:
+    def __init__(self, rows: Sequence[Dict[str, Any]]):
+        """``rows`` are the ``SchoolRead`` fields of the active schools, in any order."""
+        names = np.array([row["name"] for row in rows], dtype=str)
+        ids = np.array([row["id"] for row in rows], dtype=np.int64)
+        order = np.lexsort((ids, names))
+        self.names = names[order]
+        self.ids = ids[order]
+        self.rows: List[Dict[str, Any]] = [rows[position] for position in order]
+        self.positions = {row["id"]: position for position, row in enumerate(self.rows)}
+        self.columns = {
+            field: _Categorical.build([row[field] for row in self.rows]) for field in CATEGORICAL_FIELDS
+        }
+        self.fee_min = self._float_column("fee_annual_min")
+        self.fee_max = self._float_column("fee_annual_max")
+        # Positions by (fee, id) with unknown fees last, by id
+        unknown = np.isnan(self.fee_min)
+        self.fee_order = np.lexsort((self.ids, np.where(unknown, 0.0, self.fee_min), unknown))
+        self.fee_keys = self.fee_min[self.fee_order]
+        self.fee_ids = self.ids[self.fee_order]
+        self.fee_known = int(np.count_nonzero(~unknown))
+
+    def _float_column(self, field: str) -> np.ndarray:
+        return np.array([np.nan if row[field] is None else row[field] for row in self.rows], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, school_id: int) -> Optional[Dict[str, Any]]:
+        position = self.positions.get(school_id)
+        return None if position is None else self.rows[position]
+
+    def mask(
+        self,
+        filters: Mapping[str, Optional[str]],
+        ids: Optional[Iterable[int]] = None,
+        *,
+        fee_gte: Optional[float] = None,
+        fee_lte: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Boolean mask of the rows matching every filter.
+
+        ``filters`` maps a categorical field to a required value; empty values
+        are ignored and ``CASE_INSENSITIVE_FIELDS`` ignore case, as in the SQL
+        queries. ``ids`` further restricts the rows,
+        e.g. to the matches of a name search. ``fee_gte``/``fee_lte`` keep the
+        rows whose annual fee range overlaps them; NaN never matches.
+        """
+        selected = np.ones(len(self.rows), dtype=bool)
+        for field, value in filters.items():
+            if value and field in CASE_INSENSITIVE_FIELDS:
+                selected &= self.columns[field].equals_ignoring_case(value)
+            elif value:
+                selected &= self.columns[field].equals(value)
+        if ids is not None:
+            selected &= np.isin(self.ids, np.fromiter(ids, dtype=np.int64))
+        if fee_gte is not None:
+            selected &= self.fee_max >= fee_gte
+        if fee_lte is not None:
+            selected &= self.fee_min <= fee_lte
+        return selected
+
+    def start_after(self, key: Any, row_id: int, *, sort: str = "name") -> int:
+        """Position (in ``sort`` order) of the first row sorting after ``(key, row_id)``."""
+        if sort == "fee":
+            if key is None:
+                low, high = self.fee_known, len(self.rows)
+            else:
+                known = self.fee_keys[:self.fee_known]
+                low = int(np.searchsorted(known, key, side="left"))
+                high = int(np.searchsorted(known, key, side="right"))
+            return low + int(np.searchsorted(self.fee_ids[low:high], row_id, side="right"))
+        low = int(np.searchsorted(self.names, key, side="left"))
+        high = int(np.searchsorted(self.names, key, side="right"))
+        return low + int(np.searchsorted(self.ids[low:high], row_id, side="right"))
+
+    def page(self, mask: np.ndarray, *, start: int = 0, limit: int, sort: str = "name") -> List[Dict[str, Any]]:
+        """The first ``limit`` matching rows at or after ``start`` in ``sort`` order."""
+        if sort == "fee":
+            candidates = self.fee_order[start:]
+            positions = candidates[mask[candidates]][:limit]
+        else:
+            positions = np.flatnonzero(mask[start:])[:limit] + start
+        return [self.rows[position] for position in positions]
+
+
+def _build_catalogue(db: Session) -> CatalogueTable:
+    rows = db.execute(select(*READ_COLUMNS).where(School.deleted_at.is_(None))).all()
+    return CatalogueTable([row._asdict() for row in rows])
+
+
+catalogue: VersionedCache[CatalogueTable] = VersionedCache(_build_catalogue)
+
+
+def use_memory_catalogue() -> bool:
+    return settings.catalogue_backend == "memory"
@@ -0,0 +1,179 @@
+"""
+Viewport queries and marker clustering for the map.
+
+Schools are projected to normalised Web Mercator coordinates (0..1 on both
+axes) and merged into grid clusters for every zoom level up to
+``settings.map_max_cluster_zoom``. Each level is built from the level below
+it, so clusters nest the way supercluster's do. Every level is kept sorted by
+x, so a viewport query is a bisect followed by a y filter over the clusters
+that fall in the bbox's x range.
+
+The hierarchy is built once per dataset version and shared by all requests.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.school import School
+from app.services.dataset import VersionedCache
+
+TILE_SIZE = 256
+MAX_LATITUDE = 85.05112878
+
+
+@dataclass
+class MapPoint:
+    id: int
+    name: str
+    school_type: Optional[str]
+    latitude: float
+    longitude: float
+
+
+@dataclass
+class Cluster:
+    x: float
+    y: float
+    count: int
+    # Set only when the cluster holds a single school
+    point: Optional[MapPoint] = None
+
+    @property
+    def latitude(self) -> float:
+        return mercator_y_to_lat(self.y)
+
+    @property
+    def longitude(self) -> float:
+        return self.x * 360.0 - 180.0
+
+
+def lng_to_mercator_x(lng: float) -> float:
+    return (lng + 180.0) / 360.0
+
+
+def lat_to_mercator_y(lat: float) -> float:
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    sin_lat = math.sin(math.radians(lat))
+    return 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+
+
+def mercator_y_to_lat(y: float) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+
+
+class _Level:
+    """Clusters of one zoom level, sorted by x for range lookups."""
+
+    def __init__(self, clusters: List[Cluster]):
+        clusters.sort(key=lambda c: c.x)
+        self.clusters = clusters
+        self.xs = [c.x for c in clusters]
+
+    def within(self, min_x: float, max_x: float, min_y: float, max_y: float) -> List[Cluster]:
+        start = bisect_left(self.xs, min_x)
+        end = bisect_right(self.xs, max_x)
+        return [c for c in self.clusters[start:end] if min_y <= c.y <= max_y]
+
+
+def _merge(children: Sequence[Cluster], cell: float) -> List[Cluster]:
+    """Merge clusters that share a grid cell of the given size into weighted centroids."""
+    cells: Dict[Tuple[int, int], List[Cluster]] = {}
+    for child in children:
+        cells.setdefault((int(child.x // cell), int(child.y // cell)), []).append(child)
+
+    merged = []
+    for members in cells.values():
+        if len(members) == 1:
+            merged.append(members[0])
+            continue
+        count = sum(m.count for m in members)
+        merged.append(
+            Cluster(
+                x=sum(m.x * m.count for m in members) / count,
+                y=sum(m.y * m.count for m in members) / count,
+                count=count,
+            )
+        )
+    return merged
+
+
+class ClusterHierarchy:
+    """Per-zoom clusters for one set of schools."""
+
+    def __init__(self, points: Sequence[MapPoint], radius_px: int, max_zoom: int):
+        self.max_zoom = max_zoom
+        current = [
+            Cluster(x=lng_to_mercator_x(p.longitude), y=lat_to_mercator_y(p.latitude), count=1, point=p)
+            for p in points
+        ]
+        # Individual points are served at zooms above max_zoom
+        self.points = _Level(list(current))
+
+        self.levels: Dict[int, _Level] = {}
+        for zoom in range(max_zoom, -1, -1):
+            cell = radius_px / (TILE_SIZE * 2 ** zoom)
+            current = _merge(current, cell)
+            self.levels[zoom] = _Level(list(current))
+
+    def query(self, bbox: Tuple[float, float, float, float], zoom: int) -> List[Cluster]:
+        """Return clusters (or single points) inside ``(min_lng, min_lat, max_lng, max_lat)``."""
+        level = self.points if zoom > self.max_zoom else self.levels[max(zoom, 0)]
+        min_lng, min_lat, max_lng, max_lat = bbox
+        # Mercator y grows southwards
+        min_y = lat_to_mercator_y(max_lat)
+        max_y = lat_to_mercator_y(min_lat)
+
+        if min_lng <= max_lng:
+            return level.within(lng_to_mercator_x(min_lng), lng_to_mercator_x(max_lng), min_y, max_y)
+        # Viewport crosses the antimeridian (e.g. mainland NZ plus the Chatham Islands)
+        return level.within(lng_to_mercator_x(min_lng), 1.0, min_y, max_y) + level.within(
+            0.0, lng_to_mercator_x(max_lng), min_y, max_y
+        )
+
+
+@dataclass
+class MapIndex:
+    """Cluster hierarchies for all schools and for each school type."""
+
+    all: ClusterHierarchy
+    by_type: Dict[str, ClusterHierarchy]
+
+    def query(
+        self,
+        bbox: Tuple[float, float, float, float],
+        zoom: int,
+        school_type: Optional[str] = None,
+    ) -> List[Cluster]:
+        if school_type:
+            hierarchy = self.by_type.get(school_type)
+            return hierarchy.query(bbox, zoom) if hierarchy else []
+        return self.all.query(bbox, zoom)
+
+
+def _build_map_index(db: Session) -> MapIndex:
+    rows = db.execute(
+        select(School.id, School.name, School.school_type, School.latitude, School.longitude).where(
+            School.latitude.is_not(None), School.longitude.is_not(None), School.deleted_at.is_(None)
+        )
+    ).all()
+    points = [MapPoint(*row) for row in rows]
+
+    radius = settings.map_cluster_radius_px
+    max_zoom = settings.map_max_cluster_zoom
+    grouped: Dict[str, List[MapPoint]] = {}
+    for point in points:
+        if point.school_type:
+            grouped.setdefault(point.school_type, []).append(point)
+
+    return MapIndex(
+        all=ClusterHierarchy(points, radius, max_zoom),
+        by_type={t: ClusterHierarchy(p, radius, max_zoom) for t, p in grouped.items()},
+    )
+
+
+map_index: VersionedCache[MapIndex] = VersionedCache(_build_map_index)
@@ -0,0 +1,203 @@
+"""
+Dataset versioning for caches and in-memory read structures.
+
+The importers call ``bump_dataset_version`` after changing school data. Readers
+compare ``current_version`` against the version their cached data was built
+from: ``VersionedCache`` rebuilds in-memory structures (spatial index, map
+clusters, search), and the HTTP response cache keys entries and ETags on it.
+Zone boundaries and prices have a version of their own (``dataset="zones"``),
+so importing them only invalidates what is built from zone data.
+
+Differential imports also record which schools each version created, updated
+or deleted, so consumers that keep their own copies can apply
+``changes_since`` instead of reloading everything.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.dataset import DatasetChange, DatasetVersion
+
+T = TypeVar("T")
+
+CHANGE_ACTIONS = ("created", "updated", "deleted")
+
+# DatasetVersion row of each versioned dataset
+DATASETS = {"schools": 1, "zones": 2}
+
+
+@dataclass
+class ChangeSet:
+    """School ids touched by an import, by action."""
+
+    created: List[int] = field(default_factory=list)
+    updated: List[int] = field(default_factory=list)
+    deleted: List[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.updated or self.deleted)
+
+    def as_dict(self) -> Dict[str, List[int]]:
+        return {action: getattr(self, action) for action in CHANGE_ACTIONS}
+
+
+_version_lock = Lock()
+# Dataset name to (version token, time read)
+_cached_versions: Dict[str, Tuple[str, float]] = {}
+
+
+def _version_query(dataset: str):
+    return select(DatasetVersion.version).where(DatasetVersion.id == DATASETS[dataset])
+
+
+def _fresh_cached_version(dataset: str) -> Optional[str]:
+    with _version_lock:
+        cached = _cached_versions.get(dataset)
+        if cached is not None and time.monotonic() - cached[1] < settings.dataset_version_ttl_seconds:
+            return cached[0]
+    return None
+
+
+def _remember_version(dataset: str, version: Optional[int]) -> str:
+    token = str(version or 0)
+    with _version_lock:
+        _cached_versions[dataset] = (token, time.monotonic())
+    return token
+
+
+def current_version(db: Session, dataset: str = "schools") -> str:
+    """
+    Return the current version of ``dataset`` as a string token.
+
+    The version is only re-read from the database every
+    ``dataset_version_ttl_seconds``, so other workers pick up an import within
+    that window.
+    """
+    cached = _fresh_cached_version(dataset)
+    if cached is not None:
+        return cached
+    return _remember_version(dataset, db.execute(_version_query(dataset)).scalar_one_or_none())
+
+
+async def current_version_async(db: AsyncSession, dataset: str = "schools") -> str:
+    """Async counterpart of ``current_version``."""
+    cached = _fresh_cached_version(dataset)
+    if cached is not None:
+        return cached
+    return _remember_version(dataset, (await db.execute(_version_query(dataset))).scalar_one_or_none())
+
+
+def bump_dataset_version(db: Session, changes: Optional[ChangeSet] = None, *, dataset: str = "schools") -> int:
+    """
+    Increment and commit the version of ``dataset``; call after committing imported data.
+
+    ``changes`` (school ids, so only for ``"schools"``) is recorded against the
+    new version in the same transaction.
+    """
+    if changes and dataset != "schools":
+        raise ValueError("change sets are only recorded for school data")
+    row_id = DATASETS[dataset]
+    now = datetime.utcnow()
+    result = db.execute(
+        update(DatasetVersion)
+        .where(DatasetVersion.id == row_id)
+        .values(version=DatasetVersion.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        db.add(DatasetVersion(id=row_id, version=1, updated_at=now))
+    version = db.execute(_version_query(dataset)).scalar_one()
+    if changes:
+        db.add_all(
+            DatasetChange(version=version, school_id=school_id, action=action)
+            for action, school_ids in changes.as_dict().items()
+            for school_id in school_ids
+        )
+    db.commit()
+    invalidate_version(dataset)
+    return version
+
+
+def changes_since(db: Session, version: int) -> Optional[ChangeSet]:
+    """
+    Net changes between ``version`` and the current version.
+
+    A school is reported under its latest action; ``updated`` covers schools
+    restored after a soft delete, so consumers should treat it as an upsert.
+    Returns ``None`` when some version in the range was bumped without a
+    recorded change set (the row-by-row importer), in which case callers must
+    reload.
+    """
+    current = db.execute(_version_query("schools")).scalar_one_or_none() or 0
+    rows = db.execute(
+        select(DatasetChange.version, DatasetChange.school_id, DatasetChange.action)
+        .where(DatasetChange.version > version)
+        .order_by(DatasetChange.version, DatasetChange.id)
+    ).all()
+    if set(range(version + 1, current + 1)) - {row.version for row in rows}:
+        return None
+
+    first: Dict[int, str] = {}
+    last: Dict[int, str] = {}
+    for row in rows:
+        first.setdefault(row.school_id, row.action)
+        last[row.school_id] = row.action
+    changes = ChangeSet()
+    for school_id, action in last.items():
+        if first[school_id] == "created":
+            # New within the range: still new, or never visible to the caller
+            if action == "deleted":
+                continue
+            action = "created"
+        getattr(changes, action).append(school_id)
+    return changes
+
+
+def invalidate_version(dataset: Optional[str] = None) -> None:
+    """Force the next ``current_version`` call for ``dataset`` (default all) to re-read the database."""
+    with _version_lock:
+        if dataset is None:
+            _cached_versions.clear()
+        else:
+            _cached_versions.pop(dataset, None)
+
+
+class VersionedCache(Generic[T]):
+    """
+    Hold a value built from the database and rebuild it when a version of ``datasets`` changes.
+
+    The builder runs without holding the lock: under ``AsyncSession.run_sync``
+    its queries yield to the event loop, and a request waiting on a thread lock
+    there would block the loop thread the build needs to resume. Requests that
+    miss together may therefore build concurrently; the lock only guards the
+    swap.
+    """
+
+    def __init__(self, builder: Callable[[Session], T], datasets: Sequence[str] = ("schools",)):
+        self._builder = builder
+        self._datasets = tuple(datasets)
+        self._lock = Lock()
+        self._version: Optional[str] = None
+        self._value: Optional[T] = None
+
+    def get(self, db: Session) -> T:
+        version = ".".join(current_version(db, dataset) for dataset in self._datasets)
+        if self._version == version and self._value is not None:
+            return self._value
+
+        value = self._builder(db)
+        with self._lock:
+            self._value = value
+            self._version = version
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._value = None
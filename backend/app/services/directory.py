@@ -0,0 +1,204 @@
+"""
+Parsing of the Ministry of Education schools directory CSV.
+
+The published file starts with a block of metadata lines of varying length, so
+the header row is located by its column names rather than by position. Rows
+are read lazily from the open file and mapped onto ``School`` column values by
+``school_record_from_row``; ``normalize_batch`` is the unit of work handed to
+worker processes by ``app.services.ingest``.
+"""
+import csv
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.services.bulk_import import content_hash
+
+# Columns that identify the header row of the directory export
+HEADER_COLUMNS = ("School Number", "School Name")
+
+DirectoryRow = Tuple[int, Dict[str, str]]  # line number, row
+
+
+def read_directory_rows(csv_path: str, header_columns: Sequence[str] = HEADER_COLUMNS) -> Iterator[DirectoryRow]:
+    """
+    Yield ``(line_number, row)`` for the data rows of the directory CSV.
+
+    The file is streamed line by line; everything before the first row that
+    contains all ``header_columns`` is skipped, as are blank rows.
+    """
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        for cells in reader:
+            fieldnames = [cell.strip() for cell in cells]
+            if all(column in fieldnames for column in header_columns):
+                break
+        else:
+            raise ValueError(f"No header row with columns {', '.join(header_columns)} in {csv_path}")
+
+        for cells in reader:
+            if not any(cell.strip() for cell in cells):
+                continue
+            yield reader.line_num, dict(zip(fieldnames, cells))
+
+
+def normalize_school_type(school_type: str, definition: str) -> str:
+    """Convert CSV school type to database school_type."""
+    if not school_type:
+        return "primary"  # default
+    
+    school_type_lower = school_type.lower()
+    definition_lower = definition.lower() if definition else ""
+    
+    # Map based on School Type and Definition columns
+    if "composite" in school_type_lower:
+        return "composite"
+    elif "secondary" in school_type_lower:
+        if "year 7" in definition_lower or "year 9" in definition_lower:
+            return "secondary"
+        return "secondary"
+    elif "primary" in school_type_lower or "full primary" in school_type_lower:
+        return "primary"
+    elif "intermediate" in school_type_lower:
+        return "intermediate"
+    elif "university" in school_type_lower:
+        return "university"
+    elif "institute" in school_type_lower or "technology" in school_type_lower:
+        return "institute_of_technology"
+    elif "private tertiary" in school_type_lower:
+        return "private_tertiary"
+    elif "kindergarten" in school_type_lower or "early childhood" in school_type_lower:
+        return "kindergarten"
+    else:
+        # Default based on definition
+        if "secondary" in definition_lower:
+            return "secondary"
+        elif "primary" in definition_lower:
+            return "primary"
+        return "primary"
+
+
+def normalize_sector(authority: str) -> Optional[str]:
+    """Convert Authority column to sector."""
+    if not authority:
+        return None
+    
+    authority_lower = authority.lower()
+    if "state" in authority_lower and "integrated" in authority_lower:
+        return "state_integrated"
+    elif "state" in authority_lower:
+        return "public"
+    elif "private" in authority_lower:
+        return "private"
+    else:
+        return "other"
+
+
+def parse_float(value: str) -> Optional[float]:
+    """Safely parse float from string."""
+    if not value or value.strip() == "":
+        return None
+    try:
+        return float(value.strip())
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_int(value: str) -> Optional[int]:
+    """Safely parse int from string."""
+    if not value or value.strip() == "":
+        return None
+    try:
+        return int(value.strip())
+    except (ValueError, AttributeError):
+        return None
+
+
+def build_address(street: str, suburb: str, city: str) -> Optional[str]:
+    """Build full address from components."""
+    parts = []
+    if street and street.strip():
+        parts.append(street.strip())
+    if suburb and suburb.strip():
+        parts.append(suburb.strip())
+    if city and city.strip():
+        parts.append(city.strip())
+    
+    if parts:
+        return ", ".join(parts)
+    return None
+
+
+def school_record_from_row(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Map a CSV row onto ``School`` column values."""
+    # Required fields
+    name = row.get("School Name", "").strip()
+    if not name:
+        return None
+    
+    # School type
+    school_type = normalize_school_type(
+        row.get("School Type", ""),
+        row.get("Definition", "")
+    )
+    
+    # Location
+    region = row.get("Regional Council", "").strip() or None
+    city = row.get("Town / City", "").strip() or None
+    suburb = row.get("Suburb", "").strip() or None
+    address = build_address(
+        row.get("Street", ""),
+        row.get("Suburb", ""),
+        row.get("Town / City", "")
+    )
+    
+    # Coordinates
+    latitude = parse_float(row.get("Latitude", ""))
+    longitude = parse_float(row.get("Longitude", ""))
+    
+    # Contact
+    phone = row.get("Telephone", "").strip() or None
+    email = row.get("Email^", "").strip() or None
+    website = row.get("School Website", "").strip() or None
+    
+    # Principal (store in owner field for now)
+    principal = row.get("Principal*", "").strip() or None
+    
+    return {
+        "school_number": parse_int(row.get("School Number", "")),
+        "name": name,
+        "school_type": school_type,
+        "region": region,
+        "city": city,
+        "suburb": suburb,
+        "address": address,
+        "latitude": latitude,
+        "longitude": longitude,
+        "phone": phone,
+        "email": email,
+        "website_url": website,
+        "owner_or_group": principal,
+    }
+
+
+def normalize_batch(rows: Sequence[DirectoryRow]) -> Tuple[List[Dict[str, Any]], int, List[str]]:
+    """
+    Map a batch of directory rows onto records.
+
+    Returns ``(records, skipped, errors)`` where ``errors`` holds one message
+    per row that could not be parsed. Each record gets its ``content_hash``.
+    Runs in worker processes, so it only takes and returns plain data.
+    """
+    records = []
+    skipped = 0
+    errors = []
+    for line_number, row in rows:
+        try:
+            record = school_record_from_row(row)
+        except Exception as e:
+            errors.append(f"Error processing row {line_number}: {e}")
+            continue
+        if record:
+            record["content_hash"] = content_hash(record)
+            records.append(record)
+        else:
+            skipped += 1
+    return records, skipped, errors
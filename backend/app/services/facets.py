@@ -0,0 +1,159 @@
+"""
+Facet counts for the filter dropdowns.
+
+Each facet field is held as a dictionary-encoded column plus one bitmap per
+distinct value, where a bitmap is a Python ``int`` with bit ``i`` set for row
+``i``. A filter is the OR of its values' bitmaps and the filter set is the AND
+of those, so counting a facet value is a popcount of ``selection & bitmap``.
+As usual for faceted navigation, each facet is counted against every filter
+except its own, so choosing a region still shows the other regions' counts.
+The index is rebuilt once per dataset version.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.school import School
+from app.services.dataset import VersionedCache
+from app.services.search import category_of
+
+FACET_FIELDS = ("region", "city", "suburb", "school_type", "education_system", "fee_band")
+# Filterable but not returned as a facet: the search category of school_type
+FILTER_FIELDS = FACET_FIELDS + ("category",)
+
+# (band, upper bound of annual fee in NZD); the last band is open-ended
+FEE_BANDS: Sequence[Tuple[str, Optional[float]]] = (
+    ("free", 0),
+    ("under_5k", 5_000),
+    ("5k_15k", 15_000),
+    ("15k_30k", 30_000),
+    ("over_30k", None),
+)
+
+
+def fee_band(annual_fee: Optional[float]) -> Optional[str]:
+    """Band of the lowest advertised fee per year (``School.fee_annual_min``); ``None`` when unknown."""
+    if annual_fee is None:
+        return None
+    for band, upper in FEE_BANDS:
+        if upper is None or annual_fee <= upper:
+            return band
+    return None
+
+
+@dataclass
+class _Column:
+    values: List[str]
+    bitmaps: List[int]
+    codes: Dict[str, int]
+
+    @classmethod
+    def build(cls, cells: Iterable[Optional[str]]) -> "_Column":
+        codes: Dict[str, int] = {}
+        values: List[str] = []
+        bitmaps: List[int] = []
+        for row, value in enumerate(cells):
+            if value is None:
+                continue
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(values)
+                values.append(value)
+                bitmaps.append(0)
+            bitmaps[code] |= 1 << row
+        return cls(values, bitmaps, codes)
+
+    def select(self, wanted: Iterable[str]) -> int:
+        bits = 0
+        for value in wanted:
+            code = self.codes.get(value)
+            if code is not None:
+                bits |= self.bitmaps[code]
+        return bits
+
+
+class FacetIndex:
+    def __init__(self, rows: Sequence[Tuple]):
+        """``rows`` are ``(id, region, city, suburb, school_type, education_system, fee_annual_min)``."""
+        self.ids = [row[0] for row in rows]
+        self.positions = {school_id: position for position, school_id in enumerate(self.ids)}
+        self.all = (1 << len(rows)) - 1
+        cells = {
+            "region": [row[1] for row in rows],
+            "city": [row[2] for row in rows],
+            "suburb": [row[3] for row in rows],
+            "school_type": [row[4] for row in rows],
+            "education_system": [row[5] for row in rows],
+            "fee_band": [fee_band(row[6]) for row in rows],
+            "category": [category_of(row[4]) for row in rows],
+        }
+        self.columns = {field: _Column.build(values) for field, values in cells.items()}
+
+    def select_ids(self, ids: Iterable[int]) -> int:
+        bits = 0
+        for school_id in ids:
+            position = self.positions.get(school_id)
+            if position is not None:
+                bits |= 1 << position
+        return bits
+
+    def counts(
+        self,
+        filters: Mapping[str, Sequence[str]],
+        *,
+        restrict: Optional[int] = None,
+        fields: Sequence[str] = FACET_FIELDS,
+        limit: Optional[int] = None,
+    ) -> Tuple[int, Dict[str, List[Tuple[str, int]]]]:
+        """
+        Return the number of matching rows and ``(value, count)`` pairs per facet.
+
+        ``filters`` maps a field to accepted values (OR within a field, AND
+        across fields). ``restrict`` is an extra bitmap applied to everything,
+        e.g. the rows matching a name search. Pairs are sorted by count, then
+        value, and cut to ``limit``.
+        """
+        base = self.all if restrict is None else restrict
+        selections = {
+            field: self.columns[field].select(values) for field, values in filters.items() if values
+        }
+        matched = base
+        for bits in selections.values():
+            matched &= bits
+
+        facets: Dict[str, List[Tuple[str, int]]] = {}
+        for field in fields:
+            # Count each facet against every filter but its own
+            mask = base
+            for other, bits in selections.items():
+                if other != field:
+                    mask &= bits
+            column = self.columns[field]
+            pairs = [
+                (value, count)
+                for value, bitmap in zip(column.values, column.bitmaps)
+                if (count := (mask & bitmap).bit_count())
+            ]
+            pairs.sort(key=lambda pair: (-pair[1], pair[0]))
+            facets[field] = pairs[:limit] if limit is not None else pairs
+        return matched.bit_count(), facets
+
+
+def _build_facet_index(db: Session) -> FacetIndex:
+    rows = db.execute(
+        select(
+            School.id,
+            School.region,
+            School.city,
+            School.suburb,
+            School.school_type,
+            School.education_system,
+            School.fee_annual_min,
+        ).where(School.deleted_at.is_(None))
+    ).all()
+    return FacetIndex([tuple(row) for row in rows])
+
+
+facet_index: VersionedCache[FacetIndex] = VersionedCache(_build_facet_index)
@@ -0,0 +1,369 @@
+"""
+Bulk geo-join: the nearest school of each type and the containing zones for
+many points at once.
+
+A job reads an uploaded CSV or NDJSON file of points lazily and joins it in
+chunks of ``settings.geojoin_chunk_size`` points across a process pool, using
+the streaming pipeline from ``app.services.ingest``. Each worker receives a
+``JoinContext`` once, at start-up:
+
+* per school type, the schools' unit-sphere vectors as one NumPy array. The
+  nearest school of a chunk is the ``argmax`` of a matrix product of the
+  chunk's vectors with that array (largest dot product = shortest
+  great-circle distance), and the distance is computed with a vectorized
+  haversine. The catalogue is a few thousand schools per type, so the
+  exact dense product is cheaper than probing a tree per point.
+* the in-memory zone index (STR-tree and exact ring test) from
+  ``app.services.zones`` for the zones containing each point.
+
+Workers also serialize their chunk, so the calling process only appends
+bytes to the result file, one JSON object per input point in input order.
+Points that cannot be read become ``{"line", "id", "error"}`` objects.
+
+Job state lives in ``settings.geojoin_job_dir`` (a JSON status file next to
+the input and result), so any API worker on the host can report on a job
+while one of them runs it.
+"""
+import csv
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.school import School
+from app.models.zone import SchoolZone
+from app.services.ingest import run_pipeline
+from app.services.spatial import EARTH_RADIUS_KM, spatial_index
+from app.services.zones import ZoneIndex, zone_index
+
+logger = logging.getLogger("app.services.geojoin")
+
+INPUT_FORMATS = ("csv", "ndjson")
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+LAT_KEYS = ("lat", "latitude")
+LNG_KEYS = ("lng", "lon", "longitude")
+REF_KEYS = ("id", "ref")
+
+# Dot products computed at once per school type (8 bytes each)
+_BLOCK_ELEMENTS = 4_000_000
+
+
+class JoinPoint(NamedTuple):
+    line: int
+    ref: Any
+    lat: Optional[float]
+    lng: Optional[float]
+    error: Optional[str] = None
+
+
+def _first(record: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _point(line: int, record: Dict[str, Any]) -> JoinPoint:
+    ref = _first(record, REF_KEYS)
+    try:
+        lat = float(_first(record, LAT_KEYS))
+        lng = float(_first(record, LNG_KEYS))
+    except (TypeError, ValueError):
+        return JoinPoint(line, ref, None, None, "Expected numeric lat and lng")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return JoinPoint(line, ref, None, None, "Coordinates out of range")
+    return JoinPoint(line, ref, lat, lng)
+
+
+def read_points(path: Path, input_format: str) -> Iterator[JoinPoint]:
+    """
+    Points of a CSV file with a header row, or of an NDJSON file.
+
+    Coordinates are read from ``lat``/``latitude`` and ``lng``/``lon``/
+    ``longitude``; ``id`` or ``ref`` is echoed back. Lines are numbered from 1
+    (for CSV, the header is line 1); blank NDJSON lines are skipped.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if input_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield _point(reader.line_num, {key.strip().lower(): value for key, value in record.items() if key})
+            return
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError:
+                yield JoinPoint(line, None, None, None, "Invalid JSON")
+                continue
+            if not isinstance(record, dict):
+                yield JoinPoint(line, None, None, None, "Expected a JSON object")
+                continue
+            yield _point(line, {key.lower(): value for key, value in record.items()})
+
+
+def unit_vectors(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    phi = np.radians(lat)
+    lam = np.radians(lng)
+    cos_phi = np.cos(phi)
+    return np.column_stack((cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)))
+
+
+def haversine_km(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+@dataclass
+class SchoolArrays:
+    """Geocoded schools of one type as parallel arrays."""
+
+    ids: np.ndarray
+    lat: np.ndarray
+    lng: np.ndarray
+    vectors: np.ndarray
+
+    def nearest(self, vectors: np.ndarray, lat: np.ndarray, lng: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of the nearest school to each point and the distances in km."""
+        best = np.empty(len(vectors), dtype=np.int64)
+        step = max(1, _BLOCK_ELEMENTS // len(self.ids))
+        for start in range(0, len(vectors), step):
+            best[start:start + step] = np.argmax(vectors[start:start + step] @ self.vectors.T, axis=1)
+        return best, haversine_km(lat, lng, self.lat[best], self.lng[best])
+
+
+@dataclass
+class JoinContext:
+    schools_by_type: Dict[str, SchoolArrays]
+    names: Dict[int, str]
+    zones: ZoneIndex
+    zone_schools: Dict[int, Optional[int]]
+
+
+def build_context(db: Session) -> JoinContext:
+    """Everything a worker needs, from the current dataset version's in-memory indexes."""
+    index = spatial_index.get(db)
+    ids = np.asarray(index.ids, dtype=np.int64)
+    coordinates = np.asarray(index.coordinates, dtype=np.float64).reshape(-1, 2)
+    vectors = unit_vectors(coordinates[:, 0], coordinates[:, 1])
+    schools_by_type = {}
+    for school_type, (positions, _) in sorted(index.trees_by_type.items()):
+        selected = np.asarray(positions, dtype=np.int64)
+        schools_by_type[school_type] = SchoolArrays(
+            ids=ids[selected],
+            lat=coordinates[selected, 0],
+            lng=coordinates[selected, 1],
+            vectors=vectors[selected],
+        )
+
+    names = dict(
+        db.execute(
+            select(School.id, School.name).where(
+                School.latitude.is_not(None), School.longitude.is_not(None), School.deleted_at.is_(None)
+            )
+        ).all()
+    )
+    zone_schools: Dict[int, Optional[int]] = {}
+    for zone_id, school_id, school_name in db.execute(
+        select(SchoolZone.id, SchoolZone.school_id, School.name)
+        .outerjoin(School, School.id == SchoolZone.school_id)
+        .where(SchoolZone.boundary.is_not(None))
+    ):
+        zone_schools[zone_id] = school_id
+        if school_id is not None:
+            names[school_id] = school_name
+    return JoinContext(
+        schools_by_type=schools_by_type, names=names, zones=zone_index.get(db), zone_schools=zone_schools
+    )
+
+
+_context: Optional[JoinContext] = None
+
+
+def _init_worker(context: JoinContext) -> None:
+    global _context
+    _context = context
+
+
+class JoinedChunk(NamedTuple):
+    body: bytes
+    points: int
+    invalid: int
+
+
+def join_chunk(points: List[JoinPoint]) -> JoinedChunk:
+    """Join one chunk against the worker's ``JoinContext`` and serialize it as NDJSON."""
+    context = _context
+    valid = [point for point in points if point.error is None]
+    lat = np.fromiter((point.lat for point in valid), dtype=np.float64, count=len(valid))
+    lng = np.fromiter((point.lng for point in valid), dtype=np.float64, count=len(valid))
+    vectors = unit_vectors(lat, lng)
+
+    nearest: Dict[str, Tuple[List[int], List[float]]] = {}
+    if valid:
+        for school_type, schools in context.schools_by_type.items():
+            best, distances = schools.nearest(vectors, lat, lng)
+            nearest[school_type] = (schools.ids[best].tolist(), np.round(distances, 3).tolist())
+
+    lines = []
+    position = 0
+    for point in points:
+        if point.error is not None:
+            record = {"line": point.line, "id": point.ref, "error": point.error}
+        else:
+            matches = {}
+            for school_type, (school_ids, distances) in nearest.items():
+                school_id = school_ids[position]
+                matches[school_type] = {
+                    "school_id": school_id,
+                    "name": context.names.get(school_id),
+                    "distance_km": distances[position],
+                }
+            zones = []
+            for zone_id in context.zones.lookup(point.lat, point.lng):
+                school_id = context.zone_schools.get(zone_id)
+                zones.append({"zone_id": zone_id, "school_id": school_id, "school_name": context.names.get(school_id)})
+            record = {"id": point.ref, "lat": point.lat, "lng": point.lng, "nearest": matches, "zones": zones}
+            position += 1
+        lines.append(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+    return JoinedChunk(body=b"".join(lines), points=len(points), invalid=len(points) - len(valid))
+
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobStore:
+    """Status, input and result files of geo-join jobs in one directory."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, job_id: str, suffix: str) -> Path:
+        return self.directory / f"{job_id}.{suffix}"
+
+    def input_path(self, job_id: str) -> Path:
+        return self._path(job_id, "input")
+
+    def result_path(self, job_id: str) -> Path:
+        return self._path(job_id, "ndjson")
+
+    def create(self, input_format: str) -> Dict[str, Any]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.purge_expired()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "format": input_format,
+            "points": 0,
+            "invalid": 0,
+            "elapsed_seconds": 0.0,
+            "points_per_second": None,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+        }
+        self.save(job)
+        return job
+
+    def save(self, job: Dict[str, Any]) -> None:
+        # Written whole and renamed, so readers never see a partial file
+        path = self._path(job["id"], "json")
+        temporary = path.with_suffix(".json.tmp")
+        temporary.write_bytes(orjson.dumps(job))
+        os.replace(temporary, path)
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            return orjson.loads(self._path(job_id, "json").read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def delete(self, job_id: str) -> None:
+        for suffix in ("json", "input", "ndjson", "ndjson.tmp"):
+            self._path(job_id, suffix).unlink(missing_ok=True)
+
+    def purge_expired(self) -> None:
+        """Remove jobs created more than ``geojoin_job_ttl_seconds`` ago."""
+        cutoff = time.time() - settings.geojoin_job_ttl_seconds
+        for path in self.directory.glob("*.json"):
+            if path.stat().st_mtime < cutoff:
+                self.delete(path.stem)
+
+
+job_store = JobStore(settings.geojoin_job_dir)
+
+# Jobs beyond this many wait their turn; each running job has its own process pool
+_runner = ThreadPoolExecutor(max_workers=settings.geojoin_concurrent_jobs, thread_name_prefix="geojoin")
+
+
+def run_job(job_id: str, store: JobStore = job_store) -> Dict[str, Any]:
+    """Run a queued job to completion, recording progress and throughput in its status."""
+    job = store.load(job_id)
+    job["status"] = "running"
+    store.save(job)
+    started = time.perf_counter()
+    result_path = store.result_path(job_id)
+    temporary = result_path.with_suffix(".ndjson.tmp")
+    try:
+        with SessionLocal() as db:
+            context = build_context(db)
+
+        with open(temporary, "wb") as out:
+
+            def write(chunk: JoinedChunk) -> None:
+                out.write(chunk.body)
+                job["points"] += chunk.points
+                job["invalid"] += chunk.invalid
+                job["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+                job["points_per_second"] = round(job["points"] / max(job["elapsed_seconds"], 1e-3), 1)
+                store.save(job)
+
+            run_pipeline(
+                read_points(store.input_path(job_id), job["format"]),
+                join_chunk,
+                write,
+                batch_size=settings.geojoin_chunk_size,
+                workers=settings.geojoin_workers,
+                initializer=_init_worker,
+                initargs=(context,),
+            )
+        os.replace(temporary, result_path)
+        job["status"] = "done"
+    except Exception as e:
+        logger.exception("Geo-join job %s failed", job_id)
+        temporary.unlink(missing_ok=True)
+        job["status"] = "failed"
+        job["error"] = str(e) or e.__class__.__name__
+    finally:
+        store.input_path(job_id).unlink(missing_ok=True)
+        job["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        if job["points"]:
+            job["points_per_second"] = round(job["points"] / max(job["elapsed_seconds"], 1e-3), 1)
+        job["finished_at"] = datetime.utcnow().isoformat()
+        store.save(job)
+    return job
+
+
+def submit_job(job_id: str) -> None:
+    _runner.submit(run_job, job_id)
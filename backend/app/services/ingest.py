@@ -0,0 +1,86 @@
+"""
+Streaming batch pipeline for imports.
+
+Rows are read lazily, grouped into fixed-size batches and normalised in a
+process pool while the calling process writes finished batches to the
+database. At most ``max_pending`` batches are in flight: reading stops until
+the writer has taken the oldest batch, so memory stays bounded by
+``batch_size * max_pending`` rows whatever the size of the input. Batches are
+written in input order.
+"""
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _Inline:
+    """Stand-in for a pool that runs work in the calling process."""
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def run_pipeline(
+    rows: Iterable[T],
+    normalize: Callable[[List[T]], R],
+    write: Callable[[R], None],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> int:
+    """
+    Feed ``rows`` through ``normalize`` (in worker processes) into ``write``.
+
+    ``normalize`` must be a module-level function so it can be sent to the
+    workers. ``workers=0`` normalises in the calling process; ``None`` uses
+    one worker per CPU. ``initializer(*initargs)`` runs once in each worker
+    (or in the calling process), e.g. to install data shared by every batch
+    instead of sending it along with each one. Returns the number of batches
+    written.
+    """
+    if workers == 0:
+        if initializer is not None:
+            initializer(*initargs)
+        return _drain(_Inline(), rows, normalize, write, batch_size, max_pending or 1)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        # Two batches per worker keep workers busy while the writer catches up
+        return _drain(pool, rows, normalize, write, batch_size, max_pending or 2 * workers)
+
+
+def _drain(pool, rows, normalize, write, batch_size: int, max_pending: int) -> int:
+    pending: Deque[Future] = deque()
+    written = 0
+    for batch in batched(rows, batch_size):
+        pending.append(pool.submit(normalize, batch))
+        if len(pending) >= max_pending:
+            write(pending.popleft().result())
+            written += 1
+    while pending:
+        write(pending.popleft().result())
+        written += 1
+    return written
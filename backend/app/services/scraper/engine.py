@@ -0,0 +1,307 @@
+"""
+Polite concurrent HTTP fetching for the scraper.
+
+One pooled ``httpx.AsyncClient`` is shared by all crawl workers. Every host
+gets its own concurrency limit and token bucket, so a crawl over several sites
+runs them in parallel without hammering any one of them. Failed requests
+(transport errors, 429 and 5xx) are retried with exponential backoff and full
+jitter, honouring ``Retry-After``. Responses are kept in an on-disk cache and
+revalidated with ``If-None-Match``/``If-Modified-Since``, so an unchanged page
+costs a 304 instead of a download.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+logger = logging.getLogger("app.services.scraper")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+
+class ScrapeError(Exception):
+    """A page could not be fetched after all retries."""
+
+
+@dataclass
+class Page:
+    url: str
+    body: bytes
+    content_type: str
+    links: List[str] = field(default_factory=list)  # from the Link: rel="next" header
+    from_cache: bool = False
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    cache_hits: int = 0
+    retries: int = 0
+    errors: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def as_dict(self) -> Dict[str, float]:
+        elapsed = self.elapsed
+        return {
+            "pages": self.pages,
+            "cache_hits": self.cache_hits,
+            "cache_hit_ratio": round(self.cache_hits / self.pages, 3) if self.pages else 0.0,
+            "retries": self.retries,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(self.pages / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second on average, in bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class _CachedPage:
+    body: bytes
+    content_type: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class DiskCache:
+    """
+    Response bodies and validators on disk, one pair of files per URL.
+
+    ``aliases`` maps origins (``scheme://host:port``) to stable names used in
+    the cache keys instead, so a site served on a different port each run,
+    like the local fixture server, still finds its cached pages.
+    """
+
+    def __init__(self, directory: str, aliases: Optional[Mapping[str, str]] = None):
+        self.directory = Path(directory)
+        self.aliases = dict(aliases or {})
+
+    def _key(self, url: str) -> str:
+        for origin, alias in self.aliases.items():
+            if url == origin or url.startswith(origin + "/"):
+                return alias + url[len(origin):]
+        return url
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(self._key(url).encode("utf-8")).hexdigest()
+        folder = self.directory / digest[:2]
+        return folder / f"{digest}.json", folder / f"{digest}.body"
+
+    def get(self, url: str) -> Optional[_CachedPage]:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return _CachedPage(body, meta.get("content_type", ""), meta.get("etag"), meta.get("last_modified"))
+
+    def put(self, url: str, page: _CachedPage) -> None:
+        meta_path, body_path = self._paths(url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"url": url, "content_type": page.content_type, "etag": page.etag, "last_modified": page.last_modified}
+        # Write the body first and replace atomically so readers never see a torn pair
+        for path, data in ((body_path, page.body), (meta_path, json.dumps(meta).encode("utf-8"))):
+            partial = path.with_suffix(path.suffix + ".tmp")
+            partial.write_bytes(data)
+            os.replace(partial, path)
+
+
+class _Host:
+    def __init__(self, concurrency: int, rate: float, burst: int):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+
+
+class Fetcher:
+    """Shared client plus per-host limits, retries and the conditional-GET cache."""
+
+    def __init__(
+        self,
+        *,
+        concurrency: int,
+        per_host_concurrency: int,
+        requests_per_second: float,
+        burst: int,
+        max_retries: int,
+        timeout_seconds: float,
+        user_agent: str,
+        cache_dir: Optional[str] = None,
+        cache_aliases: Optional[Mapping[str, str]] = None,
+        stats: Optional[CrawlStats] = None,
+    ):
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            timeout=timeout_seconds,
+            headers={"User-Agent": user_agent},
+            follow_redirects=True,
+        )
+        self.per_host_concurrency = per_host_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.cache = DiskCache(cache_dir, cache_aliases) if cache_dir else None
+        self.stats = stats or CrawlStats()
+        self._hosts: Dict[str, _Host] = {}
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "Fetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _host(self, url: str) -> _Host:
+        netloc = urlsplit(url).netloc
+        host = self._hosts.get(netloc)
+        if host is None:
+            host = self._hosts[netloc] = _Host(self.per_host_concurrency, self.requests_per_second, self.burst)
+        return host
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+        delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), BACKOFF_MAX_SECONDS))
+        return delay
+
+    async def fetch(self, url: str) -> Page:
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache else None
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        host = self._host(url)
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with host.slots:
+                await host.bucket.acquire()
+                try:
+                    response = await self.client.get(url, headers=headers)
+                except httpx.TransportError as e:
+                    response = None
+                    failure = f"{type(e).__name__}: {e}"
+
+            if response is not None:
+                links = [urljoin(url, link["url"]) for link in response.links.values() if link.get("rel") == "next"]
+                if response.status_code == 304 and cached is not None:
+                    self.stats.pages += 1
+                    self.stats.cache_hits += 1
+                    return Page(url, cached.body, cached.content_type, links, from_cache=True)
+                if response.status_code < 300:
+                    content_type = response.headers.get("content-type", "")
+                    if self.cache is not None:
+                        entry = _CachedPage(
+                            response.content,
+                            content_type,
+                            response.headers.get("etag"),
+                            response.headers.get("last-modified"),
+                        )
+                        await asyncio.to_thread(self.cache.put, url, entry)
+                    self.stats.pages += 1
+                    self.stats.bytes += len(response.content)
+                    return Page(url, response.content, content_type, links)
+                failure = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                retry_after = response.headers.get("retry-after")
+
+            if attempt < self.max_retries:
+                self.stats.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        raise ScrapeError(failure)
+
+
+async def crawl(
+    fetcher: Fetcher,
+    seeds: Iterable[str],
+    handle: Callable[[Page], Awaitable[Iterable[str]]],
+    *,
+    workers: int,
+    max_pages: int,
+) -> CrawlStats:
+    """
+    Fetch ``seeds`` and every link ``handle`` returns, with ``workers`` tasks.
+
+    ``handle`` processes a page and returns the URLs to follow; each URL is
+    fetched at most once and at most ``max_pages`` URLs are scheduled.
+    """
+    frontier: "asyncio.Queue[str]" = asyncio.Queue()
+    scheduled = set()
+
+    def schedule(url: str) -> None:
+        if url not in scheduled and len(scheduled) < max_pages:
+            scheduled.add(url)
+            frontier.put_nowait(url)
+
+    for url in seeds:
+        schedule(url)
+
+    async def worker() -> None:
+        while True:
+            url = await frontier.get()
+            try:
+                page = await fetcher.fetch(url)
+                for link in await handle(page):
+                    schedule(link)
+            except Exception as e:
+                fetcher.stats.errors += 1
+                logger.warning("Failed to scrape %s: %s", url, e)
+            finally:
+                frontier.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(workers, 1))]
+    try:
+        await frontier.join()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    fetcher.stats.finished = time.monotonic()
+    return fetcher.stats
@@ -0,0 +1,91 @@
+"""
+Local HTTP server for scraping fixtures offline.
+
+Serves a directory with ``ETag``/``Last-Modified`` validators and ``304``
+responses, like a well-behaved production site. ``failures`` makes the first
+requests for every path answer ``503`` so retries can be exercised.
+"""
+import hashlib
+import mimetypes
+import threading
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+SAMPLE_SITE = Path(__file__).parent / "sample_site"
+
+# Seeds for the bundled sample site, relative to the server's base URL
+SAMPLE_SEEDS = ("/index.html", "/listing.json")
+# Origin the sample site's pages are cached under, whatever port serves them
+SAMPLE_CACHE_ORIGIN = "fixture://sample_site"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FixtureServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path).lstrip("/") or "index.html"
+        target = (self.server.root / path).resolve()
+        if self.server.root not in target.parents or not target.is_file():
+            self.send_error(404)
+            return
+
+        with self.server.lock:
+            self.server.requests[path] += 1
+            attempt = self.server.requests[path]
+        if attempt <= self.server.failures:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = target.read_bytes()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        last_modified = formatdate(target.stat().st_mtime, usegmt=True)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(target.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Serve ``root`` on localhost (a free port unless given) from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, root: Path = SAMPLE_SITE, *, port: int = 0, failures: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.root = Path(root).resolve()
+        self.failures = failures
+        self.requests: Counter = Counter()
+        self.lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
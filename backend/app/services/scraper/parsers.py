@@ -0,0 +1,171 @@
+"""
+Extract kindergartens from scraped pages.
+
+Pages are read as schema.org JSON-LD: ``<script type="application/ld+json">``
+blocks in HTML, or the whole body for JSON responses. ``ChildCare`` and
+``Preschool`` entities become records; ``ItemList`` entries that only carry a
+``url`` are followed, as are ``rel="next"`` links. Only links on the same host
+as the page are returned.
+"""
+import json
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from app.services.bulk_import import content_hash
+from app.services.directory import build_address, parse_float
+
+KINDERGARTEN_TYPES = {"ChildCare", "Preschool"}
+
+
+@dataclass
+class ParsedPage:
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    errors: int = 0
+
+
+class _JsonLdExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[str] = []
+        self.next_links: List[str] = []
+        self._in_json_ld = False
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        if tag == "script" and (attributes.get("type") or "").lower() == "application/ld+json":
+            self._in_json_ld = True
+            self._buffer = []
+        elif tag in ("a", "link") and "next" in (attributes.get("rel") or "").lower().split():
+            if attributes.get("href"):
+                self.next_links.append(attributes["href"])
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._buffer.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_json_ld:
+            self.blocks.append("".join(self._buffer))
+            self._in_json_ld = False
+
+
+def _types(entity: Dict[str, Any]) -> set:
+    value = entity.get("@type")
+    return set(value) if isinstance(value, list) else {value}
+
+
+def _entities(document: Any) -> Iterator[Dict[str, Any]]:
+    """Walk top-level entities, ``@graph`` members and lists."""
+    if isinstance(document, list):
+        for item in document:
+            yield from _entities(item)
+    elif isinstance(document, dict):
+        if "@graph" in document:
+            yield from _entities(document["@graph"])
+        else:
+            yield document
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("value")
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def kindergarten_record(entity: Dict[str, Any], page_url: str) -> Optional[Dict[str, Any]]:
+    """Map a ``ChildCare``/``Preschool`` entity onto ``School`` column values."""
+    name = _text(entity.get("name"))
+    if not name:
+        return None
+
+    entity_url = _text(entity.get("url"))
+    url = urljoin(page_url, entity_url) if entity_url else page_url
+    identifier = _text(entity.get("identifier"))
+    # Prefer the source's own id; fall back to the entity's canonical URL
+    external_id = f"{urlsplit(url).hostname}:{identifier}" if identifier else url
+
+    address = entity.get("address")
+    if isinstance(address, dict):
+        street = _text(address.get("streetAddress")) or ""
+        city = _text(address.get("addressLocality"))
+        region = _text(address.get("addressRegion"))
+        full_address = build_address(street, "", city or "")
+    else:
+        city = region = None
+        full_address = _text(address)
+    geo = entity.get("geo") if isinstance(entity.get("geo"), dict) else {}
+
+    record = {
+        "external_id": external_id,
+        "name": name,
+        "school_type": "kindergarten",
+        "brand_name": _text(entity.get("brand")),
+        "owner_or_group": _text(entity.get("parentOrganization")),
+        "education_system": _text(entity.get("educationalFramework")),
+        "description": _text(entity.get("description")),
+        "region": region,
+        "city": city,
+        "address": full_address,
+        "latitude": parse_float(str(geo.get("latitude", ""))),
+        "longitude": parse_float(str(geo.get("longitude", ""))),
+        "phone": _text(entity.get("telephone")),
+        "email": _text(entity.get("email")),
+        "website_url": _text(entity.get("sameAs")),
+    }
+    record["content_hash"] = content_hash(record)
+    return record
+
+
+def _add_record(parsed: ParsedPage, entity: Dict[str, Any], page_url: str) -> None:
+    try:
+        record = kindergarten_record(entity, page_url)
+    except Exception:
+        parsed.errors += 1
+        return
+    if record:
+        parsed.records.append(record)
+
+
+def parse_page(url: str, body: bytes, content_type: str) -> ParsedPage:
+    parsed = ParsedPage()
+    text = body.decode("utf-8", errors="replace")
+    if "json" in content_type:
+        blocks = [text]
+    else:
+        extractor = _JsonLdExtractor()
+        extractor.feed(text)
+        blocks = extractor.blocks
+        parsed.links.extend(urljoin(url, link) for link in extractor.next_links)
+
+    for block in blocks:
+        try:
+            document = json.loads(block)
+        except ValueError:
+            parsed.errors += 1
+            continue
+        for entity in _entities(document):
+            types = _types(entity)
+            if types & KINDERGARTEN_TYPES:
+                _add_record(parsed, entity, url)
+            elif "ItemList" in types:
+                for element in entity.get("itemListElement") or []:
+                    item = element.get("item", element) if isinstance(element, dict) else element
+                    if isinstance(item, dict) and _types(item) & KINDERGARTEN_TYPES:
+                        _add_record(parsed, item, url)
+                    elif isinstance(item, dict) and item.get("url"):
+                        parsed.links.append(urljoin(url, item["url"]))
+                    elif isinstance(item, str):
+                        parsed.links.append(urljoin(url, item))
+
+    host = urlsplit(url).netloc
+    parsed.links = [link for link in dict.fromkeys(parsed.links) if urlsplit(link).netloc == host]
+    return parsed
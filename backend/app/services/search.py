@@ -0,0 +1,285 @@
+"""
+Fuzzy name search across schools, kindergartens and universities.
+
+Names, suburbs and brand names are folded (diacritics removed, lowercased,
+punctuation collapsed) so "Ōtāhuhu" and "Otahuhu" compare equal. They are then
+matched by trigram overlap, which tolerates small typos.
+
+Two backends are supported:
+
+* **Postgres** – a GIN ``gin_trgm_ops`` index on an immutable
+  ``kiwi_search_text(name, suburb, brand_name)`` expression. Candidates are
+  found with the ``<%`` word-similarity operator and ranked by
+  ``word_similarity`` plus a ``ts_rank`` boost for whole-word matches.
+  Requires the ``pg_trgm`` and ``unaccent`` extensions.
+* **In-memory** – a trigram inverted index built once per dataset version,
+  with the same folding rules.
+
+``settings.search_backend`` selects the backend (``auto``, ``postgres`` or
+``memory``).
+"""
+import logging
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, func, literal, literal_column, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.db.session import forget_extensions, has_extension
+from app.models.school import School
+from app.services.dataset import VersionedCache
+
+logger = logging.getLogger("app.services.search")
+
+# Search categories and the school types they cover; anything not listed
+# under kindergarten or university is a school
+KINDERGARTEN_TYPES: FrozenSet[str] = frozenset({"kindergarten"})
+TERTIARY_TYPES: FrozenSet[str] = frozenset({"university", "institute_of_technology", "private_tertiary"})
+CATEGORIES = ("school", "kindergarten", "university")
+
+# Relative weight of a match in each indexed field
+FIELD_WEIGHTS = (1.0, 0.6, 0.8)  # name, suburb, brand_name
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def fold(value: Optional[str]) -> str:
+    """Lowercase, strip diacritics and collapse punctuation to single spaces."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+
+def trigrams(folded: str) -> FrozenSet[str]:
+    """Trigrams of each word, padded the way pg_trgm pads them."""
+    grams = set()
+    for word in folded.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def category_of(school_type: Optional[str]) -> str:
+    if school_type in KINDERGARTEN_TYPES:
+        return "kindergarten"
+    if school_type in TERTIARY_TYPES:
+        return "university"
+    return "school"
+
+
+def category_filter(category: str) -> ColumnElement:
+    """SQL condition restricting ``School`` rows to a search category."""
+    if category == "kindergarten":
+        return School.school_type.in_(KINDERGARTEN_TYPES)
+    if category == "university":
+        return School.school_type.in_(TERTIARY_TYPES)
+    excluded = KINDERGARTEN_TYPES | TERTIARY_TYPES
+    return School.school_type.is_(None) | School.school_type.not_in(excluded)
+
+
+@dataclass
+class SearchHit:
+    id: int
+    name: str
+    school_type: Optional[str]
+    suburb: Optional[str]
+    city: Optional[str]
+    score: float
+
+    @property
+    def category(self) -> str:
+        return category_of(self.school_type)
+
+
+class TrigramIndex:
+    """Inverted index from trigram to the (document, field) pairs containing it."""
+
+    def __init__(self, rows: Sequence[Tuple[int, str, Optional[str], Optional[str], Optional[str], Optional[str]]]):
+        # rows are (id, name, school_type, suburb, city, brand_name)
+        self.rows = list(rows)
+        self.folded: List[Tuple[str, str, str]] = []
+        self.sizes: List[Tuple[int, int, int]] = []
+        self.postings: Dict[str, List[int]] = {}
+
+        field_count = len(FIELD_WEIGHTS)
+        for doc, (_, name, _, suburb, _, brand) in enumerate(self.rows):
+            fields = (fold(name), fold(suburb), fold(brand))
+            self.folded.append(fields)
+            sizes = []
+            for field, value in enumerate(fields):
+                grams = trigrams(value)
+                sizes.append(len(grams))
+                for gram in grams:
+                    self.postings.setdefault(gram, []).append(doc * field_count + field)
+            self.sizes.append(tuple(sizes))
+
+    def search(self, query: str, *, category: Optional[str] = None, limit: Optional[int] = None) -> List[SearchHit]:
+        folded_query = fold(query)
+        query_grams = trigrams(folded_query)
+        if not query_grams:
+            return []
+
+        shared: Counter = Counter()
+        for gram in query_grams:
+            postings = self.postings.get(gram)
+            if postings:
+                shared.update(postings)
+
+        field_count = len(FIELD_WEIGHTS)
+        min_coverage = settings.search_min_similarity
+        best: Dict[int, float] = {}
+        for key, overlap in shared.items():
+            coverage = overlap / len(query_grams)
+            if coverage < min_coverage:
+                continue
+            doc, field = divmod(key, field_count)
+            field_size = self.sizes[doc][field]
+            jaccard = overlap / (len(query_grams) + field_size - overlap)
+            score = FIELD_WEIGHTS[field] * (0.7 * coverage + 0.3 * jaccard)
+            text_value = self.folded[doc][field]
+            if text_value.startswith(folded_query):
+                score += 0.3
+            elif folded_query in text_value:
+                score += 0.2
+            if score > best.get(doc, 0.0):
+                best[doc] = score
+
+        hits = []
+        for doc, score in best.items():
+            row_id, name, school_type, suburb, city, _ = self.rows[doc]
+            if category and category_of(school_type) != category:
+                continue
+            hits.append(SearchHit(row_id, name, school_type, suburb, city, round(score, 4)))
+
+        hits.sort(key=lambda hit: (-hit.score, hit.name, hit.id))
+        return hits[:limit] if limit is not None else hits
+
+
+def _build_trigram_index(db: Session) -> TrigramIndex:
+    rows = db.execute(
+        select(School.id, School.name, School.school_type, School.suburb, School.city, School.brand_name)
+        .where(School.deleted_at.is_(None))
+    ).all()
+    return TrigramIndex([tuple(row) for row in rows])
+
+
+trigram_index: VersionedCache[TrigramIndex] = VersionedCache(_build_trigram_index)
+
+_SEARCH_TEXT_FUNCTION = """
+CREATE OR REPLACE FUNCTION kiwi_search_text(name text, suburb text, brand_name text)
+RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(public.unaccent('public.unaccent'::regdictionary,
+        coalesce(name, '') || ' ' || coalesce(suburb, '') || ' ' || coalesce(brand_name, '')))
+$$
+"""
+
+_SEARCH_TEXT_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_school_search_trgm ON school "
+    "USING gin (kiwi_search_text(name, suburb, brand_name) gin_trgm_ops)"
+)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Install pg_trgm/unaccent and the trigram index on Postgres, if permitted."""
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+            conn.execute(text(_SEARCH_TEXT_FUNCTION))
+            conn.execute(text(_SEARCH_TEXT_INDEX))
+    except DBAPIError as e:
+        # Without the extensions search falls back to the in-memory index
+        logger.warning("Skipping trigram search index: %s", e)
+    forget_extensions()
+
+
+def use_postgres(db: Session) -> bool:
+    backend = settings.search_backend
+    if backend == "memory":
+        return False
+    if backend == "postgres":
+        return True
+    bind = db.get_bind()
+    return has_extension(bind, "pg_trgm") and has_extension(bind, "unaccent")
+
+
+def _search_document():
+    return func.kiwi_search_text(School.name, School.suburb, School.brand_name)
+
+
+def _use_min_similarity(db: Session) -> None:
+    """
+    Make ``<%`` match at ``settings.search_min_similarity`` for the rest of the
+    transaction, as the in-memory index does, instead of pg_trgm's default
+    ``word_similarity_threshold`` (0.6). The operator, unlike an explicit
+    ``word_similarity() >=`` comparison, is served by the trigram index.
+    """
+    db.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(settings.search_min_similarity), True))
+    )
+
+
+def search(
+    db: Session,
+    query: str,
+    *,
+    category: Optional[str] = None,
+    limit: int,
+) -> List[SearchHit]:
+    """Return the best matching schools for ``query``, most relevant first."""
+    if not use_postgres(db):
+        return trigram_index.get(db).search(query, category=category, limit=limit)
+
+    folded_query = fold(query)
+    if not folded_query:
+        return []
+    _use_min_similarity(db)
+    document = _search_document()
+    ts_query = func.plainto_tsquery(literal_column("'simple'"), folded_query)
+    score = func.word_similarity(folded_query, document) + func.ts_rank(
+        func.to_tsvector(literal_column("'simple'"), document), ts_query
+    )
+    statement = (
+        select(School.id, School.name, School.school_type, School.suburb, School.city, score.label("score"))
+        .where(literal(folded_query).op("<%")(document), School.deleted_at.is_(None))
+        .order_by(score.desc(), School.name, School.id)
+        .limit(limit)
+    )
+    if category:
+        statement = statement.where(category_filter(category))
+    return [
+        SearchHit(row.id, row.name, row.school_type, row.suburb, row.city, round(float(row.score), 4))
+        for row in db.execute(statement)
+    ]
+
+
+def name_filter(db: Session, query: str) -> ColumnElement:
+    """
+    SQL condition matching rows whose name, suburb or brand fuzzily match ``query``.
+
+    Used by the list endpoints in place of ``ILIKE '%query%'``.
+    """
+    if use_postgres(db):
+        _use_min_similarity(db)
+        return literal(fold(query)).op("<%")(_search_document())
+    # Every match, rendered inline: a common word can match more rows than the
+    # driver accepts bind parameters
+    return School.id.in_(bindparam(None, name_matches(db, query), expanding=True, literal_execute=True))
+
+
+def name_matches(db: Session, query: str) -> List[int]:
+    """Ids of all the rows ``name_filter`` matches."""
+    if use_postgres(db):
+        return list(db.execute(select(School.id).where(name_filter(db, query))).scalars())
+    return [hit.id for hit in trigram_index.get(db).search(query)]
@@ -0,0 +1,295 @@
+"""
+Spatial lookups over school coordinates.
+
+Two backends are supported:
+
+* **PostGIS** – distance queries run against a GiST expression index on
+  ``geography(Point(longitude, latitude))`` and use the ``<->`` operator for
+  index-assisted k-nearest-neighbour ordering.
+* **In-memory** – a k-d tree over unit-sphere Cartesian coordinates. Chord
+  length on the unit sphere grows monotonically with great-circle distance,
+  so nearest-neighbour and radius searches in 3D return exactly the haversine
+  ordering without scanning every point.
+
+``settings.spatial_backend`` selects the backend (``auto``, ``postgis`` or
+``memory``); ``auto`` uses PostGIS when the extension is installed.
+"""
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import cast, func, literal_column, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.types import UserDefinedType
+
+from app.core.config import settings
+from app.db.session import has_extension
+from app.models.school import School
+from app.services.dataset import VersionedCache
+
+EARTH_RADIUS_KM = 6371.0088
+
+Vector = Tuple[float, float, float]
+
+
+class _Geography(UserDefinedType):
+    """Minimal stand-in for the PostGIS ``geography`` type so casts render correctly."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "geography"
+
+
+def to_unit_vector(lat: float, lng: float) -> Vector:
+    """Convert latitude/longitude in degrees to a point on the unit sphere."""
+    phi = math.radians(lat)
+    lam = math.radians(lng)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lam = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def km_to_chord(distance_km: float) -> float:
+    """Convert a great-circle distance to the equivalent unit-sphere chord length."""
+    angle = min(distance_km / EARTH_RADIUS_KM, math.pi)
+    return 2 * math.sin(angle / 2)
+
+
+def chord_to_km(chord: float) -> float:
+    """Convert a unit-sphere chord length back to great-circle kilometres."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class KDTree:
+    """
+    Static 3-d tree over unit vectors.
+
+    Nodes are stored in flat lists (point index, split axis, left, right) to
+    keep the structure compact for a few thousand to a few hundred thousand
+    points.
+    """
+
+    def __init__(self, points: Sequence[Vector]):
+        self.points = list(points)
+        self._index: List[int] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self.root = self._build(list(range(len(self.points))), 0)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, indices: List[int], depth: int) -> int:
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+
+        node = len(self._index)
+        self._index.append(indices[mid])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+
+        left = self._build(indices[:mid], depth + 1)
+        right = self._build(indices[mid + 1:], depth + 1)
+        self._left[node] = left
+        self._right[node] = right
+        return node
+
+    def query(
+        self,
+        target: Vector,
+        k: int,
+        max_distance: Optional[float] = None,
+    ) -> List[Tuple[float, int]]:
+        """
+        Return up to ``k`` ``(distance, point_index)`` pairs nearest to ``target``.
+
+        Distances are Euclidean (chord lengths). When ``max_distance`` is set,
+        points further away are never returned and subtrees beyond it are pruned.
+        """
+        if k <= 0 or self.root < 0:
+            return []
+
+        bound = max_distance * max_distance if max_distance is not None else math.inf
+        # Max-heap of the best k candidates as (-distance², point_index)
+        best: List[Tuple[float, int]] = []
+        points = self.points
+        stack = [self.root]
+
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            idx = self._index[node]
+            point = points[idx]
+            dx = point[0] - target[0]
+            dy = point[1] - target[1]
+            dz = point[2] - target[2]
+            dist2 = dx * dx + dy * dy + dz * dz
+
+            if dist2 <= bound:
+                if len(best) < k:
+                    heapq.heappush(best, (-dist2, idx))
+                elif dist2 < -best[0][0]:
+                    heapq.heapreplace(best, (-dist2, idx))
+                if len(best) == k:
+                    bound = min(bound, -best[0][0])
+
+            axis = self._axis[node]
+            diff = target[axis] - point[axis]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            # Visit the far side only if the splitting plane is within the current bound
+            if diff * diff <= bound:
+                stack.append(far)
+            stack.append(near)
+
+        return sorted((math.sqrt(-neg), idx) for neg, idx in best)
+
+
+@dataclass
+class SpatialIndex:
+    """k-d trees over all geocoded schools, plus one tree per school type."""
+
+    ids: List[int]
+    coordinates: List[Tuple[float, float]]
+    tree: KDTree
+    trees_by_type: Dict[str, Tuple[List[int], KDTree]]
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[int, Optional[str], float, float]]) -> "SpatialIndex":
+        ids = [row[0] for row in rows]
+        coordinates = [(row[2], row[3]) for row in rows]
+        tree = KDTree([to_unit_vector(lat, lng) for lat, lng in coordinates])
+
+        grouped: Dict[str, List[int]] = {}
+        for position, row in enumerate(rows):
+            if row[1]:
+                grouped.setdefault(row[1], []).append(position)
+        trees_by_type = {
+            school_type: (positions, KDTree([tree.points[p] for p in positions]))
+            for school_type, positions in grouped.items()
+        }
+        return cls(ids=ids, coordinates=coordinates, tree=tree, trees_by_type=trees_by_type)
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        limit: int,
+        radius_km: Optional[float] = None,
+        school_type: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """Return ``(school_id, distance_km)`` pairs ordered by distance."""
+        if school_type:
+            if school_type not in self.trees_by_type:
+                return []
+            positions, tree = self.trees_by_type[school_type]
+        else:
+            positions, tree = None, self.tree
+
+        max_chord = km_to_chord(radius_km) if radius_km is not None else None
+        matches = tree.query(to_unit_vector(lat, lng), limit, max_chord)
+
+        results = []
+        for _, idx in matches:
+            position = positions[idx] if positions is not None else idx
+            point_lat, point_lng = self.coordinates[position]
+            results.append((self.ids[position], haversine_km(lat, lng, point_lat, point_lng)))
+        return results
+
+
+def _build_spatial_index(db: Session) -> SpatialIndex:
+    rows = db.execute(
+        select(School.id, School.school_type, School.latitude, School.longitude).where(
+            School.latitude.is_not(None), School.longitude.is_not(None), School.deleted_at.is_(None)
+        )
+    ).all()
+    return SpatialIndex.from_rows([tuple(row) for row in rows])
+
+
+spatial_index: VersionedCache[SpatialIndex] = VersionedCache(_build_spatial_index)
+
+
+def use_postgis(db: Session) -> bool:
+    backend = settings.spatial_backend
+    if backend == "memory":
+        return False
+    if backend == "postgis":
+        return True
+    return has_extension(db.get_bind(), "postgis")
+
+
+def school_geography():
+    """SQL expression for a school's location; must match the GiST index expression."""
+    # The SRID is rendered inline: a bound parameter would stop the planner
+    # from matching the expression against the index definition.
+    return cast(
+        func.ST_SetSRID(func.ST_MakePoint(School.longitude, School.latitude), literal_column("4326")),
+        _Geography(),
+    )
+
+
+def ensure_spatial_index(engine: Engine) -> None:
+    """Create the GiST expression index used by the PostGIS backend, if PostGIS is installed."""
+    if not has_extension(engine, "postgis"):
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_school_geography ON school USING gist "
+                "((ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography)) "
+                "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            )
+        )
+
+
+def find_nearby(
+    db: Session,
+    lat: float,
+    lng: float,
+    *,
+    limit: int,
+    radius_km: Optional[float] = None,
+    school_type: Optional[str] = None,
+) -> List[Tuple[School, float]]:
+    """Return ``(school, distance_km)`` pairs nearest to the given point."""
+    if use_postgis(db):
+        point = cast(func.ST_SetSRID(func.ST_MakePoint(lng, lat), literal_column("4326")), _Geography())
+        geography = school_geography()
+        query = (
+            select(School, (func.ST_Distance(geography, point) / 1000.0).label("distance_km"))
+            .where(School.latitude.is_not(None), School.longitude.is_not(None), School.deleted_at.is_(None))
+            .order_by(geography.op("<->")(point))
+            .limit(limit)
+        )
+        if radius_km is not None:
+            query = query.where(func.ST_DWithin(geography, point, radius_km * 1000.0))
+        if school_type:
+            query = query.where(School.school_type == school_type)
+        return [(school, float(distance)) for school, distance in db.execute(query).all()]
+
+    matches = spatial_index.get(db).nearest(
+        lat, lng, limit=limit, radius_km=radius_km, school_type=school_type
+    )
+    if not matches:
+        return []
+    schools = db.execute(select(School).where(School.id.in_([school_id for school_id, _ in matches])))
+    by_id = {school.id: school for school in schools.scalars()}
+    return [(by_id[school_id], distance) for school_id, distance in matches if school_id in by_id]
@@ -0,0 +1,179 @@
+"""
+Strong subjects of universities and other tertiary providers.
+
+``School.strong_subjects`` keeps the comma-separated text as imported. The
+same subjects are normalized into ``subject`` (one row per subject) and
+``schoolsubject`` (school/subject pairs), so filtering by subject and ranking
+within a subject are index lookups instead of ``LIKE`` scans over that text.
+Subjects are matched on their folded name (``app.services.search.fold``), so
+"Māori Studies" and "maori studies" are one subject; the first spelling seen
+is the one displayed.
+
+``set_subjects`` replaces the subjects of some schools, ``sync_subjects``
+rebuilds them from ``strong_subjects`` after that column was written some
+other way.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.school import School, SchoolSubject, Subject
+from app.services.ingest import batched
+from app.services.search import category_filter, fold
+
+# Rows per statement and per IN list
+BATCH_SIZE = 1000
+
+_SEPARATORS = re.compile(r"[,;\n]")
+
+
+def split_subjects(text: Optional[str]) -> List[str]:
+    """The subjects in a ``strong_subjects`` string, trimmed and without repeats."""
+    names: Dict[str, str] = {}
+    for part in _SEPARATORS.split(text or ""):
+        name = " ".join(part.split())
+        key = fold(name)
+        if key:
+            names.setdefault(key, name)
+    return list(names.values())
+
+
+def subject_ids(db: Session, names: Iterable[str], *, create: bool = False) -> Dict[str, int]:
+    """Ids of the subjects called ``names`` by folded name; unknown ones are added with ``create``."""
+    wanted: Dict[str, str] = {}
+    for name in names:
+        wanted.setdefault(fold(name), name)
+    wanted.pop("", None)
+    ids: Dict[str, int] = {}
+    for batch in batched(list(wanted), BATCH_SIZE):
+        ids.update(db.execute(select(Subject.key, Subject.id).where(Subject.key.in_(batch))).all())
+    missing = [{"key": key, "name": name} for key, name in wanted.items() if key not in ids]
+    if create and missing:
+        for batch in batched(missing, BATCH_SIZE):
+            db.execute(insert(Subject), batch)
+        ids.update(
+            db.execute(
+                select(Subject.key, Subject.id).where(Subject.key.in_([row["key"] for row in missing]))
+            ).all()
+        )
+    return ids
+
+
+def set_subjects(db: Session, subjects: Mapping[int, Sequence[str]]) -> int:
+    """
+    Replace the subjects of the schools in ``subjects`` (school id to names).
+
+    Commits, and returns the number of school/subject pairs written.
+    """
+    ids = subject_ids(db, (name for names in subjects.values() for name in names), create=True)
+    for batch in batched(list(subjects), BATCH_SIZE):
+        db.execute(delete(SchoolSubject).where(SchoolSubject.school_id.in_(batch)))
+    pairs = list(
+        {
+            (school_id, ids[fold(name)])
+            for school_id, names in subjects.items()
+            for name in names
+            if fold(name)
+        }
+    )
+    for batch in batched([{"school_id": school, "subject_id": subject} for school, subject in pairs], BATCH_SIZE):
+        db.execute(insert(SchoolSubject), batch)
+    db.execute(delete(Subject).where(~exists().where(SchoolSubject.subject_id == Subject.id)))
+    db.commit()
+    return len(pairs)
+
+
+def sync_subjects(db: Session, school_ids: Optional[Sequence[int]] = None) -> int:
+    """Rebuild the subjects of ``school_ids`` (every school when ``None``) from ``strong_subjects``."""
+    query = select(School.id, School.strong_subjects)
+    if school_ids is None:
+        rows = db.execute(query).all()
+    else:
+        rows = []
+        for batch in batched(list(school_ids), BATCH_SIZE):
+            rows.extend(db.execute(query.where(School.id.in_(batch))).all())
+    return set_subjects(db, {school_id: split_subjects(text) for school_id, text in rows})
+
+
+def subject_filter(db: Session, names: Sequence[str]) -> ColumnElement:
+    """Condition for schools with any of the subjects ``names``; unknown names match nothing."""
+    ids = list(subject_ids(db, names).values())
+    return exists().where(SchoolSubject.school_id == School.id, SchoolSubject.subject_id.in_(ids))
+
+
+def subjects_by_school(db: Session, school_ids: Sequence[int]) -> Dict[int, List[str]]:
+    """Subject names of all ``school_ids`` with one query, alphabetically per school."""
+    subjects: Dict[int, List[str]] = {school_id: [] for school_id in school_ids}
+    if school_ids:
+        query = (
+            select(SchoolSubject.school_id, Subject.name)
+            .join(Subject, Subject.id == SchoolSubject.subject_id)
+            .where(SchoolSubject.school_id.in_(school_ids))
+            .order_by(Subject.name)
+        )
+        for school_id, name in db.execute(query):
+            subjects[school_id].append(name)
+    return subjects
+
+
+def _active_universities() -> List[ColumnElement]:
+    return [category_filter("university"), School.deleted_at.is_(None)]
+
+
+def subject_counts(db: Session) -> List[Dict[str, Any]]:
+    """Every subject with the number of active universities offering it, by name."""
+    query = (
+        select(Subject.name, func.count().label("universities"))
+        .join(SchoolSubject, SchoolSubject.subject_id == Subject.id)
+        .join(School, School.id == SchoolSubject.school_id)
+        .where(*_active_universities())
+        .group_by(Subject.id, Subject.name)
+        .order_by(Subject.name)
+    )
+    return [row._asdict() for row in db.execute(query)]
+
+
+def top_by_subject(
+    db: Session,
+    *,
+    k: int,
+    subjects: Optional[Sequence[str]] = None,
+    university_type: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    The ``k`` best QS-ranked universities of each subject (all subjects by default).
+
+    One query ranks every subject's universities with ``row_number()`` over
+    ``(qs_world_rank, id)`` and keeps the first ``k``; unranked universities
+    are left out. Returns ``{"subject", "school_ids"}`` per subject, by name.
+    """
+    conditions = [*_active_universities(), School.qs_world_rank.is_not(None)]
+    if university_type:
+        conditions.append(School.university_type == university_type)
+    if subjects is not None:
+        conditions.append(SchoolSubject.subject_id.in_(list(subject_ids(db, subjects).values())))
+    ranked = (
+        select(
+            SchoolSubject.subject_id,
+            SchoolSubject.school_id,
+            func.row_number()
+            .over(partition_by=SchoolSubject.subject_id, order_by=(School.qs_world_rank, School.id))
+            .label("position"),
+        )
+        .join(School, School.id == SchoolSubject.school_id)
+        .where(*conditions)
+        .subquery()
+    )
+    query = (
+        select(Subject.name, ranked.c.school_id)
+        .join(ranked, ranked.c.subject_id == Subject.id)
+        .where(ranked.c.position <= k)
+        .order_by(Subject.name, ranked.c.position)
+    )
+    groups: Dict[str, List[int]] = {}
+    for name, school_id in db.execute(query):
+        groups.setdefault(name, []).append(school_id)
+    return [{"subject": name, "school_ids": school_ids} for name, school_ids in groups.items()]
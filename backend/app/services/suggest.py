@@ -0,0 +1,106 @@
+"""
+Prefix suggestions for the search box.
+
+Folded names are kept in sorted arrays so a keystroke is answered with a
+``bisect`` and a short forward scan, without touching the database. Whole-name
+prefix matches ("ota" -> "Ōtāhuhu College") are returned before word prefix
+matches ("coll" -> "Ōtāhuhu College"). Arrays are kept per search category and
+rebuilt once per dataset version.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.school import School
+from app.services.dataset import VersionedCache
+from app.services.search import category_of, fold
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    id: int
+    name: str
+    school_type: Optional[str]
+    suburb: Optional[str]
+
+
+class _PrefixArray:
+    """Sorted ``(key, position)`` pairs searchable by prefix."""
+
+    def __init__(self, entries: List[Tuple[str, int]]):
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.positions = [position for _, position in entries]
+
+    def scan(self, prefix: str):
+        start = bisect_left(self.keys, prefix)
+        for i in range(start, len(self.keys)):
+            if not self.keys[i].startswith(prefix):
+                return
+            yield self.positions[i]
+
+
+class PrefixIndex:
+    def __init__(self, suggestions: Sequence[Suggestion]):
+        self.suggestions = list(suggestions)
+        names: List[Tuple[str, int]] = []
+        words: List[Tuple[str, int]] = []
+        for position, suggestion in enumerate(self.suggestions):
+            folded = fold(suggestion.name)
+            names.append((folded, position))
+            # Index every word after the first so "college" finds "Ōtāhuhu College"
+            tokens = folded.split()
+            for i in range(1, len(tokens)):
+                words.append((" ".join(tokens[i:]), position))
+        self.names = _PrefixArray(names)
+        self.words = _PrefixArray(words)
+
+    def suggest(self, query: str, limit: int) -> List[Suggestion]:
+        prefix = fold(query)
+        if not prefix:
+            return []
+        seen = set()
+        results = []
+        for array in (self.names, self.words):
+            for position in array.scan(prefix):
+                if position in seen:
+                    continue
+                seen.add(position)
+                results.append(self.suggestions[position])
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+@dataclass
+class SuggestIndex:
+    all: PrefixIndex
+    by_category: Dict[str, PrefixIndex]
+
+    def suggest(self, query: str, *, category: Optional[str] = None, limit: int) -> List[Suggestion]:
+        if category:
+            index = self.by_category.get(category)
+            return index.suggest(query, limit) if index else []
+        return self.all.suggest(query, limit)
+
+
+def _build_suggest_index(db: Session) -> SuggestIndex:
+    rows = db.execute(
+        select(School.id, School.name, School.school_type, School.suburb).where(School.deleted_at.is_(None))
+    ).all()
+    suggestions = [Suggestion(*row) for row in rows]
+
+    grouped: Dict[str, List[Suggestion]] = {}
+    for suggestion in suggestions:
+        grouped.setdefault(category_of(suggestion.school_type), []).append(suggestion)
+
+    return SuggestIndex(
+        all=PrefixIndex(suggestions),
+        by_category={category: PrefixIndex(items) for category, items in grouped.items()},
+    )
+
+
+suggest_index: VersionedCache[SuggestIndex] = VersionedCache(_build_suggest_index)
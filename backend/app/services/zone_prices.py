@@ -0,0 +1,304 @@
+"""
+Zone house-price history and its precomputed rollups.
+
+Observations (one median price per zone and date) are ingested in batches
+with ``INSERT ... ON CONFLICT DO UPDATE`` on ``(zone_id, observed_on)``; the
+statement returns only rows that were inserted or actually changed, and those
+are the only ones that trigger a refresh. Two rollup tables are then updated
+incrementally:
+
+* ``zonepricerollup`` – per zone and year, the median of the year's
+  observations. Only the (zone, year) pairs that received new observations are
+  recomputed, and the zones' ``median_house_price``/``last_updated`` move to
+  their latest observation.
+* ``zonepricestat`` – per year and per region, school type, both or neither,
+  percentiles of the zones' yearly medians and the year-over-year change of
+  the median. Only the years whose rollups changed are recomputed, plus the
+  following year, whose change is relative to them.
+
+Readers (``/zones/{id}/history`` and ``/zones/stats``) only select from these
+tables. ``refresh_all`` rebuilds everything, e.g. after schools changed
+region.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.school import School
+from app.models.zone import SchoolZone, ZonePriceObservation, ZonePriceRollup, ZonePriceStat
+from app.services.ingest import batched
+
+PERCENTILES = (10, 25, 50, 75, 90)
+OBSERVATION_COLUMNS = ("zone_id", "observed_on", "median_price", "sales_count", "source")
+
+# Rows per statement and per IN list
+BATCH_SIZE = 1000
+
+ZoneYear = Tuple[int, int]
+
+
+def _upsert(db: Session, table, rows: List[Dict[str, Any]], keys: Tuple[str, ...]):
+    """``INSERT ... ON CONFLICT (keys) DO UPDATE`` of the other columns when they differ."""
+    insert_ = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = insert_(table).values(rows)
+    columns = [column for column in rows[0] if column not in keys]
+    return statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: statement.excluded[column] for column in columns},
+        where=or_(*[statement.excluded[column].is_distinct_from(table.c[column]) for column in columns]),
+    )
+
+
+class PriceIngest:
+    """
+    Load observations batch by batch, then refresh the rollups they touched.
+
+    Feed batches of observation dicts (``zone_id``, ``observed_on``,
+    ``median_price``, optional ``sales_count`` and ``source``) to ``apply``
+    and call ``finish`` once. Observations for unknown zones are skipped.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.zone_ids: Set[int] = set(db.execute(select(SchoolZone.id)).scalars())
+        self.dirty: Set[ZoneYear] = set()
+        self.counts = {"changed": 0, "unchanged": 0, "skipped": 0, "total": 0}
+
+    def apply(self, observations: Iterable[Dict[str, Any]]) -> None:
+        rows: Dict[Tuple[int, date], Dict[str, Any]] = {}
+        for observation in observations:
+            self.counts["total"] += 1
+            if observation.get("zone_id") not in self.zone_ids or observation.get("median_price") is None:
+                self.counts["skipped"] += 1
+                continue
+            # Within a batch the last observation for a date wins
+            rows[(observation["zone_id"], observation["observed_on"])] = {
+                column: observation.get(column) for column in OBSERVATION_COLUMNS
+            }
+        if not rows:
+            return
+
+        table = ZonePriceObservation.__table__
+        changed = 0
+        for batch in batched(rows.values(), BATCH_SIZE):
+            statement = _upsert(self.db, table, batch, ("zone_id", "observed_on"))
+            for zone_id, observed_on in self.db.execute(statement.returning(table.c.zone_id, table.c.observed_on)):
+                self.dirty.add((zone_id, observed_on.year))
+                changed += 1
+        self.db.commit()
+        self.counts["changed"] += changed
+        self.counts["unchanged"] += len(rows) - changed
+
+    def finish(self) -> Dict[str, Any]:
+        """Refresh the rollups of the changed (zone, year) pairs and return the counts."""
+        years = refresh_rollups(self.db, self.dirty)
+        refreshed = refresh_stats(self.db, years)
+        return {**self.counts, "rollups": len(self.dirty), "stat_years": refreshed}
+
+
+def refresh_rollups(db: Session, zone_years: Set[ZoneYear]) -> Set[int]:
+    """Recompute the yearly medians of ``zone_years`` and the zones' latest prices; returns the years."""
+    if not zone_years:
+        return set()
+    rollups = []
+    latest = []
+    zones = sorted({zone_id for zone_id, _ in zone_years})
+    for batch in batched(zones, BATCH_SIZE):
+        by_zone_year: Dict[ZoneYear, List[Tuple[date, float]]] = defaultdict(list)
+        last: Dict[int, Tuple[date, float]] = {}
+        for zone_id, observed_on, price in db.execute(
+            select(ZonePriceObservation.zone_id, ZonePriceObservation.observed_on, ZonePriceObservation.median_price)
+            .where(ZonePriceObservation.zone_id.in_(batch))
+            .order_by(ZonePriceObservation.zone_id, ZonePriceObservation.observed_on)
+        ):
+            last[zone_id] = (observed_on, price)
+            if (zone_id, observed_on.year) in zone_years:
+                by_zone_year[(zone_id, observed_on.year)].append((observed_on, price))
+        for (zone_id, year), observations in by_zone_year.items():
+            rollups.append(
+                {
+                    "zone_id": zone_id,
+                    "year": year,
+                    "median_price": float(np.median([price for _, price in observations])),
+                    "observations": len(observations),
+                    "last_observed_on": observations[-1][0],
+                }
+            )
+        latest.extend(
+            {"id": zone_id, "median_house_price": price, "last_updated": observed_on}
+            for zone_id, (observed_on, price) in last.items()
+        )
+
+    for batch in batched(rollups, BATCH_SIZE):
+        db.execute(_upsert(db, ZonePriceRollup.__table__, batch, ("zone_id", "year")))
+    if latest:
+        db.execute(update(SchoolZone), latest)
+    db.commit()
+    return {year for _, year in zone_years}
+
+
+def _groups(region: Optional[str], school_type: Optional[str]) -> List[Tuple[str, str]]:
+    """Stat groups a zone counts towards; "" is all regions or all types."""
+    groups = [("", "")]
+    if region:
+        groups.append((region, ""))
+    if school_type:
+        groups.append(("", school_type))
+    if region and school_type:
+        groups.append((region, school_type))
+    return groups
+
+
+def refresh_stats(db: Session, years: Set[int]) -> List[int]:
+    """Recompute the stats of ``years`` and the year after each; returns the years refreshed."""
+    candidates = years | {year + 1 for year in years}
+    present = set(
+        db.execute(select(ZonePriceRollup.year).where(ZonePriceRollup.year.in_(candidates)).distinct()).scalars()
+    )
+    refreshed = []
+    # Ascending, so each year's change is against freshly computed stats
+    for year in sorted(candidates):
+        db.execute(delete(ZonePriceStat).where(ZonePriceStat.year == year))
+        if year not in present:
+            continue
+        previous = {
+            (row.region, row.school_type): row.median
+            for row in db.execute(
+                select(ZonePriceStat.region, ZonePriceStat.school_type, ZonePriceStat.median).where(
+                    ZonePriceStat.year == year - 1
+                )
+            )
+        }
+        values: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+        for region, school_type, price in db.execute(
+            select(School.region, School.school_type, ZonePriceRollup.median_price)
+            .join(SchoolZone, SchoolZone.id == ZonePriceRollup.zone_id)
+            .outerjoin(School, School.id == SchoolZone.school_id)
+            .where(ZonePriceRollup.year == year, School.deleted_at.is_(None))
+        ):
+            for group in _groups(region, school_type):
+                values[group].append(price)
+
+        refreshed_at = datetime.utcnow()
+        stats = []
+        for (region, school_type), prices in values.items():
+            p10, p25, median, p75, p90 = (float(value) for value in np.percentile(prices, PERCENTILES))
+            before = previous.get((region, school_type))
+            stats.append(
+                {
+                    "year": year,
+                    "region": region,
+                    "school_type": school_type,
+                    "zones": len(prices),
+                    "p10": p10,
+                    "p25": p25,
+                    "median": median,
+                    "p75": p75,
+                    "p90": p90,
+                    "yoy_change": (median - before) / before if before else None,
+                    "refreshed_at": refreshed_at,
+                }
+            )
+        for batch in batched(stats, BATCH_SIZE):
+            db.execute(insert(ZonePriceStat), batch)
+        refreshed.append(year)
+    db.commit()
+    return refreshed
+
+
+def refresh_all(db: Session) -> Dict[str, Any]:
+    """Rebuild every rollup and stat from the observations."""
+    zone_years = {
+        (zone_id, observed_on.year)
+        for zone_id, observed_on in db.execute(
+            select(ZonePriceObservation.zone_id, ZonePriceObservation.observed_on)
+        )
+    }
+    db.execute(delete(ZonePriceRollup))
+    db.execute(delete(ZonePriceStat))
+    years = refresh_rollups(db, zone_years)
+    return {"rollups": len(zone_years), "stat_years": refresh_stats(db, years)}
+
+
+def zone_history(db: Session, zone_id: int) -> Dict[str, Any]:
+    """A zone's observations and yearly medians (with the change on the previous year), oldest first."""
+    observations = [
+        row._asdict()
+        for row in db.execute(
+            select(
+                ZonePriceObservation.observed_on,
+                ZonePriceObservation.median_price,
+                ZonePriceObservation.sales_count,
+            )
+            .where(ZonePriceObservation.zone_id == zone_id)
+            .order_by(ZonePriceObservation.observed_on)
+        )
+    ]
+    yearly = []
+    previous: Optional[Dict[str, Any]] = None
+    for row in db.execute(
+        select(ZonePriceRollup.year, ZonePriceRollup.median_price, ZonePriceRollup.observations)
+        .where(ZonePriceRollup.zone_id == zone_id)
+        .order_by(ZonePriceRollup.year)
+    ):
+        entry = row._asdict()
+        entry["yoy_change"] = None
+        if previous is not None and previous["year"] == entry["year"] - 1 and previous["median_price"]:
+            entry["yoy_change"] = (entry["median_price"] - previous["median_price"]) / previous["median_price"]
+        yearly.append(entry)
+        previous = entry
+    return {"zone_id": zone_id, "observations": observations, "yearly": yearly}
+
+
+STAT_DIMENSIONS = ("region", "school_type")
+
+
+def zone_stats(
+    db: Session,
+    *,
+    by: Tuple[str, ...] = (),
+    region: Optional[str] = None,
+    school_type: Optional[str] = None,
+    year: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Precomputed stats, one row per group and year.
+
+    ``by`` names the dimensions to break down by; a dimension that is also
+    filtered on is kept to the filter's value. Overall figures have neither.
+    """
+    query = select(
+        ZonePriceStat.year,
+        ZonePriceStat.region,
+        ZonePriceStat.school_type,
+        ZonePriceStat.zones,
+        ZonePriceStat.p10,
+        ZonePriceStat.p25,
+        ZonePriceStat.median,
+        ZonePriceStat.p75,
+        ZonePriceStat.p90,
+        ZonePriceStat.yoy_change,
+    )
+    for dimension, value in zip(STAT_DIMENSIONS, (region, school_type)):
+        column = getattr(ZonePriceStat, dimension)
+        if value:
+            query = query.where(column == value)
+        elif dimension in by:
+            query = query.where(column != "")
+        else:
+            query = query.where(column == "")
+    if year is not None:
+        query = query.where(ZonePriceStat.year == year)
+    query = query.order_by(ZonePriceStat.region, ZonePriceStat.school_type, ZonePriceStat.year)
+    rows = []
+    for row in db.execute(query):
+        entry = row._asdict()
+        entry["region"] = entry["region"] or None
+        entry["school_type"] = entry["school_type"] or None
+        rows.append(entry)
+    return rows
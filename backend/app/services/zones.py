@@ -0,0 +1,264 @@
+"""
+Which school zones contain a point.
+
+Zone boundaries are stored as GeoJSON ``Polygon``/``MultiPolygon`` geometries
+in WGS84 longitude/latitude (``schoolzone.boundary``), as loaded by
+``scripts/import_zone_boundaries.py``. Two backends answer lookups:
+
+* **PostGIS** – ``ST_Covers`` against a GiST expression index on
+  ``ST_SetSRID(ST_GeomFromGeoJSON(boundary), 4326)``; the index narrows the
+  candidates by bounding box and PostGIS runs the exact test on those only.
+  A batch of points is one query joining the zones against ``unnest`` of the
+  coordinates.
+* **In-memory** – an STR-packed R-tree over the bounding box of every polygon
+  part, rebuilt once per dataset version, followed by an exact even-odd ray
+  casting test against the candidates' rings (vectorized per ring).
+
+``settings.spatial_backend`` selects the backend, as for nearby searches.
+Points exactly on a boundary count as inside for PostGIS; the ray casting test
+may place them on either side.
+"""
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import Float, cast, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.session import has_extension
+from app.models.school import School
+from app.models.zone import SchoolZone
+from app.services.dataset import VersionedCache
+from app.services.spatial import use_postgis
+
+Box = Tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+Ring = Tuple[np.ndarray, np.ndarray]  # closed ring as x and y arrays
+Polygon = List[Ring]  # exterior ring, then holes
+
+GEOMETRY_TYPES = ("Polygon", "MultiPolygon")
+
+
+class GeometryError(ValueError):
+    pass
+
+
+def normalize_geometry(geometry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a GeoJSON zone geometry and strip it to ``type`` and ``coordinates``.
+
+    Raises ``GeometryError`` for other geometry types, empty or unclosable
+    rings and coordinates outside longitude/latitude range (e.g. NZTM
+    exports that were not reprojected to EPSG:4326).
+    """
+    kind = geometry.get("type") if isinstance(geometry, dict) else None
+    if kind not in GEOMETRY_TYPES:
+        raise GeometryError(f"Expected a Polygon or MultiPolygon, got {kind}")
+    polygons = [geometry["coordinates"]] if kind == "Polygon" else geometry["coordinates"]
+    if not polygons:
+        raise GeometryError("Empty geometry")
+    for polygon in polygons:
+        if not polygon:
+            raise GeometryError("Polygon without rings")
+        for ring in polygon:
+            if len(ring) < 3:
+                raise GeometryError("Ring with fewer than 3 positions")
+            for position in ring:
+                lng, lat = position[0], position[1]
+                if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+                    raise GeometryError(f"Coordinate {lng}, {lat} is not WGS84 longitude/latitude")
+    return {"type": kind, "coordinates": geometry["coordinates"]}
+
+
+def parse_polygons(boundary: str) -> List[Polygon]:
+    """Polygons of a stored boundary with every ring closed."""
+    geometry = json.loads(boundary)
+    parts = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+    polygons = []
+    for part in parts:
+        rings = []
+        for ring in part:
+            coordinates = np.asarray(ring, dtype=np.float64)[:, :2]
+            if not np.array_equal(coordinates[0], coordinates[-1]):
+                coordinates = np.vstack([coordinates, coordinates[:1]])
+            rings.append((coordinates[:, 0].copy(), coordinates[:, 1].copy()))
+        polygons.append(rings)
+    return polygons
+
+
+def ring_contains(ring: Ring, x: float, y: float) -> bool:
+    """Even-odd test: does a ray from ``(x, y)`` cross the ring an odd number of times?"""
+    xs, ys = ring
+    x0, y0, x1, y1 = xs[:-1], ys[:-1], xs[1:], ys[1:]
+    spans = (y0 > y) != (y1 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    return bool(np.count_nonzero(spans & (x < crossing_x)) % 2)
+
+
+def polygon_contains(polygon: Polygon, x: float, y: float) -> bool:
+    exterior, *holes = polygon
+    return ring_contains(exterior, x, y) and not any(ring_contains(hole, x, y) for hole in holes)
+
+
+def ring_box(ring: Ring) -> Box:
+    xs, ys = ring
+    return float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())
+
+
+Entry = Tuple[Box, Union[int, list]]
+
+
+class STRtree:
+    """
+    Read-only R-tree packed with the Sort-Tile-Recursive algorithm.
+
+    Entries are sorted into vertical slabs by box centre x, each slab by
+    centre y, and cut into nodes of ``node_capacity``; the same packing is
+    repeated on the nodes until one level fits in the root. Packing leaves
+    nodes full and their boxes small, so a point query visits few of them.
+    """
+
+    def __init__(self, boxes: Sequence[Box], node_capacity: int = 16):
+        self.node_capacity = node_capacity
+        level: List[Entry] = [(box, item) for item, box in enumerate(boxes)]
+        while len(level) > node_capacity:
+            level = self._pack(level)
+        self.root: List[Entry] = level
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._leaves(self.root))
+
+    def _pack(self, entries: List[Entry]) -> List[Entry]:
+        capacity = self.node_capacity
+        slab_count = math.ceil(math.sqrt(math.ceil(len(entries) / capacity)))
+        slab_size = slab_count * capacity
+        entries = sorted(entries, key=lambda entry: entry[0][0] + entry[0][2])
+        nodes: List[Entry] = []
+        for start in range(0, len(entries), slab_size):
+            slab = sorted(entries[start:start + slab_size], key=lambda entry: entry[0][1] + entry[0][3])
+            for offset in range(0, len(slab), capacity):
+                children = slab[offset:offset + capacity]
+                box = (
+                    min(child[0][0] for child in children),
+                    min(child[0][1] for child in children),
+                    max(child[0][2] for child in children),
+                    max(child[0][3] for child in children),
+                )
+                nodes.append((box, children))
+        return nodes
+
+    def _leaves(self, entries: List[Entry]) -> Iterator[int]:
+        for _, child in entries:
+            if isinstance(child, list):
+                yield from self._leaves(child)
+            else:
+                yield child
+
+    def query_point(self, x: float, y: float) -> List[int]:
+        """Items whose box contains the point."""
+        items = []
+        stack = [self.root]
+        while stack:
+            for (min_x, min_y, max_x, max_y), child in stack.pop():
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    if isinstance(child, list):
+                        stack.append(child)
+                    else:
+                        items.append(child)
+        return items
+
+
+@dataclass
+class ZoneIndex:
+    """Polygon parts of every zone boundary behind an STR-tree of their bounding boxes."""
+
+    zone_ids: List[int]
+    parts: List[Tuple[int, Polygon]]  # (position in zone_ids, polygon)
+    tree: STRtree
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[int, str]]) -> "ZoneIndex":
+        """``rows`` are ``(zone_id, boundary)``."""
+        zone_ids = []
+        parts = []
+        for position, (zone_id, boundary) in enumerate(rows):
+            zone_ids.append(zone_id)
+            parts.extend((position, polygon) for polygon in parse_polygons(boundary))
+        tree = STRtree([ring_box(polygon[0]) for _, polygon in parts])
+        return cls(zone_ids=zone_ids, parts=parts, tree=tree)
+
+    def lookup(self, lat: float, lng: float) -> List[int]:
+        """Ids of the zones containing the point, ascending."""
+        found = set()
+        for item in self.tree.query_point(lng, lat):
+            position, polygon = self.parts[item]
+            if position not in found and polygon_contains(polygon, lng, lat):
+                found.add(position)
+        return sorted(self.zone_ids[position] for position in found)
+
+
+# Zones of removed schools disappear with them; zones without a school stay
+_ACTIVE_ZONE = (SchoolZone.boundary.is_not(None), School.deleted_at.is_(None))
+
+
+def _build_zone_index(db: Session) -> ZoneIndex:
+    rows = db.execute(
+        select(SchoolZone.id, SchoolZone.boundary)
+        .outerjoin(School, School.id == SchoolZone.school_id)
+        .where(*_ACTIVE_ZONE)
+        .order_by(SchoolZone.id)
+    ).all()
+    return ZoneIndex.from_rows([tuple(row) for row in rows])
+
+
+# Built from zones and the schools they belong to
+zone_index: VersionedCache[ZoneIndex] = VersionedCache(_build_zone_index, datasets=("schools", "zones"))
+
+
+def zone_geometry():
+    """SQL expression for a zone's boundary; must match the GiST index expression."""
+    return func.ST_SetSRID(func.ST_GeomFromGeoJSON(SchoolZone.boundary), literal_column("4326"))
+
+
+def ensure_zone_index(engine: Engine) -> None:
+    """Create the GiST expression index used by the PostGIS backend, if PostGIS is installed."""
+    if not has_extension(engine, "postgis"):
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_schoolzone_boundary ON schoolzone USING gist "
+                "((ST_SetSRID(ST_GeomFromGeoJSON(boundary), 4326))) WHERE boundary IS NOT NULL"
+            )
+        )
+
+
+def zones_containing(db: Session, points: Sequence[Tuple[float, float]]) -> List[List[int]]:
+    """For each ``(lat, lng)``, the ids of the zones containing it, ascending."""
+    if not points:
+        return []
+    if not use_postgis(db):
+        index = zone_index.get(db)
+        return [index.lookup(lat, lng) for lat, lng in points]
+
+    coordinates = func.unnest(
+        cast([lat for lat, _ in points], ARRAY(Float)),
+        cast([lng for _, lng in points], ARRAY(Float)),
+    ).table_valued("lat", "lng", with_ordinality="position").render_derived()
+    point = func.ST_SetSRID(func.ST_MakePoint(coordinates.c.lng, coordinates.c.lat), literal_column("4326"))
+    query = (
+        select(coordinates.c.position, SchoolZone.id)
+        .select_from(coordinates)
+        .join(SchoolZone, func.ST_Covers(zone_geometry(), point))
+        .outerjoin(School, School.id == SchoolZone.school_id)
+        .where(*_ACTIVE_ZONE)
+        .order_by(coordinates.c.position, SchoolZone.id)
+    )
+    matches: List[List[int]] = [[] for _ in points]
+    for position, zone_id in db.execute(query):
+        matches[position - 1].append(zone_id)
+    return matches
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare requests/sec of sync (threadpool) and async database routes.
+
+Serves two identical endpoints from one uvicorn worker - a ``def`` route on
+the sync psycopg2 engine and an ``async def`` route on the asyncpg engine -
+and drives each at increasing concurrency.
+
+Usage:
+    pip install httpx
+    python scripts/benchmark_db_modes.py [--requests 2000] [--concurrency 1,8,32,128]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_async_db, get_db
+from app.models.school import School
+
+PAGE_QUERY = select(School).order_by(School.name, School.id).limit(20)
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync")
+def sync_page(db: Session = Depends(get_db)):
+    return db.execute(PAGE_QUERY).scalars().all()
+
+
+@bench_app.get("/async")
+async def async_page(db: AsyncSession = Depends(get_async_db)):
+    return (await db.exec(PAGE_QUERY)).all()
+
+
+def start_server(port: int) -> uvicorn.Server:
+    config = uvicorn.Config(bench_app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_load(url: str, total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    remaining = total
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        # Warm up pools on both sides
+        await asyncio.gather(*(client.get(url) for _ in range(min(concurrency, 8))))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    server = start_server(args.port)
+    try:
+        print(f"{'mode':<6} {'concurrency':>11} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for mode in ("sync", "async"):
+            for concurrency in levels:
+                result = asyncio.run(
+                    run_load(f"http://127.0.0.1:{args.port}/{mode}", args.requests, concurrency)
+                )
+                print(
+                    f"{mode:<6} {concurrency:>11} {result['rps']:>9.0f} "
+                    f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+                )
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
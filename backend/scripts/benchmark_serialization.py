@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Compare the list endpoints' JSON path with the ORM + response_model path.
+
+For each row count, times fetching and serializing that many schools:
+
+* ``model`` - ``select(School)`` into ORM instances, validated against
+  ``List[SchoolRead]`` and rendered by the standard JSON encoder, as FastAPI
+  does for a ``response_model`` route.
+* ``fast`` - ``select(*READ_COLUMNS)`` into plain rows, rendered with orjson,
+  as ``/schools`` and ``/kindergartens`` do now.
+
+The schools are synthetic and live in an in-memory SQLite database, so the
+numbers isolate hydration and serialization from network and disk.
+
+Usage:
+    python scripts/benchmark_serialization.py [--rows 100,1000,10000] [--repeat 20]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+
+from app.models.school import School
+from app.schemas.school import SchoolRead
+from app.services.catalogue import READ_COLUMNS
+
+SCHOOL_LIST = TypeAdapter(List[SchoolRead])
+
+
+def seed(session: Session, count: int) -> None:
+    rng = random.Random(42)
+    types = ["primary", "intermediate", "secondary", "composite", "kindergarten"]
+    suburbs = ["Epsom", "Remuera", "Ponsonby", "Karori", "Fendalton", "Riccarton", "Ōtāhuhu"]
+    session.execute(
+        insert(School),
+        [
+            {
+                "school_number": number,
+                "name": f"{rng.choice(suburbs)} School {number}",
+                "school_type": rng.choice(types),
+                "region": "Auckland Region",
+                "city": "Auckland",
+                "suburb": rng.choice(suburbs),
+                "address": f"{rng.randint(1, 400)} Main Road",
+                "latitude": -36.8 - rng.random(),
+                "longitude": 174.7 + rng.random(),
+                "phone": "09 555 0100",
+                "email": f"office@school{number}.school.nz",
+                "website_url": f"https://school{number}.school.nz",
+                "fee_min": rng.choice([None, 0.0, 250.0, 1200.0]),
+                "fee_currency": "NZD",
+                "fee_unit": "per_term",
+            }
+            for number in range(1, count + 1)
+        ],
+    )
+    session.commit()
+
+
+def model_path(session: Session, count: int) -> bytes:
+    schools = session.execute(select(School).order_by(School.name, School.id).limit(count)).scalars().all()
+    content = SCHOOL_LIST.dump_python(SCHOOL_LIST.validate_python(schools), mode="json")
+    # FastAPI's JSONResponse rendering
+    body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+    session.expunge_all()
+    return body.encode("utf-8")
+
+
+def fast_path(session: Session, count: int) -> bytes:
+    rows = session.execute(select(*READ_COLUMNS).order_by(School.name, School.id).limit(count))
+    return orjson.dumps([row._asdict() for row in rows])
+
+
+def measure(function: Callable[[Session, int], bytes], session: Session, count: int, repeat: int) -> float:
+    function(session, count)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(session, count)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.rows.split(",")]
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        seed(session, max(counts))
+        if orjson.loads(fast_path(session, 50)) != json.loads(model_path(session, 50)):
+            sys.exit("The two paths produce different documents")
+
+        print(f"{'rows':>6} {'model ms':>9} {'fast ms':>8} {'speedup':>8} {'fast rows/s':>12}")
+        for count in counts:
+            model = measure(model_path, session, count, args.repeat)
+            fast = measure(fast_path, session, count, args.repeat)
+            print(f"{count:>6} {model * 1000:>9.2f} {fast * 1000:>8.2f} {model / fast:>7.1f}x {count / fast:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
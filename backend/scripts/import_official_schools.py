@@ -3,13 +3,23 @@
 Import official New Zealand schools directory CSV into database.
 
 Usage:
-    python scripts/import_official_schools.py /path/to/directory.csv
+    python scripts/import_official_schools.py /path/to/directory.csv [--row-by-row]
+        [--batch-size 1000] [--workers N] [--keep-missing]
+
+By default the file is streamed in batches: rows are normalised and hashed in
+a pool of --workers processes (one per CPU by default, 0 for none), rows whose
+content hash is unchanged are skipped, and the rest of each batch is merged
+with a set-based upsert keyed on the Ministry school number. Schools no longer
+in the directory are soft-deleted unless --keep-missing is given or some rows
+failed to parse. The dataset version is only bumped when something changed.
+--row-by-row uses the ORM path that matches existing schools on
+(name, school_type).
 """
 
+import argparse
 import sys
-import csv
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Tuple
 from sqlalchemy.orm import Session
 from sqlmodel import select
 
@@ -18,230 +28,120 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.db.session import SessionLocal, init_db
 from app.models.school import School
-
-
-def normalize_school_type(school_type: str, definition: str) -> str:
-    """Convert CSV school type to database school_type."""
-    if not school_type:
-        return "primary"  # default
-    
-    school_type_lower = school_type.lower()
-    definition_lower = definition.lower() if definition else ""
-    
-    # Map based on School Type and Definition columns
-    if "composite" in school_type_lower:
-        return "composite"
-    elif "secondary" in school_type_lower:
-        if "year 7" in definition_lower or "year 9" in definition_lower:
-            return "secondary"
-        return "secondary"
-    elif "primary" in school_type_lower or "full primary" in school_type_lower:
-        return "primary"
-    elif "intermediate" in school_type_lower:
-        return "intermediate"
-    elif "university" in school_type_lower:
-        return "university"
-    elif "institute" in school_type_lower or "technology" in school_type_lower:
-        return "institute_of_technology"
-    elif "private tertiary" in school_type_lower:
-        return "private_tertiary"
-    elif "kindergarten" in school_type_lower or "early childhood" in school_type_lower:
-        return "kindergarten"
-    else:
-        # Default based on definition
-        if "secondary" in definition_lower:
-            return "secondary"
-        elif "primary" in definition_lower:
-            return "primary"
-        return "primary"
-
-
-def normalize_sector(authority: str) -> Optional[str]:
-    """Convert Authority column to sector."""
-    if not authority:
-        return None
-    
-    authority_lower = authority.lower()
-    if "state" in authority_lower and "integrated" in authority_lower:
-        return "state_integrated"
-    elif "state" in authority_lower:
-        return "public"
-    elif "private" in authority_lower:
-        return "private"
-    else:
-        return "other"
-
-
-def parse_float(value: str) -> Optional[float]:
-    """Safely parse float from string."""
-    if not value or value.strip() == "":
-        return None
-    try:
-        return float(value.strip())
-    except (ValueError, AttributeError):
-        return None
-
-
-def parse_int(value: str) -> Optional[int]:
-    """Safely parse int from string."""
-    if not value or value.strip() == "":
-        return None
-    try:
-        return int(value.strip())
-    except (ValueError, AttributeError):
-        return None
-
-
-def build_address(street: str, suburb: str, city: str) -> Optional[str]:
-    """Build full address from components."""
-    parts = []
-    if street and street.strip():
-        parts.append(street.strip())
-    if suburb and suburb.strip():
-        parts.append(suburb.strip())
-    if city and city.strip():
-        parts.append(city.strip())
-    
-    if parts:
-        return ", ".join(parts)
-    return None
+from app.services.bulk_import import DifferentialImport
+from app.services.dataset import ChangeSet, bump_dataset_version
+from app.services.directory import normalize_batch, read_directory_rows, school_record_from_row
+from app.services.ingest import DEFAULT_BATCH_SIZE, run_pipeline
 
 
 def create_school_from_row(row: Dict[str, str]) -> Optional[School]:
     """Create School object from CSV row."""
     try:
-        # Required fields
-        name = row.get("School Name", "").strip()
-        if not name:
-            return None
-        
-        # School type
-        school_type = normalize_school_type(
-            row.get("School Type", ""),
-            row.get("Definition", "")
-        )
-        
-        # Level (from Definition)
-        level = row.get("Definition", "").strip() or None
-        
-        # Sector (from Authority)
-        sector = normalize_sector(row.get("Authority", ""))
-        
-        # Location
-        region = row.get("Regional Council", "").strip() or None
-        city = row.get("Town / City", "").strip() or None
-        suburb = row.get("Suburb", "").strip() or None
-        address = build_address(
-            row.get("Street", ""),
-            row.get("Suburb", ""),
-            row.get("Town / City", "")
-        )
-        
-        # Coordinates
-        latitude = parse_float(row.get("Latitude", ""))
-        longitude = parse_float(row.get("Longitude", ""))
-        
-        # Contact
-        phone = row.get("Telephone", "").strip() or None
-        email = row.get("Email^", "").strip() or None
-        website = row.get("School Website", "").strip() or None
-        
-        # Principal (store in owner field for now)
-        principal = row.get("Principal*", "").strip() or None
-        
-        # Create school object
-        school = School(
-            name=name,
-            school_type=school_type,
-            level=level,
-            sector=sector,
-            region=region,
-            city=city,
-            suburb=suburb,
-            address=address,
-            latitude=latitude,
-            longitude=longitude,
-            phone=phone,
-            email=email,
-            website=website,
-            owner=principal,
-        )
-        
-        return school
-        
+        record = school_record_from_row(row)
+        return School(**record) if record else None
     except Exception as e:
         print(f"Error creating school from row: {e}")
         return None
 
 
+def bulk_import_schools_from_csv(
+    csv_path: str,
+    db: Session,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    delete_missing: bool = True,
+) -> Tuple[Dict[str, int], ChangeSet]:
+    """
+    Stream the CSV into a differential import keyed on the school number.
+
+    Rows are normalised and hashed in a process pool; unchanged rows are
+    dropped and the rest of each batch is merged with one staged upsert, so
+    memory use does not grow with the size of the file. Returns the counts and
+    the set of schools created, updated and soft-deleted.
+    """
+    differential = DifferentialImport(db, key="school_number")
+    skipped = 0
+    errors = 0
+    
+    def write(batch):
+        nonlocal skipped, errors
+        records, batch_skipped, batch_errors = batch
+        for message in batch_errors:
+            print(message)
+        skipped += batch_skipped
+        errors += len(batch_errors)
+        differential.apply(records)
+        print(f"Processed {differential.counts['total'] + skipped + errors} rows...")
+    
+    print(f"Reading CSV file: {csv_path}")
+    run_pipeline(
+        read_directory_rows(csv_path),
+        normalize_batch,
+        write,
+        batch_size=batch_size,
+        workers=workers,
+    )
+    if errors and delete_missing:
+        # A row that failed to parse is not evidence that the school closed
+        print("Not deleting missing schools because some rows failed to parse")
+        delete_missing = False
+    result = differential.finish(delete_missing=delete_missing)
+    result["skipped"] += skipped
+    result["errors"] = errors
+    result["total"] += skipped + errors
+    return result, differential.changes
+
+
 def import_schools_from_csv(csv_path: str, db: Session, update_existing: bool = True) -> Dict[str, int]:
     """Import schools from CSV file."""
     created = 0
     updated = 0
     skipped = 0
     errors = 0
+    pending = 0
     
     print(f"Reading CSV file: {csv_path}")
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        # Read all lines
-        lines = f.readlines()
-        
-        # Line 17 (index 16) is the header row
-        # Line 18 (index 17) is an empty row
-        # Line 19 (index 18) onwards are data rows
-        header_line = lines[16].strip()
-        fieldnames = [field.strip() for field in header_line.split(',')]
-        
-        # Skip first 18 lines (metadata + header + empty row)
-        data_lines = lines[18:]
-        
-        # Read CSV from data lines
-        reader = csv.DictReader(data_lines, fieldnames=fieldnames)
-        
-        for row_num, row in enumerate(reader, start=19):
-            try:
-                # Skip empty rows
-                if not row or not any(v.strip() if v else False for v in row.values()):
-                    skipped += 1
-                    continue
-                
-                school = create_school_from_row(row)
-                if not school:
-                    skipped += 1
-                    continue
-                
-                # Check if school already exists (by name and school_type)
-                statement = select(School).where(
-                    School.name == school.name,
-                    School.school_type == school.school_type
-                )
-                existing = db.execute(statement).scalar_one_or_none()
-                
-                if existing:
-                    if update_existing:
-                        # Update existing record
-                        for field, value in school.dict(exclude={'id'}).items():
-                            if value is not None:
-                                setattr(existing, field, value)
-                        db.add(existing)
-                        updated += 1
-                    else:
-                        skipped += 1
+    for row_num, row in read_directory_rows(csv_path):
+        try:
+            school = create_school_from_row(row)
+            if not school:
+                skipped += 1
+                continue
+            
+            # Check if school already exists (by name and school_type)
+            statement = select(School).where(
+                School.name == school.name,
+                School.school_type == school.school_type
+            )
+            existing = db.execute(statement).scalar_one_or_none()
+            
+            if existing:
+                if update_existing:
+                    # Update existing record
+                    for field, value in school.dict(exclude={'id'}).items():
+                        if value is not None:
+                            setattr(existing, field, value)
+                    db.add(existing)
+                    updated += 1
                 else:
-                    # Create new record
-                    db.add(school)
-                    created += 1
+                    skipped += 1
+            else:
+                # Create new record
+                db.add(school)
+                created += 1
+            
+            # Commit every 100 processed records
+            pending += 1
+            if pending >= 100:
+                db.commit()
+                pending = 0
+                print(f"Processed {created + updated} schools...")
                 
-                # Commit every 100 records
-                if (created + updated) % 100 == 0:
-                    db.commit()
-                    print(f"Processed {created + updated} schools...")
-                    
-            except Exception as e:
-                print(f"Error processing row {row_num}: {e}")
-                errors += 1
-                continue
+        except Exception as e:
+            print(f"Error processing row {row_num}: {e}")
+            errors += 1
+            continue
     
     # Final commit
     db.commit()
@@ -257,11 +157,15 @@ def import_schools_from_csv(csv_path: str, db: Session, update_existing: bool =
 
 def main():
     """Main function."""
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/import_official_schools.py /path/to/directory.csv")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path")
+    parser.add_argument("--row-by-row", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--keep-missing", action="store_true", help="Do not soft-delete schools missing from the file")
+    args = parser.parse_args()
     
-    csv_path = sys.argv[1]
+    csv_path = args.csv_path
     
     if not Path(csv_path).exists():
         print(f"Error: CSV file not found: {csv_path}")
@@ -275,16 +179,30 @@ def main():
     db = SessionLocal()
     try:
         print(f"\nStarting import from: {csv_path}")
-        result = import_schools_from_csv(csv_path, db, update_existing=True)
+        if args.row_by_row:
+            result = import_schools_from_csv(csv_path, db, update_existing=True)
+            version = bump_dataset_version(db)
+        else:
+            result, changes = bulk_import_schools_from_csv(
+                csv_path, db, args.batch_size, args.workers, delete_missing=not args.keep_missing
+            )
+            # Leave caches alone when the directory did not change
+            version = bump_dataset_version(db, changes) if changes else None
         
         print("\n" + "="*50)
         print("Import Summary:")
         print("="*50)
         print(f"Created: {result['created']}")
         print(f"Updated: {result['updated']}")
+        if "unchanged" in result:
+            print(f"Unchanged: {result['unchanged']}")
+        if "restored" in result:
+            print(f"Restored: {result['restored']}")
+            print(f"Deleted: {result['deleted']}")
         print(f"Skipped: {result['skipped']}")
         print(f"Errors: {result['errors']}")
         print(f"Total processed: {result['total']}")
+        print(f"Dataset version: {version if version is not None else 'unchanged'}")
         print("="*50)
         
     except Exception as e:
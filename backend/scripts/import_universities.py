@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Import universities and other tertiary providers with their QS rank and
+strong subjects.
+
+Usage:
+    python scripts/import_universities.py /path/to/universities.csv
+    python scripts/import_universities.py --resync
+
+The CSV has a header row with ``name`` and any of ``school_type`` (default
+``university``; also ``institute_of_technology`` or ``private_tertiary``),
+``university_type``, ``qs_world_rank``, ``strong_subjects`` (separated by
+commas or semicolons), ``region``, ``city``, ``suburb``, ``address``,
+``latitude``, ``longitude``, ``phone``, ``email`` and ``website_url``. Rows
+are matched to existing providers on (name, school_type); only the columns
+present in the file are written. Strong subjects are stored both as text and
+in the normalized subject tables that /universities filters on. The dataset
+version is bumped when something changed.
+--resync rebuilds the subject tables from every school's strong_subjects
+instead, e.g. after that column was edited directly in the database.
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal, init_db
+from app.models.school import School
+from app.services.dataset import ChangeSet, bump_dataset_version
+from app.services.search import TERTIARY_TYPES
+from app.services.subjects import set_subjects, split_subjects, sync_subjects
+
+TEXT_COLUMNS = (
+    "university_type", "region", "city", "suburb", "address", "phone", "email", "website_url", "strong_subjects",
+)
+FLOAT_COLUMNS = ("latitude", "longitude")
+IMPORTED_COLUMNS = TEXT_COLUMNS + FLOAT_COLUMNS + ("qs_world_rank",)
+
+
+def record_from_row(row: Dict[str, str], columns: List[str]) -> Dict[str, Any]:
+    """The School values of a CSV row, for the ``columns`` the file has."""
+    school_type = (row.get("school_type") or "").strip() or "university"
+    if school_type not in TERTIARY_TYPES:
+        raise ValueError(f"not a tertiary school_type: {school_type!r}")
+    name = " ".join((row.get("name") or "").split())
+    if not name:
+        raise ValueError("missing name")
+    record: Dict[str, Any] = {"name": name, "school_type": school_type}
+    for column in columns:
+        value = (row.get(column) or "").strip() or None
+        if column == "qs_world_rank":
+            record[column] = int(value) if value else None
+        elif column in FLOAT_COLUMNS:
+            record[column] = float(value) if value else None
+        elif column == "strong_subjects":
+            # Stored in the normalized spelling, as /universities shows it
+            record[column] = ", ".join(split_subjects(value)) or None
+        else:
+            record[column] = value
+    return record
+
+
+def import_universities_from_csv(csv_path: str, db: Session) -> Tuple[Dict[str, int], ChangeSet]:
+    """Import the providers in ``csv_path``; returns the counts and the changed school ids."""
+    result = {"created": 0, "updated": 0, "unchanged": 0, "errors": 0, "total": 0}
+    changes = ChangeSet()
+
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        if "name" not in (reader.fieldnames or []):
+            raise ValueError("the CSV needs a name column")
+        columns = [column for column in reader.fieldnames if column in IMPORTED_COLUMNS]
+        # A provider listed twice is imported once, from its last row
+        records: Dict[tuple, Dict[str, Any]] = {}
+        for row in reader:
+            result["total"] += 1
+            try:
+                record = record_from_row(row, columns)
+                records[(record["name"], record["school_type"])] = record
+            except (TypeError, ValueError) as e:
+                print(f"Error in row {reader.line_num}: {e}")
+                result["errors"] += 1
+
+    selected = [getattr(School, column) for column in columns]
+    existing = {
+        (row.name, row.school_type): row
+        for row in db.execute(
+            select(School.id, School.name, School.school_type, *selected).where(
+                School.school_type.in_(TERTIARY_TYPES)
+            )
+        )
+    }
+
+    updates = []
+    subjects: Dict[int, List[str]] = {}
+    for key, record in records.items():
+        row = existing.get(key)
+        if row is None:
+            school_id = db.execute(insert(School).values(record).returning(School.id)).scalar_one()
+            changes.created.append(school_id)
+            result["created"] += 1
+        elif any(getattr(row, column) != record[column] for column in columns):
+            school_id = row.id
+            updates.append({"id": school_id, **{column: record[column] for column in columns}})
+            changes.updated.append(school_id)
+            result["updated"] += 1
+        else:
+            result["unchanged"] += 1
+            continue
+        if "strong_subjects" in record:
+            subjects[school_id] = split_subjects(record["strong_subjects"])
+    if updates:
+        db.execute(update(School), updates)
+    db.commit()
+    result["subject_links"] = set_subjects(db, subjects) if subjects else 0
+    return result, changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", nargs="?")
+    parser.add_argument("--resync", action="store_true", help="Rebuild the subject tables from strong_subjects")
+    args = parser.parse_args()
+
+    if not args.resync and (not args.csv_path or not Path(args.csv_path).exists()):
+        print(f"Error: CSV file not found: {args.csv_path}")
+        sys.exit(1)
+
+    print("Initializing database...")
+    init_db()
+
+    db = SessionLocal()
+    try:
+        if args.resync:
+            print("\nRebuilding subjects from strong_subjects")
+            result = {"subject_links": sync_subjects(db)}
+            version = bump_dataset_version(db)
+        else:
+            print(f"\nImporting universities from: {args.csv_path}")
+            result, changes = import_universities_from_csv(args.csv_path, db)
+            version = bump_dataset_version(db, changes) if changes else None
+
+        print("\n" + "=" * 50)
+        print("Import Summary:")
+        print("=" * 50)
+        for key, value in result.items():
+            print(f"{key.replace('_', ' ').capitalize()}: {value}")
+        print(f"Dataset version: {version if version is not None else 'unchanged'}")
+        print("=" * 50)
+    except Exception as e:
+        print(f"Error during import: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
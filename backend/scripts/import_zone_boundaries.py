@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Import school zone boundaries from a GeoJSON or shapefile export.
+
+Usage:
+    python scripts/import_zone_boundaries.py /path/to/zones.geojson
+        [--school-number-property School_ID] [--name-property School_name]
+
+Each feature is matched to a school through the Ministry school number in
+--school-number-property. Features of the same school are merged into one
+MultiPolygon and stored as GeoJSON in ``schoolzone.boundary``, updating the
+school's existing zone (so median prices and other columns are kept) or
+creating one. Coordinates must be WGS84 longitude/latitude (EPSG:4326);
+reproject NZTM exports first, e.g. ``ogr2ogr -t_srs EPSG:4326``. Shapefiles
+need the optional ``pyshp`` package. Everything is written in one transaction
+and the zone data version is bumped when a boundary changed, which rebuilds the
+in-memory zone index and drops cached /zones responses; school caches stay valid.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal, init_db
+from app.models.school import School
+from app.models.zone import SchoolZone
+from app.services.dataset import bump_dataset_version
+from app.services.zones import GeometryError, normalize_geometry
+
+Feature = Tuple[Dict[str, Any], Dict[str, Any]]  # (properties, geometry)
+
+
+def read_features(path: str) -> Iterator[Feature]:
+    """Features of a GeoJSON FeatureCollection or a shapefile."""
+    if path.lower().endswith(".shp"):
+        import shapefile  # optional dependency (pyshp)
+
+        with shapefile.Reader(path) as reader:
+            for shape_record in reader.iterShapeRecords():
+                yield shape_record.record.as_dict(), shape_record.shape.__geo_interface__
+        return
+
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    for feature in collection.get("features", []):
+        yield feature.get("properties") or {}, feature.get("geometry")
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[Any]:
+    return [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+
+
+def import_zone_boundaries(
+    db: Session,
+    features: Iterator[Feature],
+    school_number_property: str,
+    name_property: str,
+) -> Dict[str, int]:
+    """Store the features' boundaries on the matching schools' zones; returns the counts."""
+    result = {"created": 0, "updated": 0, "unchanged": 0, "unmatched": 0, "errors": 0, "total": 0}
+    polygons: Dict[int, List[Any]] = {}
+    names: Dict[int, str] = {}
+    for properties, geometry in features:
+        result["total"] += 1
+        try:
+            school_number = int(properties[school_number_property])
+            parts = _polygons(normalize_geometry(geometry))
+        except GeometryError as e:
+            print(f"Skipping feature {result['total']}: {e}")
+            result["errors"] += 1
+            continue
+        except (KeyError, TypeError, ValueError):
+            print(f"Skipping feature {result['total']}: no school number in {school_number_property}")
+            result["errors"] += 1
+            continue
+        polygons.setdefault(school_number, []).extend(parts)
+        if properties.get(name_property):
+            names.setdefault(school_number, str(properties[name_property]))
+
+    schools = {
+        row.school_number: row
+        for row in db.execute(
+            select(School.school_number, School.id, School.name).where(School.school_number.in_(polygons))
+        )
+    }
+    zones: Dict[int, Tuple[int, Any]] = {}
+    for row in db.execute(
+        select(SchoolZone.id, SchoolZone.school_id, SchoolZone.boundary)
+        .where(SchoolZone.school_id.in_([school.id for school in schools.values()]))
+        .order_by(SchoolZone.id)
+    ):
+        zones.setdefault(row.school_id, (row.id, row.boundary))
+
+    inserts, updates = [], []
+    for school_number, parts in polygons.items():
+        school = schools.get(school_number)
+        if school is None:
+            result["unmatched"] += 1
+            continue
+        geometry = {"type": "Polygon", "coordinates": parts[0]} if len(parts) == 1 else {
+            "type": "MultiPolygon",
+            "coordinates": parts,
+        }
+        boundary = json.dumps(geometry, separators=(",", ":"))
+        existing = zones.get(school.id)
+        if existing is None:
+            name = names.get(school_number) or f"{school.name} zone"
+            inserts.append({"name": name, "school_id": school.id, "boundary": boundary})
+        elif existing[1] == boundary:
+            result["unchanged"] += 1
+        else:
+            updates.append({"id": existing[0], "boundary": boundary})
+
+    if inserts:
+        db.execute(insert(SchoolZone), inserts)
+    if updates:
+        db.execute(update(SchoolZone), updates)
+    db.commit()
+    result["created"] = len(inserts)
+    result["updated"] = len(updates)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="GeoJSON FeatureCollection (.geojson/.json) or shapefile (.shp)")
+    parser.add_argument("--school-number-property", default="School_ID")
+    parser.add_argument("--name-property", default="School_name")
+    args = parser.parse_args()
+
+    if not Path(args.path).exists():
+        print(f"Error: file not found: {args.path}")
+        sys.exit(1)
+
+    print("Initializing database...")
+    init_db()
+
+    db = SessionLocal()
+    try:
+        print(f"\nImporting zone boundaries from: {args.path}")
+        result = import_zone_boundaries(
+            db, read_features(args.path), args.school_number_property, args.name_property
+        )
+        changed = result["created"] or result["updated"]
+        version = bump_dataset_version(db, dataset="zones") if changed else None
+
+        print("\n" + "=" * 50)
+        print("Import Summary:")
+        print("=" * 50)
+        for key in ("created", "updated", "unchanged", "unmatched", "errors", "total"):
+            print(f"{key.capitalize()}: {result[key]}")
+        print(f"Zone data version: {version if version is not None else 'unchanged'}")
+        print("=" * 50)
+    except Exception as e:
+        print(f"Error during import: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
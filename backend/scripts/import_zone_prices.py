@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Import zone house-price observations and refresh the price rollups.
+
+Usage:
+    python scripts/import_zone_prices.py /path/to/prices.csv [--source NAME]
+        [--batch-size 1000]
+    python scripts/import_zone_prices.py --rebuild
+
+The CSV has a header row with ``observed_on`` (YYYY-MM-DD, or YYYY-MM for the
+first of the month), ``median_price``, optional ``sales_count`` and either
+``zone_id`` or ``school_number`` (the school's first zone). Observations are
+upserted in batches on (zone, date); only the yearly rollups and stats of the
+zones and years that actually changed are recomputed afterwards, and the
+zone data version is bumped so cached /zones responses are dropped; school
+caches and indexes stay valid.
+--rebuild recomputes every rollup from the stored observations instead.
+"""
+
+import argparse
+import csv
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal, init_db
+from app.models.school import School
+from app.models.zone import SchoolZone
+from app.services.dataset import bump_dataset_version
+from app.services.ingest import DEFAULT_BATCH_SIZE, batched
+from app.services.zone_prices import PriceIngest, refresh_all
+
+
+def parse_date(value: str) -> date:
+    value = value.strip()
+    if len(value) == 7:
+        return datetime.strptime(value, "%Y-%m").date()
+    return date.fromisoformat(value[:10])
+
+
+def _zone_by_school_number(db: Session) -> Dict[int, int]:
+    zones: Dict[int, int] = {}
+    for school_number, zone_id in db.execute(
+        select(School.school_number, SchoolZone.id)
+        .join(SchoolZone, SchoolZone.school_id == School.id)
+        .where(School.school_number.is_not(None))
+        .order_by(SchoolZone.id)
+    ):
+        zones.setdefault(school_number, zone_id)
+    return zones
+
+
+def read_observations(csv_path: str, db: Session, source: Optional[str], errors: list) -> Iterator[Dict[str, Any]]:
+    zones_by_school: Optional[Dict[int, int]] = None
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                if row.get("zone_id"):
+                    zone_id = int(row["zone_id"])
+                else:
+                    if zones_by_school is None:
+                        zones_by_school = _zone_by_school_number(db)
+                    zone_id = zones_by_school.get(int(row["school_number"]))
+                sales_count = row.get("sales_count")
+                yield {
+                    "zone_id": zone_id,
+                    "observed_on": parse_date(row["observed_on"]),
+                    "median_price": float(row["median_price"]),
+                    "sales_count": int(sales_count) if sales_count else None,
+                    "source": source,
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append(f"Error in row {reader.line_num}: {e!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", nargs="?")
+    parser.add_argument("--source", default=None, help="Recorded with every observation, e.g. the data provider")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all rollups instead of importing")
+    args = parser.parse_args()
+
+    if not args.rebuild and (not args.csv_path or not Path(args.csv_path).exists()):
+        print(f"Error: CSV file not found: {args.csv_path}")
+        sys.exit(1)
+
+    print("Initializing database...")
+    init_db()
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            print("\nRebuilding zone price rollups")
+            result = refresh_all(db)
+            version = bump_dataset_version(db, dataset="zones")
+        else:
+            print(f"\nImporting zone prices from: {args.csv_path}")
+            errors: list = []
+            ingest = PriceIngest(db)
+            for batch in batched(read_observations(args.csv_path, db, args.source, errors), args.batch_size):
+                ingest.apply(batch)
+                print(f"Processed {ingest.counts['total']} rows...")
+            for message in errors:
+                print(message)
+            result = ingest.finish()
+            result["errors"] = len(errors)
+            version = bump_dataset_version(db, dataset="zones") if result["changed"] else None
+
+        print("\n" + "=" * 50)
+        print("Import Summary:")
+        print("=" * 50)
+        for key, value in result.items():
+            print(f"{key.replace('_', ' ').capitalize()}: {value}")
+        print(f"Zone data version: {version if version is not None else 'unchanged'}")
+        print("=" * 50)
+    except Exception as e:
+        print(f"Error during import: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
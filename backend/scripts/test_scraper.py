@@ -111,6 +111,8 @@ async def test_scraper():
         print(f"  - Skipped: {result['import_result']['skipped']}")
         print(f"  - Errors: {result['import_result']['errors']}")
         print(f"  - Total: {result['import_result']['total']}")
+        print(f"Pages: {result['stats']['pages']} ({result['stats']['pages_per_second']} pages/sec)")
+        print(f"Cache hit ratio: {result['stats']['cache_hit_ratio']}")
         print(f"Timestamp: {result['timestamp']}")
         
     except Exception as e:
@@ -0,0 +1,73 @@
+"""
+Shared fixtures.
+
+Tests run against ``DATABASE_URL``, or a throwaway SQLite database when it is
+unset. They write schools, so only point it at a scratch database; with a
+Postgres one the query plan tests run too.
+"""
+import os
+import tempfile
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='kiwischools-tests-')}/test.db"
+
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, async_engine, init_db
+from app.models.school import School
+from app.services.bulk_import import upsert_schools
+from app.services.dataset import bump_dataset_version
+
+# School numbers of the seeded sample schools, clear of real Ministry numbers
+SAMPLE_NUMBERS = range(990001, 990201)
+SAMPLE_TYPES = ("primary", "secondary", "kindergarten", "intermediate")
+SAMPLE_CITIES = ("Auckland", "Wellington", "Christchurch", "Dunedin")
+
+
+def sample_school(number: int) -> dict:
+    position = number - SAMPLE_NUMBERS.start
+    return {
+        "school_number": number,
+        "name": f"Sample School {position:03d}",
+        "school_type": SAMPLE_TYPES[position % len(SAMPLE_TYPES)],
+        "city": SAMPLE_CITIES[position % len(SAMPLE_CITIES)],
+        "region": SAMPLE_CITIES[position % len(SAMPLE_CITIES)],
+        "latitude": -46.0 + (position % 20) * 0.5,
+        "longitude": 168.0 + (position // 20) * 0.8,
+        "fee_min": float(position * 10),
+        "fee_unit": "per_year",
+    }
+
+
+@pytest.fixture(scope="session")
+def sample_schools() -> List[int]:
+    """Create the tables and the sample schools once; returns their ids."""
+    init_db()
+    with SessionLocal() as db:
+        upsert_schools(db, [sample_school(number) for number in SAMPLE_NUMBERS], overwrite_with_null=True)
+        bump_dataset_version(db)
+        return list(
+            db.execute(
+                select(School.id).where(School.school_number.in_(list(SAMPLE_NUMBERS))).order_by(School.id)
+            ).scalars()
+        )
+
+
+@pytest.fixture
+def db(sample_schools) -> Iterator[Session]:
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def fresh_async_pool() -> None:
+    """
+    Start every test with an empty async pool. Each test runs the app on a new
+    event loop, and an asyncpg connection only works on the loop that opened
+    it; the old loop is closed, so its connections are dropped, not closed.
+    """
+    async_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+ADMIN_PATHS = [("GET", "/metrics/queries"), ("DELETE", "/metrics/queries"), ("GET", "/health/pool")]
+
+
+@pytest.fixture
+def client():
+    # One event loop for all of a test's requests
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.mark.parametrize("method,path", ADMIN_PATHS)
+def test_admin_endpoints_are_off_by_default(client, monkeypatch, method, path):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.request(method, path).status_code == 404
+    assert client.request(method, path, headers={"Authorization": "Bearer anything"}).status_code == 404
+
+
+@pytest.mark.parametrize("method,path", ADMIN_PATHS)
+def test_admin_endpoints_need_the_token(client, monkeypatch, method, path):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    assert client.request(method, path).status_code == 401
+    assert client.request(method, path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.request(method, path, headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == (204 if method == "DELETE" else 200)
+
+
+def test_health_stays_public(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.get("/health").json() == {"status": "ok"}
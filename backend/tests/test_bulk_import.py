@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from app.models.school import School
+from app.services.bulk_import import DifferentialImport, content_hash
+
+# Keyed on external_id so the snapshot never touches the sample schools
+PREFIX = "bulk-import-test:"
+
+
+def _records(count: int, name: str = "Import School"):
+    records = []
+    for position in range(count):
+        record = {
+            "external_id": f"{PREFIX}{position}",
+            "name": f"{name} {position:03d}",
+            "school_type": "primary",
+            "city": "Nelson",
+        }
+        record["content_hash"] = content_hash(record)
+        records.append(record)
+    return records
+
+
+def _import(db, records):
+    differential = DifferentialImport(db, key="external_id")
+    differential.apply(records)
+    return differential.finish(delete_missing=False), differential.changes
+
+
+def test_reimport_restores_soft_deleted_schools(db, sample_schools):
+    records = _records(10)
+    _import(db, records)
+    ids = list(db.execute(select(School.id).where(School.external_id.like(PREFIX + "%"))).scalars())
+    db.execute(update(School).where(School.id.in_(ids[:4])).values(deleted_at=datetime.utcnow()))
+    db.commit()
+
+    counts, changes = _import(db, records)
+    assert counts["restored"] == 4
+    assert counts["unchanged"] == 6
+    assert counts["created"] == counts["updated"] == 0
+    assert sorted(changes.updated) == sorted(ids[:4])
+    assert changes
+    assert not db.execute(
+        select(School.id).where(School.external_id.like(PREFIX + "%"), School.deleted_at.is_not(None))
+    ).all()
+
+    counts, changes = _import(db, records)
+    assert counts["unchanged"] == 10 and counts["restored"] == 0
+    assert not changes
+
+
+def test_restored_schools_take_the_snapshot_values(db, sample_schools):
+    _import(db, _records(3))
+    db.execute(
+        update(School).where(School.external_id == f"{PREFIX}0").values(deleted_at=datetime.utcnow())
+    )
+    db.commit()
+
+    counts, _ = _import(db, _records(3, name="Renamed School"))
+    assert counts["restored"] == 1
+    assert counts["updated"] == 2
+    db.expire_all()
+    assert db.execute(select(School.name).where(School.external_id == f"{PREFIX}0")).scalar_one() == (
+        "Renamed School 000"
+    )
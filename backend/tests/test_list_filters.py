@@ -0,0 +1,26 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+
+@pytest.fixture(params=["sql", "memory"])
+def client(request, sample_schools, monkeypatch):
+    monkeypatch.setattr(settings, "catalogue_backend", request.param)
+    # One event loop for all of a test's requests
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.mark.parametrize("path", ["/schools/", "/kindergartens/"])
+def test_city_filter_ignores_case(client, path):
+    # Every spelling pages the same rows; the sample kindergartens are all in Christchurch
+    totals = set()
+    for city in ("Christchurch", "christchurch", "CHRISTCHURCH"):
+        response = client.get(path, params={"city": city, "name": "Sample School", "copy": city})
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert items and {item["city"] for item in items} == {"Christchurch"}
+        totals.add(response.json()["total"])
+    assert len(totals) == 1
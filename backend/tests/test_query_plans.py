@@ -0,0 +1,256 @@
+"""
+EXPLAIN regression tests for the list endpoints' queries.
+
+Each case builds its query with the route's own query builder and runs it
+through ``paginate`` (count and page) or a batch helper, capturing every
+statement sent to the database. Those statements are explained with
+sequential scans disabled, so the planner only falls back to one when no index
+can answer a query, whatever the table size. Every scan of ``school``,
+``schoolzone`` or ``schoolsubject`` must then seek an index (an ``Index
+Cond``), read a partial index that only holds the rows asked for, or walk the
+case's sort index under a ``LIMIT``; and one of the indexes that fit the
+case's filter must be used (which one depends on the data). Only counts
+without any filter may read every school.
+
+Postgres only: skipped on other databases.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from app.api import pagination
+from app.api.batch import zones_by_school
+from app.api.fields import parse_fields
+from app.api.pagination import SORT_FIELDS, encode_cursor, paginate
+from app.api.routes.kindergartens import kindergarten_list_query
+from app.api.routes.schools import school_list_query
+from app.api.routes.universities import university_list_query
+from app.db.session import SessionLocal, engine
+from app.models.school import School
+from app.services.bulk_import import upsert_schools
+from app.services.dataset import bump_dataset_version
+from app.services.search import name_matches
+from app.services.subjects import set_subjects, subjects_by_school
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="query plans are checked on Postgres")
+
+CHECKED_TABLES = {"school", "schoolzone", "schoolsubject"}
+
+# The planning dataset, numbered clear of real Ministry numbers
+PLAN_NUMBERS = range(980001, 1000001)
+PLAN_TYPES = ("primary", "primary", "secondary", "intermediate", "composite", "kindergarten", "kindergarten") * 7 + (
+    "university",
+)
+PLAN_CITIES = ("Auckland", "Wellington", "Christchurch", "Hamilton", "Tauranga", "Dunedin", "Nelson", "Napier")
+# About 20 schools per suburb, as in the directory
+PLAN_SUBURBS = 1000
+PLAN_SUBJECTS = ["Engineering", "Law", "Medicine", "Computer Science"]
+
+
+@dataclass
+class Case:
+    run: Callable[[Session], Any]
+    # The plans must use one of these indexes
+    indexes: FrozenSet[str]
+    # Sort indexes that may be walked without a condition under a LIMIT
+    ordered: FrozenSet[str] = frozenset()
+    # The count has no filter, so reading every active school is expected
+    full_count: bool = False
+
+
+def _page(builder, *, sort: str = "name", cursor: Optional[str] = None, **filters) -> Callable[[Session], Any]:
+    def run(db: Session) -> Any:
+        query = builder(db, parse_fields(None, also=(SORT_FIELDS[sort],)), **filters)
+        return paginate(db, query, limit=20, cursor=cursor, sort=sort)
+
+    return run
+
+
+def _case(run, indexes, ordered=(), full_count=False) -> Case:
+    return Case(run, frozenset(indexes), frozenset(ordered), full_count)
+
+
+CASES: Dict[str, Case] = {
+    "schools: first page": _case(
+        _page(school_list_query), {"ix_school_name_id"}, ordered={"ix_school_name_id"}, full_count=True
+    ),
+    "schools: next page": _case(
+        _page(school_list_query, cursor=encode_cursor("M", 0, 1)), {"ix_school_name_id"}, full_count=True
+    ),
+    "schools: school_type": _case(
+        _page(school_list_query, school_type="secondary"),
+        {"ix_school_type_name_id", "ix_school_type_region_city", "ix_school_type_fee_annual_min_id"},
+    ),
+    "schools: school_type + region + city": _case(
+        _page(school_list_query, school_type="secondary", region="Auckland Region", city="Auckland"),
+        {"ix_school_type_region_city"},
+    ),
+    "schools: suburb": _case(_page(school_list_query, suburb="Epsom"), {"ix_school_suburb"}),
+    "schools: name": _case(
+        _page(school_list_query, name="Sample School 012"), set(), ordered={"ix_school_name_id"}
+    ),
+    "schools: sort=fee": _case(
+        _page(school_list_query, sort="fee"),
+        {"ix_school_fee_annual_min_id"},
+        ordered={"ix_school_fee_annual_min_id"},
+        full_count=True,
+    ),
+    "schools: sort=fee, next page": _case(
+        _page(school_list_query, sort="fee", cursor=encode_cursor(5000, 0, 1)),
+        {"ix_school_fee_annual_min_id"},
+        full_count=True,
+    ),
+    "schools: sort=fee, fees unknown": _case(
+        _page(school_list_query, sort="fee", cursor=encode_cursor(None, 0, 1)),
+        {"school_pkey", "ix_school_fee_annual_min_id"},
+        full_count=True,
+    ),
+    "schools: fee_lte": _case(
+        _page(school_list_query, fee_lte=5000), {"ix_school_fee_annual_min_id"}, ordered={"ix_school_name_id"}
+    ),
+    "schools: fee_gte": _case(
+        _page(school_list_query, fee_gte=20000), {"ix_school_fee_annual_max"}, ordered={"ix_school_name_id"}
+    ),
+    "schools: school_type + fee range, sort=fee": _case(
+        _page(school_list_query, sort="fee", school_type="secondary", fee_gte=5000, fee_lte=20000),
+        {"ix_school_type_fee_annual_min_id", "ix_school_type_region_city"},
+    ),
+    "kindergartens: first page": _case(
+        _page(kindergarten_list_query), {"ix_school_kindergarten_name_id"}
+    ),
+    "kindergartens: next page": _case(
+        _page(kindergarten_list_query, cursor=encode_cursor("M", 0, 1)), {"ix_school_kindergarten_name_id"}
+    ),
+    "kindergartens: region + city": _case(
+        _page(kindergarten_list_query, region="Auckland Region", city="Auckland"),
+        {"ix_school_kindergarten_region_city"},
+    ),
+    "kindergartens: name": _case(
+        _page(kindergarten_list_query, name="Sample School 012"), set()
+    ),
+    "kindergartens: fee_lte, sort=fee": _case(
+        _page(kindergarten_list_query, sort="fee", fee_lte=5000),
+        {"ix_school_type_fee_annual_min_id", "ix_school_kindergarten_region_city", "ix_school_kindergarten_name_id"},
+    ),
+    "universities: first page": _case(_page(university_list_query), {"ix_school_tertiary_name_id"}),
+    "universities: sort=qs_rank": _case(
+        _page(university_list_query, sort="qs_rank"), {"ix_school_tertiary_qs_rank_id"}
+    ),
+    "universities: subject, sort=qs_rank": _case(
+        _page(university_list_query, sort="qs_rank", subject=["Engineering"]), {"ix_schoolsubject_subject_school"}
+    ),
+    "universities: subjects of a page": _case(lambda db: subjects_by_school(db, [1, 2, 3]), {"schoolsubject_pkey"}),
+    "zones: by school": _case(lambda db: zones_by_school(db, [1, 2, 3]), {"ix_schoolzone_school_id"}),
+}
+
+
+@contextmanager
+def captured_statements() -> Iterator[List[Tuple[str, Any]]]:
+    statements: List[Tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _nodes(plan: Dict[str, Any], under_limit: bool = False) -> Iterator[Tuple[Dict[str, Any], bool]]:
+    yield plan, under_limit
+    for child in plan.get("Plans", []):
+        yield from _nodes(child, under_limit or plan["Node Type"] == "Limit")
+
+
+def _plan_school(position: int) -> Dict[str, Any]:
+    city = PLAN_CITIES[position % len(PLAN_CITIES)]
+    suburb = position % PLAN_SUBURBS
+    record = {
+        "school_number": PLAN_NUMBERS.start + position,
+        "name": f"Plan School {position:05d}",
+        "school_type": PLAN_TYPES[position % len(PLAN_TYPES)],
+        "region": f"{city} Region",
+        "city": city,
+        "suburb": "Epsom" if suburb == 0 else f"Suburb {suburb}",
+        "fee_min": None if position % 3 == 0 else float(position % 40 * 750),
+        "fee_unit": "per_year",
+        "education_system": None,
+        "qs_world_rank": None,
+        "university_type": None,
+    }
+    if record["school_type"] == "kindergarten":
+        record["education_system"] = ("Montessori", "Reggio Emilia", "play-based")[position % 3]
+    elif record["school_type"] == "university":
+        record["qs_world_rank"] = position // len(PLAN_TYPES) + 1
+        record["university_type"] = "public"
+    return record
+
+
+@pytest.fixture(scope="module")
+def plan_data(sample_schools) -> None:
+    """
+    Enough schools, spread like the directory, for the planner's statistics to
+    resemble a real database rather than a table of a few hundred rows.
+    """
+    with SessionLocal() as db:
+        upsert_schools(db, [_plan_school(position) for position in range(len(PLAN_NUMBERS))])
+        universities = db.execute(
+            select(School.id).where(School.school_number.in_(list(PLAN_NUMBERS)), School.school_type == "university")
+        ).scalars()
+        set_subjects(db, {school_id: PLAN_SUBJECTS[school_id % 2:] for school_id in universities})
+        bump_dataset_version(db)
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE school"))
+        conn.execute(text("ANALYZE schoolsubject"))
+        conn.commit()
+
+
+@pytest.fixture(scope="module")
+def partial_indexes(plan_data) -> FrozenSet[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT indexname FROM pg_indexes WHERE indexdef LIKE '% WHERE %'"))
+        return frozenset(row[0] for row in rows)
+
+
+@pytest.mark.parametrize("label", list(CASES))
+def test_query_uses_indexes(label: str, db: Session, partial_indexes: FrozenSet[str]):
+    case = CASES[label]
+    # Build the in-memory indexes and forget cached counts first, so only the
+    # case's own count and page queries are captured
+    name_matches(db, "warm up")
+    pagination._count_cache.clear()
+    with captured_statements() as statements:
+        case.run(db)
+    assert statements
+
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    used = set()
+    problems = []
+    for statement, parameters in statements:
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar_one()
+        full_count_allowed = case.full_count and statement.lstrip().startswith("SELECT count(")
+        for node, under_limit in _nodes(plan[0]["Plan"]):
+            index = node.get("Index Name")
+            if index:
+                used.add(index)
+            if node.get("Relation Name") not in CHECKED_TABLES and index is None:
+                continue
+            if full_count_allowed or "Bitmap Heap" in node["Node Type"]:
+                # Bitmap heap scans are bounded by their bitmap index scans
+                continue
+            if node["Node Type"] == "Seq Scan":
+                problems.append(f"sequential scan on {node['Relation Name']}")
+            elif index and "Index Cond" not in node and index not in partial_indexes:
+                if not (under_limit and index in case.ordered):
+                    problems.append(f"whole index {index} read with filter {node.get('Filter')!r}")
+    db.rollback()
+
+    assert not problems, f"{label}: {problems}"
+    if case.indexes:
+        assert case.indexes & used, f"{label}: expected one of {sorted(case.indexes)}, used {sorted(used)}"
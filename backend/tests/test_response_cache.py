@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client(sample_schools):
+    # One event loop for all of a test's requests
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_matching_etag_is_not_modified(client, sample_schools):
+    url = f"/schools/{sample_schools[0]}"
+    etag = client.get(url).headers["ETag"]
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize("url", ["/schools/999999999", "/schools/?limit=-1", "/schools/?cursor=not-a-cursor"])
+def test_any_etag_does_not_hide_errors(client, url):
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code in (400, 404, 422)
+
+
+def test_any_etag_matches_existing_representations(client, sample_schools):
+    # Once from the route, once from the response cache
+    url = f"/schools/{sample_schools[1]}?copy=any"
+    for _ in range(2):
+        response = client.get(url, headers={"If-None-Match": "*"})
+        assert response.status_code == 304
+        assert response.headers["ETag"]
+    assert client.get(url).headers["X-Cache"] == "HIT"
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.school import School
+from app.services.scraper import Fetcher, FixtureServer, ScrapeError, scrape_kindergartens
+from app.services.scraper.engine import crawl
+
+SAMPLE_NAMES = {"Epsom Kindergarten"}
+
+
+def _fetcher(**options) -> Fetcher:
+    defaults = dict(
+        concurrency=8,
+        per_host_concurrency=4,
+        requests_per_second=0,
+        burst=1,
+        max_retries=0,
+        timeout_seconds=5,
+        user_agent="KiwiSchoolsTest/1.0",
+    )
+    return Fetcher(**{**defaults, **options})
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    # Keep the sample crawl and its backoff quick
+    monkeypatch.setattr(settings, "scraper_requests_per_second", 0)
+    monkeypatch.setattr("app.services.scraper.engine.BACKOFF_BASE_SECONDS", 0.01)
+
+
+def test_scrape_sample_site_imports_and_reuses_cache(db, tmp_path, fast_retries):
+    first = asyncio.run(scrape_kindergartens(db, [], cache_dir=str(tmp_path)))
+    assert first["status"] == "success"
+    assert first["stats"]["pages"] > 0
+    assert first["stats"]["cache_hit_ratio"] == 0.0
+    imported = first["import_result"]["created"] + first["import_result"]["updated"]
+    assert imported + first["import_result"]["unchanged"] > 0
+
+    rows = db.execute(
+        select(School.name, School.school_type, School.external_id).where(School.external_id.like("127.0.0.1:%"))
+    ).all()
+    assert SAMPLE_NAMES <= {row.name for row in rows}
+    assert {row.school_type for row in rows} == {"kindergarten"}
+
+    # The fixture server gets a new port, but its pages are cached by a stable origin
+    second = asyncio.run(scrape_kindergartens(db, [], cache_dir=str(tmp_path)))
+    assert second["status"] == "success"
+    assert second["stats"]["cache_hit_ratio"] == 1.0
+    assert second["import_result"]["created"] == second["import_result"]["updated"] == 0
+    assert second["dataset_version"] is None
+
+
+def test_unreachable_pages_fail_the_scrape(db, tmp_path, fast_retries):
+    with FixtureServer() as server:
+        result = asyncio.run(scrape_kindergartens(db, [server.base_url + "/missing.html"], cache_dir=str(tmp_path)))
+    assert result["status"] == "failed"
+    assert result["stats"]["errors"] == 1
+    assert result["dataset_version"] is None
+
+
+def test_fetcher_retries_unavailable_responses():
+    async def fetch(server):
+        async with _fetcher(max_retries=3) as fetcher:
+            page = await fetcher.fetch(server.base_url + "/index.html")
+            return page, fetcher.stats
+
+    with FixtureServer(failures=2) as server:
+        page, stats = asyncio.run(fetch(server))
+    assert b"<html" in page.body
+    assert stats.retries == 2
+    assert server.requests["index.html"] == 3
+
+
+def test_fetcher_gives_up_after_max_retries():
+    async def fetch(server):
+        async with _fetcher(max_retries=1) as fetcher:
+            with pytest.raises(ScrapeError, match="503"):
+                await fetcher.fetch(server.base_url + "/index.html")
+            return fetcher.stats
+
+    with FixtureServer(failures=5) as server:
+        stats = asyncio.run(fetch(server))
+    assert stats.retries == 1
+    assert server.requests["index.html"] == 2
+
+
+def test_fetcher_rate_limits_each_host():
+    paths = ["/index.html", "/listing.json", "/page2.html"] + [f"/kindergartens/100{n}.html" for n in range(1, 6)]
+
+    async def fetch_all(server):
+        async with _fetcher(requests_per_second=20, burst=2) as fetcher:
+            started = time.monotonic()
+            await asyncio.gather(*(fetcher.fetch(server.base_url + path) for path in paths))
+            return time.monotonic() - started
+
+    with FixtureServer() as server:
+        elapsed = asyncio.run(fetch_all(server))
+    # Two requests ride the burst, the other six wait for tokens at 20 per second
+    assert elapsed >= (len(paths) - 2) / 20 * 0.9
+
+
+def test_crawl_follows_links_once():
+    async def run(server):
+        seen = []
+
+        async def handle(page):
+            seen.append(page.url)
+            # Every page links back to the seed and to itself
+            return [server.base_url + "/index.html", page.url]
+
+        async with _fetcher() as fetcher:
+            stats = await crawl(fetcher, [server.base_url + "/index.html"], handle, workers=4, max_pages=10)
+        return seen, stats
+
+    with FixtureServer() as server:
+        seen, stats = asyncio.run(run(server))
+    assert seen == [server.base_url + "/index.html"]
+    assert stats.pages == 1
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+import httpx
+
+from app.main import app
+from app.services.clustering import map_index
+from app.services.facets import facet_index
+from app.services.spatial import spatial_index
+
+COLD_URLS = [
+    "/schools/map?bbox=166,-47,179,-34&zoom=5",
+    "/schools/nearby?lat=-41.3&lng=174.8&radius_km=500",
+    "/facets",
+]
+
+
+def _get_concurrently(urls, timeout=60):
+    """Issue ``urls`` at once on one event loop; fails if it never finishes."""
+
+    async def fetch():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(url) for url in urls))
+
+    result = {}
+    # A worker deadlocked inside the event loop cannot time itself out, so the
+    # loop runs in a thread that is abandoned if it hangs
+    thread = threading.Thread(target=lambda: result.update(responses=asyncio.run(fetch())), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "concurrent requests never completed"
+    return result["responses"]
+
+
+def test_concurrent_cold_requests_complete(sample_schools):
+    for cache in (map_index, spatial_index, facet_index):
+        cache.clear()
+    # Distinct query strings so the response cache cannot answer any of them
+    urls = [f"{url}&copy={copy}" if "?" in url else f"{url}?copy={copy}" for url in COLD_URLS for copy in range(3)]
+    responses = _get_concurrently(urls)
+    assert [response.status_code for response in responses] == [200] * len(urls)
+    assert sum(point["count"] for point in responses[0].json()["clusters"]) + len(responses[0].json()["points"]) > 0
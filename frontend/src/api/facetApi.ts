@@ -0,0 +1,28 @@
+import { apiClient } from "./apiClient";
+
+export type FacetField = "region" | "city" | "suburb" | "school_type" | "education_system" | "fee_band";
+
+export interface FacetValue {
+  value: string;
+  count: number;
+}
+
+export interface FacetCounts {
+  total: number;
+  facets: Record<FacetField, FacetValue[]>;
+}
+
+export type FacetFilters = Partial<Record<FacetField, string | string[]>> & {
+  type?: "school" | "kindergarten" | "university";
+  name?: string;
+  limit?: number;
+};
+
+export async function fetchFacets(filters: FacetFilters = {}): Promise<FacetCounts> {
+  const response = await apiClient.get<FacetCounts>("/facets", {
+    params: filters,
+    // Repeat array filters (region=a&region=b) as the backend expects
+    paramsSerializer: { indexes: null }
+  });
+  return response.data;
+}
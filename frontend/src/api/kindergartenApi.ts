@@ -5,6 +5,13 @@ export interface KindergartenListParams {
   keyword?: string;
   page?: number;
   page_size?: number;
+  cursor?: string;
+  /** Sparse fieldset: field names and/or the presets card, map, detail */
+  fields?: string;
+  /** Annual fee range (NZD) overlapping these bounds */
+  fee_gte?: number;
+  fee_lte?: number;
+  sort?: "name" | "fee";
 }
 
 export interface PaginatedKindergartens {
@@ -12,20 +19,22 @@ export interface PaginatedKindergartens {
   total: number;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
 }
 
 export async function fetchKindergartens(params: KindergartenListParams = {}): Promise<PaginatedKindergartens> {
-  const response = await apiClient.get<Kindergarten[]>("/kindergartens", {
+  const response = await apiClient.get<PaginatedKindergartens>("/kindergartens", {
     params: {
       name: params.keyword,
+      limit: params.page_size,
+      cursor: params.cursor,
+      fields: params.fields,
+      fee_gte: params.fee_gte,
+      fee_lte: params.fee_lte,
+      sort: params.sort,
     }
   });
-  return {
-    items: response.data,
-    total: response.data.length,
-    page: params.page ?? 1,
-    page_size: params.page_size ?? 20
-  };
+  return response.data;
 }
 
 export async function fetchKindergartenById(id: number): Promise<Kindergarten> {
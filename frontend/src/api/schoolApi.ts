@@ -1,13 +1,22 @@
 import { apiClient } from "./apiClient";
-import type { School } from "../types";
+import type { School, SchoolZone } from "../types";
 
 export interface SchoolListParams {
   region_id?: number;
   school_type?: string;
+  region?: string;
+  city?: string;
   ownership_type?: string;
   keyword?: string;
   page?: number;
   page_size?: number;
+  cursor?: string;
+  /** Sparse fieldset: field names and/or the presets card, map, detail */
+  fields?: string;
+  /** Annual fee range (NZD) overlapping these bounds */
+  fee_gte?: number;
+  fee_lte?: number;
+  sort?: "name" | "fee";
 }
 
 export interface PaginatedSchools {
@@ -15,24 +24,25 @@ export interface PaginatedSchools {
   total: number;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
 }
 
 export async function fetchSchools(params: SchoolListParams): Promise<PaginatedSchools> {
-  const response = await apiClient.get<School[]>("/schools", {
+  const response = await apiClient.get<PaginatedSchools>("/schools", {
     params: {
       school_type: params.school_type,
       name: params.keyword, // Backend uses 'name' parameter
-      city: undefined, // Not used in current implementation
-      region: undefined, // Not used in current implementation
+      city: params.city,
+      region: params.region,
+      limit: params.page_size,
+      cursor: params.cursor,
+      fields: params.fields,
+      fee_gte: params.fee_gte,
+      fee_lte: params.fee_lte,
+      sort: params.sort,
     }
   });
-  // Convert List response to PaginatedSchools format
-  return {
-    items: response.data,
-    total: response.data.length,
-    page: params.page ?? 1,
-    page_size: params.page_size ?? 20
-  };
+  return response.data;
 }
 
 export async function fetchSchoolById(id: number): Promise<School> {
@@ -40,7 +50,56 @@ export async function fetchSchoolById(id: number): Promise<School> {
   return response.data;
 }
 
+export interface SchoolBatch {
+  items: (School & { zones?: SchoolZone[] })[];
+  missing: number[];
+}
+
+/** Several schools in one request, in the order of `ids`; unknown ids come back in `missing`. */
+export async function fetchSchoolsByIds(
+  ids: number[],
+  options: { includeZones?: boolean; fields?: string } = {}
+): Promise<SchoolBatch> {
+  const response = await apiClient.post<SchoolBatch>("/schools/batch", { ids }, {
+    params: {
+      include: options.includeZones ? "zones" : undefined,
+      fields: options.fields,
+    }
+  });
+  return response.data;
+}
 
+export interface MapPoint {
+  id: number;
+  name: string;
+  school_type?: string | null;
+  latitude: number;
+  longitude: number;
+}
 
+export interface MapCluster {
+  latitude: number;
+  longitude: number;
+  count: number;
+}
 
+export interface MapView {
+  zoom: number;
+  clusters: MapCluster[];
+  points: MapPoint[];
+}
 
+export async function fetchMapView(
+  bbox: [number, number, number, number],
+  zoom: number,
+  schoolType?: string
+): Promise<MapView> {
+  const response = await apiClient.get<MapView>("/schools/map", {
+    params: {
+      bbox: bbox.join(","),
+      zoom: Math.round(zoom),
+      school_type: schoolType,
+    }
+  });
+  return response.data;
+}
@@ -0,0 +1,17 @@
+import { apiClient } from "./apiClient";
+
+export interface Suggestion {
+  id: number;
+  name: string;
+  school_type?: string | null;
+  suburb?: string | null;
+}
+
+export type SuggestionType = "school" | "kindergarten" | "university";
+
+export async function fetchSuggestions(q: string, type?: SuggestionType, limit = 10): Promise<Suggestion[]> {
+  const response = await apiClient.get<Suggestion[]>("/suggest", {
+    params: { q, type, limit }
+  });
+  return response.data;
+}
@@ -4,8 +4,12 @@ import type { University } from "../types";
 export interface UniversityListParams {
   keyword?: string;
   university_type?: string;
+  /** Strong subjects; a university matches when it has any of them */
+  subjects?: string[];
+  sort?: "name" | "qs_rank";
   page?: number;
   page_size?: number;
+  cursor?: string;
 }
 
 export interface PaginatedUniversities {
@@ -13,24 +17,49 @@ export interface PaginatedUniversities {
   total: number;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
+}
+
+export interface SubjectCount {
+  name: string;
+  universities: number;
+}
+
+export interface SubjectTop {
+  subject: string;
+  universities: University[];
 }
 
 export async function fetchUniversities(params: UniversityListParams = {}): Promise<PaginatedUniversities> {
-  const response = await apiClient.get<University[]>("/universities", {
+  const response = await apiClient.get<PaginatedUniversities>("/universities", {
     params: {
       name: params.keyword,
       university_type: params.university_type,
-    }
+      subject: params.subjects,
+      sort: params.sort,
+      limit: params.page_size,
+      cursor: params.cursor,
+    },
+    // Repeat subjects (subject=a&subject=b) as the backend expects
+    paramsSerializer: { indexes: null }
   });
-  return {
-    items: response.data,
-    total: response.data.length,
-    page: params.page ?? 1,
-    page_size: params.page_size ?? 20
-  };
+  return response.data;
 }
 
 export async function fetchUniversityById(id: number): Promise<University> {
   const response = await apiClient.get<University>(`/universities/${id}`);
   return response.data;
 }
+
+export async function fetchSubjects(): Promise<SubjectCount[]> {
+  const response = await apiClient.get<SubjectCount[]>("/universities/subjects");
+  return response.data;
+}
+
+export async function fetchTopUniversities(k = 5, subjects?: string[]): Promise<SubjectTop[]> {
+  const response = await apiClient.get<SubjectTop[]>("/universities/top", {
+    params: { k, subject: subjects },
+    paramsSerializer: { indexes: null }
+  });
+  return response.data;
+}
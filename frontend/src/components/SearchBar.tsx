@@ -1,15 +1,54 @@
-import { ChangeEvent } from "react";
+import { ChangeEvent, useEffect, useState } from "react";
+import { fetchSuggestions } from "../api/suggestApi";
+import type { Suggestion, SuggestionType } from "../api/suggestApi";
+
+// Wait for a pause in typing before asking for suggestions
+const SUGGEST_DELAY_MS = 150;
 
 interface SearchBarProps {
   keyword: string;
   onChange: (value: string) => void;
+  onSelect?: (suggestion: Suggestion) => void;
+  type?: SuggestionType;
 }
 
-export function SearchBar({ keyword, onChange }: SearchBarProps) {
+export function SearchBar({ keyword, onChange, onSelect, type }: SearchBarProps) {
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+
+  useEffect(() => {
+    const query = keyword.trim();
+    if (!query) {
+      setSuggestions([]);
+      return;
+    }
+    // Typeahead hits /suggest, never the paginated list endpoints; a reply
+    // for an older keyword is dropped
+    let current = true;
+    const timer = setTimeout(() => {
+      fetchSuggestions(query, type)
+        .then((items) => {
+          if (current) setSuggestions(items);
+        })
+        .catch(() => {
+          if (current) setSuggestions([]);
+        });
+    }, SUGGEST_DELAY_MS);
+    return () => {
+      current = false;
+      clearTimeout(timer);
+    };
+  }, [keyword, type]);
+
   const handleChange = (e: ChangeEvent<HTMLInputElement>) => {
     onChange(e.target.value);
   };
 
+  const handleSelect = (suggestion: Suggestion) => {
+    setSuggestions([]);
+    onChange(suggestion.name);
+    onSelect?.(suggestion);
+  };
+
   return (
     <div className="search-bar">
       <input
@@ -17,24 +56,20 @@ export function SearchBar({ keyword, onChange }: SearchBarProps) {
         value={keyword}
         onChange={handleChange}
         placeholder="Search by school name..."
+        autoComplete="off"
       />
+      {suggestions.length > 0 && (
+        <ul className="search-suggestions" role="listbox">
+          {suggestions.map((suggestion) => (
+            <li key={suggestion.id} role="option" aria-selected={false}>
+              <button type="button" onClick={() => handleSelect(suggestion)}>
+                {suggestion.name}
+                {suggestion.suburb && <span className="search-suggestion-suburb">{suggestion.suburb}</span>}
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
     </div>
   );
 }
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
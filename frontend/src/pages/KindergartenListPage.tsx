@@ -7,7 +7,10 @@ import { KindergartenCard } from "../components/KindergartenCard";
 export function KindergartenListPage() {
   const [searchParams] = useSearchParams();
   const [kindergartens, setKindergartens] = useState<Kindergarten[]>([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const keyword = searchParams.get("keyword") || "";
@@ -17,8 +20,10 @@ export function KindergartenListPage() {
       setLoading(true);
       setError(null);
       try {
-        const data = await fetchKindergartens({ keyword: keyword || undefined });
+        const data = await fetchKindergartens({ keyword: keyword || undefined, fields: "card" });
         setKindergartens(data.items);
+        setTotal(data.total);
+        setNextCursor(data.next_cursor ?? null);
       } catch (err) {
         const message =
           err instanceof Error ? err.message : "Failed to load kindergartens";
@@ -31,6 +36,22 @@ export function KindergartenListPage() {
     loadKindergartens();
   }, [keyword]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await fetchKindergartens({ keyword: keyword || undefined, fields: "card", cursor: nextCursor });
+      setKindergartens((current) => [...current, ...data.items]);
+      setNextCursor(data.next_cursor ?? null);
+    } catch (err) {
+      const message =
+        err instanceof Error ? err.message : "Failed to load kindergartens";
+      setError(message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="space-y-4">
@@ -60,11 +81,26 @@ export function KindergartenListPage() {
       {kindergartens.length === 0 ? (
         <p className="text-xs text-slate-600">No kindergartens found.</p>
       ) : (
-        <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
-          {kindergartens.map((kindergarten) => (
-            <KindergartenCard key={kindergarten.id} kindergarten={kindergarten} />
-          ))}
-        </div>
+        <>
+          <p className="text-xs text-slate-600">
+            Showing {kindergartens.length} of {total} kindergartens
+          </p>
+          <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
+            {kindergartens.map((kindergarten) => (
+              <KindergartenCard key={kindergarten.id} kindergarten={kindergarten} />
+            ))}
+          </div>
+          {nextCursor && (
+            <button
+              type="button"
+              onClick={() => void loadMore()}
+              disabled={loadingMore}
+              className="rounded-lg border border-slate-200 bg-white px-4 py-2 text-xs font-medium text-slate-700 shadow-sm hover:bg-slate-50 disabled:text-slate-400"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          )}
+        </>
       )}
     </div>
   );
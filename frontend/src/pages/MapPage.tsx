@@ -2,8 +2,8 @@ import { useState, useEffect, useRef } from "react";
 import { useTranslation } from "react-i18next";
 import { Link, useNavigate } from "react-router-dom";
 import { GoogleMap, Marker, useJsApiLoader, InfoWindow } from "@react-google-maps/api";
-import { fetchSchools } from "../api/schoolApi";
-import type { School } from "../types";
+import { fetchMapView, fetchSchools } from "../api/schoolApi";
+import type { MapPoint, MapView } from "../api/schoolApi";
 
 // New Zealand center coordinates
 const NZ_CENTER = { lat: -41.2865, lng: 174.7762 };
@@ -28,6 +28,21 @@ const createBlueMarkerIcon = () => {
   };
 };
 
+// Larger circle for a cluster of schools, sized by how many it holds
+const createClusterIcon = (count: number) => {
+  if (typeof google === "undefined" || !google.maps) {
+    return undefined;
+  }
+  return {
+    path: google.maps.SymbolPath.CIRCLE,
+    scale: Math.min(24, 12 + Math.log10(count) * 4),
+    fillColor: "#10B981", // Emerald, as the search button
+    fillOpacity: 0.9,
+    strokeColor: "#FFFFFF",
+    strokeWeight: 2,
+  };
+};
+
 // North Island cities
 const NORTH_ISLAND_CITIES = [
   "Auckland",
@@ -124,14 +139,34 @@ const CITY_COORDINATES: Record<string, { lat: number; lng: number; zoom: number
   Balclutha: { lat: -46.2333, lng: 169.7500, zoom: 12 }
 };
 
+// Search results shown on the map, fetched page by page up to this many
+const MAX_SEARCH_RESULTS = 500;
+
+type MapSchool = MapPoint & { city?: string | null; education_system?: string | null };
+
+// Whether an education system value matches the selected filter option
+const matchesEducationSystem = (value: string | null | undefined, filter: string) => {
+  if (!value) return false;
+  if (filter === "other") {
+    return !["montessori", "reggio emilia", "play-based", "bilingual"].some((k) =>
+      value.toLowerCase().includes(k)
+    );
+  }
+  return value.toLowerCase().includes(filter.toLowerCase());
+};
+
 export function MapPage() {
   const { t } = useTranslation();
   const navigate = useNavigate();
-  const [schools, setSchools] = useState<School[]>([]);
+  // Markers for the current viewport, from /schools/map
+  const [view, setView] = useState<MapView | null>(null);
+  // Keyword search results; null shows the viewport markers instead
+  const [searchResults, setSearchResults] = useState<MapSchool[] | null>(null);
+  const [searchTotal, setSearchTotal] = useState(0);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [searchKeyword, setSearchKeyword] = useState("");
-  const [selectedSchool, setSelectedSchool] = useState<School | null>(null);
+  const [selectedSchool, setSelectedSchool] = useState<MapSchool | null>(null);
 
   // Filters
   const [schoolType, setSchoolType] = useState<string>("");
@@ -146,78 +181,82 @@ export function MapPage() {
     googleMapsApiKey: import.meta.env.VITE_GOOGLE_MAPS_API_KEY || ""
   });
 
-  // Initial load of schools - only if backend is likely available
-  useEffect(() => {
-    // Skip initial load if we know backend was unavailable recently
-    const backendWasUnavailable = sessionStorage.getItem("backend_unavailable_warning_logged") === "true";
-    
-    // Only attempt initial load if backend seems available
-    // User can manually search to test connection
-    if (backendWasUnavailable) {
-      return; // Skip initial load to avoid unnecessary errors
+  const loadViewport = async () => {
+    const map = mapRef.current;
+    const bounds = map?.getBounds();
+    if (!bounds) return;
+    // Skip if we know backend was unavailable recently; the user can search
+    // to test the connection
+    if (sessionStorage.getItem("backend_unavailable_warning_logged") === "true") {
+      return;
     }
-
-    const loadInitialSchools = async () => {
-      setLoading(true);
-      try {
-        const data = await fetchSchools({});
-        setSchools(data.items.filter((s) => s.latitude && s.longitude));
-      } catch (error) {
-        // Silently fail on initial load - user can search when backend is ready
-        // Error is already logged by apiClient interceptor, no need to log again
-        setError(null); // Don't show error on initial load
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadInitialSchools();
-  }, []);
+    const southWest = bounds.getSouthWest();
+    const northEast = bounds.getNorthEast();
+    try {
+      const data = await fetchMapView(
+        [southWest.lng(), southWest.lat(), northEast.lng(), northEast.lat()],
+        map.getZoom() ?? 6,
+        schoolType || undefined
+      );
+      setView(data);
+    } catch (error) {
+      // Error is already logged by apiClient interceptor, no need to log again
+      setError(null);
+    }
+  };
 
   const handleSearch = async (keyword: string) => {
     setSearchKeyword(keyword);
+    if (!keyword) {
+      setSearchResults(null);
+      void loadViewport();
+      return;
+    }
     setLoading(true);
     try {
-      const data = await fetchSchools({
-        keyword: keyword || undefined,
-        school_type: schoolType || undefined
-      });
-
-      // Only show schools that have coordinates
-      let withCoords = data.items.filter((s) => s.latitude && s.longitude);
-
-      // City filter (frontend-side for now)
-      if (cityFilter) {
-        withCoords = withCoords.filter(
-          (s) => s.city && s.city.toLowerCase() === cityFilter.toLowerCase()
-        );
-      }
+      const results: MapSchool[] = [];
+      let cursor: string | undefined;
+      let total = 0;
+      do {
+        const data = await fetchSchools({
+          keyword,
+          school_type: schoolType || undefined,
+          city: cityFilter || undefined,
+          fields: "map,education_system",
+          page_size: 100,
+          cursor,
+        });
+        total = data.total;
+        for (const s of data.items) {
+          // Only show schools that have coordinates
+          if (!s.latitude || !s.longitude) continue;
+          results.push({
+            id: s.id,
+            name: s.name,
+            school_type: s.school_type,
+            latitude: s.latitude,
+            longitude: s.longitude,
+            city: s.city,
+            education_system: (s as any).education_system as string | undefined,
+          });
+        }
+        cursor = data.next_cursor ?? undefined;
+      } while (cursor && results.length < MAX_SEARCH_RESULTS);
+
+      let withCoords = results;
 
       // Education system filter (mainly for kindergartens)
       if (educationSystem) {
-        withCoords = withCoords.filter((s) => {
-          const value = (s as any).education_system as string | undefined;
-          if (!value) return false;
-          if (educationSystem === "other") {
-            return (
-              !["montessori", "reggio emilia", "play-based", "bilingual"].some((k) =>
-                value.toLowerCase().includes(k)
-              )
-            );
-          }
-          return value.toLowerCase().includes(educationSystem.toLowerCase());
-        });
+        withCoords = withCoords.filter((s) => matchesEducationSystem(s.education_system, educationSystem));
       }
 
-      setSchools(withCoords);
+      setSearchResults(withCoords);
+      setSearchTotal(total);
 
       // If schools found, zoom to first result
-      if (withCoords.length > 0 && withCoords[0].latitude && withCoords[0].longitude) {
-        const firstSchool = withCoords[0];
-        if (mapRef.current) {
-          mapRef.current.panTo({ lat: firstSchool.latitude, lng: firstSchool.longitude });
-          mapRef.current.setZoom(12);
-        }
+      if (withCoords.length > 0 && mapRef.current) {
+        mapRef.current.panTo({ lat: withCoords[0].latitude, lng: withCoords[0].longitude });
+        mapRef.current.setZoom(12);
       }
     } catch (error) {
       console.error("Search failed:", error);
@@ -232,6 +271,39 @@ export function MapPage() {
     }
   };
 
+  // Re-run the current search, or reload the viewport, when a filter changes
+  useEffect(() => {
+    if (searchResults !== null) {
+      void handleSearch(searchKeyword);
+      return;
+    }
+    const coords = cityFilter ? CITY_COORDINATES[cityFilter] : undefined;
+    if (coords && mapRef.current) {
+      // Moving the map reloads the viewport once it settles
+      mapRef.current.panTo({ lat: coords.lat, lng: coords.lng });
+      mapRef.current.setZoom(coords.zoom);
+    } else {
+      void loadViewport();
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [schoolType, cityFilter, educationSystem]);
+
+  const showCity = (city: string) => {
+    const coords = CITY_COORDINATES[city];
+    setSearchResults(null);
+    setSearchKeyword("");
+    if (coords && mapRef.current) {
+      mapRef.current.panTo({ lat: coords.lat, lng: coords.lng });
+      mapRef.current.setZoom(coords.zoom);
+    }
+  };
+
+  const points: MapSchool[] = searchResults ?? view?.points ?? [];
+  const markerCount =
+    searchResults !== null
+      ? searchResults.length
+      : (view?.points.length ?? 0) + (view?.clusters.reduce((sum, cluster) => sum + cluster.count, 0) ?? 0);
+
   return (
     <div className="space-y-4">
       <div className="flex items-center justify-between">
@@ -269,9 +341,7 @@ export function MapPage() {
         <form
           onSubmit={(e) => {
             e.preventDefault();
-            if (searchKeyword.trim()) {
-              void handleSearch(searchKeyword.trim());
-            }
+            void handleSearch(searchKeyword.trim());
           }}
           className="flex flex-col gap-2 md:flex-row md:items-center"
         >
@@ -305,10 +375,7 @@ export function MapPage() {
             </label>
             <select
               value={schoolType}
-              onChange={(e) => {
-                setSchoolType(e.target.value);
-                void handleSearch(searchKeyword.trim());
-              }}
+              onChange={(e) => setSchoolType(e.target.value)}
               className="w-full rounded-lg border border-slate-200 bg-white px-2 py-1.5 text-xs text-slate-800 outline-none focus:border-emerald-500 focus:ring-1 focus:ring-emerald-500"
             >
               <option value="">All types</option>
@@ -334,7 +401,6 @@ export function MapPage() {
                 setIsland(value);
                 // Reset city when changing region
                 setCityFilter("");
-                void handleSearch(searchKeyword.trim());
               }}
               className="w-full rounded-lg border border-slate-200 bg-white px-2 py-1.5 text-xs text-slate-800 outline-none focus:border-emerald-500 focus:ring-1 focus:ring-emerald-500"
             >
@@ -350,10 +416,7 @@ export function MapPage() {
             </label>
             <select
               value={cityFilter}
-              onChange={(e) => {
-                setCityFilter(e.target.value);
-                void handleSearch(searchKeyword.trim());
-              }}
+              onChange={(e) => setCityFilter(e.target.value)}
               disabled={!island}
               className="w-full rounded-lg border border-slate-200 bg-white px-2 py-1.5 text-xs text-slate-800 outline-none disabled:bg-slate-50 disabled:text-slate-400 focus:border-emerald-500 focus:ring-1 focus:ring-emerald-500"
             >
@@ -374,10 +437,7 @@ export function MapPage() {
             </label>
             <select
               value={educationSystem}
-              onChange={(e) => {
-                setEducationSystem(e.target.value);
-                void handleSearch(searchKeyword.trim());
-              }}
+              onChange={(e) => setEducationSystem(e.target.value)}
               className="w-full rounded-lg border border-slate-200 bg-white px-2 py-1.5 text-xs text-slate-800 outline-none focus:border-emerald-500 focus:ring-1 focus:ring-emerald-500"
             >
               <option value="">All systems</option>
@@ -401,14 +461,7 @@ export function MapPage() {
                 <button
                   key={city}
                   type="button"
-                  onClick={() => {
-                    const coords = CITY_COORDINATES[city];
-                    if (coords && mapRef.current) {
-                      mapRef.current.panTo({ lat: coords.lat, lng: coords.lng });
-                      mapRef.current.setZoom(coords.zoom);
-                    }
-                    void handleSearch(city);
-                  }}
+                  onClick={() => showCity(city)}
                   className="rounded-full border border-slate-200 bg-slate-50 px-3 py-1 text-[11px] font-medium text-slate-700 hover:border-emerald-400 hover:text-emerald-700"
                 >
                   {city}
@@ -425,14 +478,7 @@ export function MapPage() {
                 <button
                   key={city}
                   type="button"
-                  onClick={() => {
-                    const coords = CITY_COORDINATES[city];
-                    if (coords && mapRef.current) {
-                      mapRef.current.panTo({ lat: coords.lat, lng: coords.lng });
-                      mapRef.current.setZoom(coords.zoom);
-                    }
-                    void handleSearch(city);
-                  }}
+                  onClick={() => showCity(city)}
                   className="rounded-full border border-slate-200 bg-slate-50 px-3 py-1 text-[11px] font-medium text-slate-700 hover:border-emerald-400 hover:text-emerald-700"
                 >
                   {city}
@@ -494,9 +540,28 @@ export function MapPage() {
               onLoad={(map) => {
                 mapRef.current = map;
               }}
+              onIdle={() => {
+                if (searchResults === null) {
+                  void loadViewport();
+                }
+              }}
             >
-              {schools.map((school) => {
-                if (!school.latitude || !school.longitude) return null;
+              {searchResults === null &&
+                view?.clusters.map((cluster) => (
+                  <Marker
+                    key={`${cluster.latitude},${cluster.longitude}`}
+                    position={{ lat: cluster.latitude, lng: cluster.longitude }}
+                    icon={createClusterIcon(cluster.count)}
+                    label={{ text: String(cluster.count), color: "#FFFFFF", fontSize: "11px" }}
+                    onClick={() => {
+                      // Zoom in on the cluster; the viewport reloads once the map settles
+                      mapRef.current?.panTo({ lat: cluster.latitude, lng: cluster.longitude });
+                      mapRef.current?.setZoom((mapRef.current.getZoom() ?? 6) + 2);
+                    }}
+                  />
+                ))}
+
+              {points.map((school) => {
                 // Create blue circle icon - only when google is loaded
                 const blueIcon = createBlueMarkerIcon();
                 return (
@@ -534,10 +599,13 @@ export function MapPage() {
         )}
       </div>
 
-      {schools.length > 0 && (
+      {markerCount > 0 && (
         <div className="rounded-lg border border-slate-200 bg-white p-3 shadow-sm">
           <p className="text-xs text-slate-600">
-            Found <span className="font-semibold">{schools.length}</span> schools on the map
+            Found <span className="font-semibold">{markerCount}</span> schools on the map
+            {searchResults !== null && searchTotal > markerCount && (
+              <> (showing the first {markerCount} of {searchTotal} matches)</>
+            )}
           </p>
         </div>
       )}
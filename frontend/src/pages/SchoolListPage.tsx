@@ -7,7 +7,10 @@ import { SchoolCard } from "../components/SchoolCard";
 export function SchoolListPage() {
   const [searchParams] = useSearchParams();
   const [schools, setSchools] = useState<School[]>([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const keyword = searchParams.get("keyword") || "";
@@ -22,15 +25,12 @@ export function SchoolListPage() {
         const data = await fetchSchools({
           keyword: keyword || undefined,
           school_type: schoolType || undefined,
+          city: city || undefined,
+          fields: "card",
         });
-        // Filter by city if provided
-        let filteredSchools = data.items;
-        if (city) {
-          filteredSchools = filteredSchools.filter(
-            (school) => school.city?.toLowerCase() === city.toLowerCase()
-          );
-        }
-        setSchools(filteredSchools);
+        setSchools(data.items);
+        setTotal(data.total);
+        setNextCursor(data.next_cursor ?? null);
       } catch (err) {
         const message =
           err instanceof Error ? err.message : "Failed to load schools";
@@ -43,6 +43,28 @@ export function SchoolListPage() {
     loadSchools();
   }, [keyword, schoolType, city]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await fetchSchools({
+        keyword: keyword || undefined,
+        school_type: schoolType || undefined,
+        city: city || undefined,
+        fields: "card",
+        cursor: nextCursor,
+      });
+      setSchools((current) => [...current, ...data.items]);
+      setNextCursor(data.next_cursor ?? null);
+    } catch (err) {
+      const message =
+        err instanceof Error ? err.message : "Failed to load schools";
+      setError(message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="space-y-4">
@@ -86,11 +108,26 @@ export function SchoolListPage() {
       {schools.length === 0 ? (
         <p className="text-xs text-slate-600">No schools found.</p>
       ) : (
-        <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
-          {schools.map((school) => (
-            <SchoolCard key={school.id} school={school} />
-          ))}
-        </div>
+        <>
+          <p className="text-xs text-slate-600">
+            Showing {schools.length} of {total} schools
+          </p>
+          <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
+            {schools.map((school) => (
+              <SchoolCard key={school.id} school={school} />
+            ))}
+          </div>
+          {nextCursor && (
+            <button
+              type="button"
+              onClick={() => void loadMore()}
+              disabled={loadingMore}
+              className="rounded-lg border border-slate-200 bg-white px-4 py-2 text-xs font-medium text-slate-700 shadow-sm hover:bg-slate-50 disabled:text-slate-400"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          )}
+        </>
       )}
     </div>
   );
@@ -17,9 +17,16 @@ export interface University {
   tuition_international_min?: number | null;
   tuition_international_max?: number | null;
   strong_subjects?: string;
+  /** Normalized strong_subjects, alphabetically */
+  subjects?: string[];
   [key: string]: unknown; // Allow additional properties from backend
 }
 
+export interface Region {
+  name: string;
+  count: number;
+}
+
 export interface Kindergarten extends School {
   brand_name?: string;
   education_system?: string;
@@ -33,4 +40,15 @@ export interface Kindergarten extends School {
   fee_max?: number | null;
   fee_currency?: string;
   fee_unit?: string;
+  /** fee_min/fee_max per year in NZD, null when unknown */
+  fee_annual_min?: number | null;
+  fee_annual_max?: number | null;
+}
+
+export interface SchoolZone {
+  id: number;
+  name: string;
+  school_id?: number | null;
+  median_house_price?: number | null;
+  last_updated?: string | null;
 }